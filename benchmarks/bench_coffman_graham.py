@@ -0,0 +1,46 @@
+"""Benchmark Coffman-Graham layering for several layer width bounds.
+
+Usage: python benchmarks/bench_coffman_graham.py [nodes] [bound ...]
+
+Lays out a wide random DAG with each bound (0 is unbounded, equivalent to
+longest path layering) and reports the number of layers, the widest layer,
+the size of the drawing and the layout time.
+"""
+import copy
+import os
+import sys
+import time
+from collections import Counter
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_layered import random_dag  # noqa: E402
+from pyelk import ELK  # noqa: E402
+
+
+def main() -> None:
+    nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    bounds = [int(b) for b in sys.argv[2:]] or [0, 200, 100, 50, 20]
+    graph = random_dag(nodes, 2, 10)
+    elk = ELK()
+
+    print(f'{nodes} nodes, {len(graph["edges"])} edges')
+    print(f'{"bound":>6} {"layers":>6} {"widest":>6} {"width":>9} {"height":>9} {"time":>7}')
+    for bound in bounds:
+        g = copy.deepcopy(graph)
+        g['layoutOptions'].update({
+            'elk.direction': 'DOWN',
+            'elk.layered.layering.strategy': 'COFFMAN_GRAHAM',
+            'elk.layered.layering.coffmanGraham.layerBound': bound,
+        })
+        start = time.perf_counter()
+        elk.layout(g)
+        elapsed = time.perf_counter() - start
+        layers = Counter(child['y'] for child in g['children'])
+        print(f'{bound or "-":>6} {len(layers):>6} {max(layers.values()):>6} '
+              f'{g["width"]:>9.0f} {g["height"]:>9.0f} {elapsed:>6.2f}s')
+
+
+if __name__ == '__main__':
+    main()
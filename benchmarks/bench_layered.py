@@ -0,0 +1,65 @@
+"""Benchmark the layered algorithm on large random DAGs.
+
+Usage: python benchmarks/bench_layered.py [nodes] [edges_per_node] [ranks]
+
+Reports the wall-clock time of one layout and, in a second run (tracing
+slows Python down considerably), its peak traced memory.
+"""
+import copy
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pyelk import ELK  # noqa: E402
+
+
+def random_dag(nodes: int, edges_per_node: int, ranks: int, seed: int = 1) -> dict:
+    """A DAG whose nodes are spread over ``ranks`` ranks, edges pointing down."""
+    rnd = random.Random(seed)
+    rank = [rnd.randrange(ranks) for _ in range(nodes)]
+    by_rank = [[] for _ in range(ranks)]
+    for v, r in enumerate(rank):
+        by_rank[r].append(v)
+    edges = []
+    for v in range(nodes):
+        if rank[v] == ranks - 1:
+            continue
+        for _ in range(edges_per_node):
+            r = min(ranks - 1, rank[v] + rnd.choice((1, 1, 1, 2, 3)))
+            w = rnd.choice(by_rank[r])
+            edges.append({'id': f'e{len(edges)}', 'sources': [f'n{v}'],
+                          'targets': [f'n{w}']})
+    return {
+        'id': 'root',
+        'layoutOptions': {'elk.algorithm': 'layered'},
+        'children': [{'id': f'n{v}', 'width': 20, 'height': 10}
+                     for v in range(nodes)],
+        'edges': edges,
+    }
+
+
+def main() -> None:
+    nodes = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+    edges_per_node = int(sys.argv[2]) if len(sys.argv) > 2 else 2
+    ranks = int(sys.argv[3]) if len(sys.argv) > 3 else 50
+    graph = random_dag(nodes, edges_per_node, ranks)
+
+    traced = copy.deepcopy(graph)
+    start = time.perf_counter()
+    ELK().layout(graph)
+    elapsed = time.perf_counter() - start
+
+    tracemalloc.start()
+    ELK().layout(traced)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f'layered: {nodes} nodes, {len(graph["edges"])} edges: '
+          f'{elapsed:.2f} s, peak {peak / 2 ** 20:.1f} MiB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,38 @@
+"""Benchmark the cold ``import pyelk`` time of a fresh interpreter.
+
+Usage: python benchmarks/bench_startup.py [runs] [budget_ms]
+
+Reports the median wall-clock time of ``python -c "import pyelk"`` minus that
+of an empty interpreter. Exits with status 1 if it exceeds the budget.
+"""
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _median_ms(code: str, runs: int) -> float:
+    times = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, '-c', code], cwd=ROOT, check=True)
+        times.append((time.perf_counter() - start) * 1000)
+    return statistics.median(times)
+
+
+def main() -> int:
+    runs = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    budget = float(sys.argv[2]) if len(sys.argv) > 2 else 100.0
+    baseline = _median_ms('pass', runs)
+    with_pyelk = _median_ms('import pyelk', runs)
+    cost = with_pyelk - baseline
+    print(f'import pyelk: {cost:.1f} ms (interpreter {baseline:.1f} ms, '
+          f'median of {runs} runs, budget {budget:.0f} ms)')
+    return 0 if cost <= budget else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
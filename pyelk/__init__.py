@@ -3,18 +3,31 @@
 Provides automatic graph layout based on the Eclipse Layout Kernel (ELK).
 """
 from .elk import ELK
+from .result import LayoutResult
 from .exceptions import (
     ElkError,
     UnsupportedConfigurationException,
     UnsupportedGraphException,
     InvalidGraphException,
+    LayoutCancelledException,
 )
 
 __version__ = "0.1.0"
 __all__ = [
     "ELK",
+    "AsyncELK",
+    "LayoutResult",
     "ElkError",
     "UnsupportedConfigurationException",
     "UnsupportedGraphException",
     "InvalidGraphException",
+    "LayoutCancelledException",
 ]
+
+
+def __getattr__(name):
+    # asyncio is slow to import; only load the async API when it is used
+    if name == "AsyncELK":
+        from .aio import AsyncELK
+        return AsyncELK
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
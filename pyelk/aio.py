@@ -0,0 +1,110 @@
+"""Asynchronous layout API for asyncio applications."""
+import asyncio
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, Optional
+
+from .cancellation import cancellation_scope
+from .elk import ELK
+
+
+class AsyncELK:
+    """Asyncio front-end to ELK.
+
+    Layouts are offloaded to an executor so they do not block the event loop,
+    mirroring the Promise-based API of elkjs.
+
+    Usage:
+        elk = AsyncELK(max_concurrency=4)
+        result = await elk.layout(graph)
+
+    Cancelling the awaiting task stops a layout running in a thread at its next
+    phase or iteration boundary. Layouts already started in a process pool
+    cannot be interrupted; their result is discarded.
+
+    Args:
+        default_layout_options: Default layout options applied to all layouts.
+        executor: Executor to run layouts on. Defaults to the event loop's
+            default thread pool executor.
+        max_concurrency: Maximum number of layouts running at the same time.
+            Unbounded if None.
+        elk: Existing ELK instance to use instead of creating a new one.
+    """
+
+    def __init__(self, default_layout_options: Optional[Dict[str, str]] = None,
+                 executor: Optional[Executor] = None,
+                 max_concurrency: Optional[int] = None,
+                 elk: Optional[ELK] = None):
+        self.elk = elk or ELK(default_layout_options)
+        self.executor = executor
+        self.max_concurrency = max_concurrency
+        self._semaphore = None
+
+    async def layout(self, graph: dict = None,
+                     layout_options: Optional[Dict[str, str]] = None,
+                     logging: bool = False,
+                     measure_execution_time: bool = False) -> dict:
+        """Perform layout on a graph without blocking the event loop.
+
+        Takes the same arguments as ``ELK.layout`` and returns the laid-out
+        graph, which is modified in-place.
+
+        Raises:
+            asyncio.CancelledError: If the awaiting task is cancelled.
+        """
+        if graph is None:
+            raise ValueError("Missing mandatory parameter 'graph'.")
+
+        if self.max_concurrency is None:
+            return await self._run(graph, layout_options, logging,
+                                   measure_execution_time)
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        async with self._semaphore:
+            return await self._run(graph, layout_options, logging,
+                                   measure_execution_time)
+
+    async def _run(self, graph, layout_options, logging, measure_execution_time):
+        loop = asyncio.get_running_loop()
+
+        if isinstance(self.executor, ProcessPoolExecutor):
+            from .parallel import layout_batch
+            global_options = dict(self.elk.default_layout_options)
+            if layout_options:
+                global_options.update(layout_options)
+            outcomes = await loop.run_in_executor(
+                self.executor, layout_batch, [(0, graph)], global_options,
+                logging, measure_execution_time)
+            result = next(self.elk._collect_batch([graph], outcomes))
+            if result.error is not None:
+                raise result.error
+            return result.graph
+
+        cancel_event = threading.Event()
+        future = loop.run_in_executor(
+            self.executor, self._layout_cancellable, cancel_event, graph,
+            layout_options, logging, measure_execution_time)
+        try:
+            return await future
+        except asyncio.CancelledError:
+            cancel_event.set()
+            raise
+
+    def _layout_cancellable(self, cancel_event, graph, layout_options, logging,
+                            measure_execution_time):
+        with cancellation_scope(cancel_event):
+            return self.elk.layout(graph, layout_options=layout_options,
+                                   logging=logging,
+                                   measure_execution_time=measure_execution_time)
+
+    def known_layout_algorithms(self):
+        """Return descriptions of all known layout algorithms."""
+        return self.elk.known_layout_algorithms()
+
+    def known_layout_options(self):
+        """Return descriptions of all known layout options."""
+        return self.elk.known_layout_options()
+
+    def known_layout_categories(self):
+        """Return descriptions of layout categories."""
+        return self.elk.known_layout_categories()
@@ -1,28 +1,101 @@
-"""Layout algorithm implementations for ELK."""
-from .fixed import FixedLayoutProvider
-from .spore import SporeCompactionProvider, SporeOverlapProvider
-from .rectpacking import RectPackingProvider
-from .stress import StressLayoutProvider
-from .force import ForceLayoutProvider
-from .mrtree import MrTreeLayoutProvider
-from .radial import RadialLayoutProvider
-from .layered import LayeredLayoutProvider
-
-ALGORITHM_REGISTRY = {
-    'org.eclipse.elk.fixed': FixedLayoutProvider,
-    'org.eclipse.elk.layered': LayeredLayoutProvider,
-    'org.eclipse.elk.stress': StressLayoutProvider,
-    'org.eclipse.elk.force': ForceLayoutProvider,
-    'org.eclipse.elk.mrtree': MrTreeLayoutProvider,
-    'org.eclipse.elk.radial': RadialLayoutProvider,
-    'org.eclipse.elk.sporeCompaction': SporeCompactionProvider,
-    'org.eclipse.elk.sporeOverlap': SporeOverlapProvider,
-    'org.eclipse.elk.rectpacking': RectPackingProvider,
+"""Layout algorithm implementations for ELK.
+
+Providers are registered by algorithm ID and imported on first use, so that
+``import pyelk`` does not pay for algorithms a program never runs. Provider
+instances are stateless and cached, one per algorithm.
+
+Third-party packages can add algorithms through the ``pyelk.algorithms``
+entry-point group; the entry-point name is the algorithm ID and its value
+points at the provider class::
+
+    [project.entry-points."pyelk.algorithms"]
+    "com.example.circle" = "example_layouts.circle:CircleLayoutProvider"
+"""
+import importlib
+import threading
+from typing import Any, Dict, List
+
+ENTRY_POINT_GROUP = 'pyelk.algorithms'
+
+# Algorithm ID -> provider class, or "module:attribute" to import lazily
+ALGORITHM_REGISTRY: Dict[str, Any] = {
+    'org.eclipse.elk.fixed': 'pyelk.algorithms.fixed:FixedLayoutProvider',
+    'org.eclipse.elk.layered': 'pyelk.algorithms.layered:LayeredLayoutProvider',
+    'org.eclipse.elk.stress': 'pyelk.algorithms.stress:StressLayoutProvider',
+    'org.eclipse.elk.force': 'pyelk.algorithms.force:ForceLayoutProvider',
+    'org.eclipse.elk.mrtree': 'pyelk.algorithms.mrtree:MrTreeLayoutProvider',
+    'org.eclipse.elk.radial': 'pyelk.algorithms.radial:RadialLayoutProvider',
+    'org.eclipse.elk.sporeCompaction': 'pyelk.algorithms.spore:SporeCompactionProvider',
+    'org.eclipse.elk.sporeOverlap': 'pyelk.algorithms.spore:SporeOverlapProvider',
+    'org.eclipse.elk.rectpacking': 'pyelk.algorithms.rectpacking:RectPackingProvider',
 }
 
+_providers: Dict[str, Any] = {}
+_lock = threading.Lock()
+_entry_points_loaded = False
+
+
+def register_algorithm(algorithm_id: str, provider: Any) -> None:
+    """Register a layout provider for an algorithm ID.
+
+    Args:
+        algorithm_id: Full algorithm ID, e.g. 'com.example.circle'.
+        provider: A provider class (instantiated without arguments) or a
+            'module:attribute' string naming one, imported on first use.
+    """
+    with _lock:
+        ALGORITHM_REGISTRY[algorithm_id] = provider
+        _providers.pop(algorithm_id, None)
+
+
+def load_entry_points() -> None:
+    """Register the algorithms of installed ``pyelk.algorithms`` entry points.
+
+    Only the entry-point metadata is read; the providers themselves are
+    imported on first use. Built-in algorithms cannot be overridden.
+    """
+    global _entry_points_loaded
+    if _entry_points_loaded:
+        return
+    _entry_points_loaded = True
+    from importlib.metadata import entry_points
+    eps = entry_points()
+    if hasattr(eps, 'select'):
+        eps = eps.select(group=ENTRY_POINT_GROUP)
+    else:  # Python < 3.10
+        eps = eps.get(ENTRY_POINT_GROUP, [])
+    with _lock:
+        for ep in eps:
+            ALGORITHM_REGISTRY.setdefault(ep.name, ep.value)
+
+
+def available_algorithms() -> List[str]:
+    """Return the IDs of all registered algorithms, including plugins."""
+    load_entry_points()
+    return list(ALGORITHM_REGISTRY)
+
 
 def get_layout_provider(algorithm_id: str):
-    """Get a layout provider for the given algorithm ID."""
-    if algorithm_id in ALGORITHM_REGISTRY:
-        return ALGORITHM_REGISTRY[algorithm_id]()
-    return None
+    """Get the (shared) layout provider for the given algorithm ID."""
+    provider = _providers.get(algorithm_id)
+    if provider is not None:
+        return provider
+    if algorithm_id not in ALGORITHM_REGISTRY:
+        load_entry_points()
+    with _lock:
+        provider = _providers.get(algorithm_id)
+        if provider is None:
+            spec = ALGORITHM_REGISTRY.get(algorithm_id)
+            if spec is None:
+                return None
+            provider = _resolve(spec)()
+            _providers[algorithm_id] = provider
+        return provider
+
+
+def _resolve(spec: Any) -> type:
+    """Import the provider class named by a 'module:attribute' string."""
+    if not isinstance(spec, str):
+        return spec
+    module_name, _, attr = spec.partition(':')
+    return getattr(importlib.import_module(module_name), attr)
@@ -1,6 +1,8 @@
 """Force-directed layout algorithm."""
 import math
 import random
+from ..cancellation import check_cancelled
+from ..timing import phase
 from ..options import get_padding, get_spacing
 
 
@@ -51,53 +53,57 @@ class ForceLayoutProvider:
         positions = [(c['x'] + c['width'] / 2, c['y'] + c['height'] / 2)
                      for c in children]
 
-        for iteration in range(300):
-            forces = [(0.0, 0.0)] * n
-
-            # Repulsive forces
-            for i in range(n):
-                for j in range(i + 1, n):
-                    dx = positions[i][0] - positions[j][0]
-                    dy = positions[i][1] - positions[j][1]
+        with phase('Force iterations', nodes=n, edges=len(edge_list)) as log:
+            for iteration in range(300):
+                check_cancelled()
+                forces = [(0.0, 0.0)] * n
+
+                # Repulsive forces
+                for i in range(n):
+                    for j in range(i + 1, n):
+                        dx = positions[i][0] - positions[j][0]
+                        dy = positions[i][1] - positions[j][1]
+                        dist = math.sqrt(dx * dx + dy * dy)
+                        if dist < 0.01:
+                            dist = 0.01
+                        force = k * k / dist
+                        fx = force * dx / dist
+                        fy = force * dy / dist
+                        forces[i] = (forces[i][0] + fx, forces[i][1] + fy)
+                        forces[j] = (forces[j][0] - fx, forces[j][1] - fy)
+
+                # Attractive forces
+                for si, ti in edge_list:
+                    dx = positions[si][0] - positions[ti][0]
+                    dy = positions[si][1] - positions[ti][1]
                     dist = math.sqrt(dx * dx + dy * dy)
                     if dist < 0.01:
                         dist = 0.01
-                    force = k * k / dist
+                    force = dist * dist / k
                     fx = force * dx / dist
                     fy = force * dy / dist
-                    forces[i] = (forces[i][0] + fx, forces[i][1] + fy)
-                    forces[j] = (forces[j][0] - fx, forces[j][1] - fy)
-
-            # Attractive forces
-            for si, ti in edge_list:
-                dx = positions[si][0] - positions[ti][0]
-                dy = positions[si][1] - positions[ti][1]
-                dist = math.sqrt(dx * dx + dy * dy)
-                if dist < 0.01:
-                    dist = 0.01
-                force = dist * dist / k
-                fx = force * dx / dist
-                fy = force * dy / dist
-                forces[si] = (forces[si][0] - fx, forces[si][1] - fy)
-                forces[ti] = (forces[ti][0] + fx, forces[ti][1] + fy)
-
-            # Apply forces with temperature
-            new_positions = []
-            for i in range(n):
-                fx, fy = forces[i]
-                mag = math.sqrt(fx * fx + fy * fy)
-                if mag > 0:
-                    dx = fx / mag * min(mag, temperature)
-                    dy = fy / mag * min(mag, temperature)
-                else:
-                    dx, dy = 0, 0
-                new_positions.append((positions[i][0] + dx, positions[i][1] + dy))
-
-            positions = new_positions
-            temperature *= 0.95
-
-            if temperature < 0.01:
-                break
+                    forces[si] = (forces[si][0] - fx, forces[si][1] - fy)
+                    forces[ti] = (forces[ti][0] + fx, forces[ti][1] + fy)
+
+                # Apply forces with temperature
+                new_positions = []
+                for i in range(n):
+                    fx, fy = forces[i]
+                    mag = math.sqrt(fx * fx + fy * fy)
+                    if mag > 0:
+                        dx = fx / mag * min(mag, temperature)
+                        dy = fy / mag * min(mag, temperature)
+                    else:
+                        dx, dy = 0, 0
+                    new_positions.append((positions[i][0] + dx, positions[i][1] + dy))
+
+                positions = new_positions
+                temperature *= 0.95
+
+                if temperature < 0.01:
+                    break
+            if log is not None:
+                log['iterations'] = iteration + 1
 
         # Apply positions
         min_x = min(p[0] for p in positions)
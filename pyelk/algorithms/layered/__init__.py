@@ -1,4 +1,5 @@
 """Layered (Sugiyama) layout algorithm."""
 from .layered import LayeredLayoutProvider
+from .pipeline import LayeredPipeline, LayeredState
 
-__all__ = ['LayeredLayoutProvider']
+__all__ = ['LayeredLayoutProvider', 'LayeredPipeline', 'LayeredState']
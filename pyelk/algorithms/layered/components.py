@@ -0,0 +1,90 @@
+"""Connected components of the layered algorithm's graph.
+
+With ``elk.separateConnectedComponents`` every component is laid out on its
+own, so unrelated parts of a graph do not share (and widen) layers and
+crossing minimization only ever sees one component. The laid-out components
+are then packed: in rows of bounded width, largest first, each moving up
+as far as the components placed before it allow (a skyline compaction).
+"""
+import math
+from typing import List, Sequence, Tuple
+
+from .lgraph import LGraph
+
+
+def connected_components(lg: LGraph) -> Tuple[List[List[int]], List[List[int]]]:
+    """Return the real nodes and the edges of every component.
+
+    Components are ordered by their first node, and nodes and edges keep
+    their index order within a component. Runs in O(V + E) (up to the
+    inverse Ackermann function of the union-find).
+    """
+    n = lg.real_count
+    parent = list(range(n))
+
+    def find(v: int) -> int:
+        root = v
+        while parent[root] != root:
+            root = parent[root]
+        while parent[v] != root:
+            parent[v], v = root, parent[v]
+        return root
+
+    for e in range(lg.edge_count):
+        a, b = find(lg.source[e]), find(lg.target[e])
+        if a != b:
+            parent[max(a, b)] = min(a, b)
+
+    index = [-1] * n
+    nodes: List[List[int]] = []
+    for v in range(n):
+        root = find(v)
+        if index[root] < 0:
+            index[root] = len(nodes)
+            nodes.append([])
+        nodes[index[root]].append(v)
+    edges: List[List[int]] = [[] for _ in nodes]
+    for e in range(lg.edge_count):
+        edges[index[find(lg.source[e])]].append(e)
+    return nodes, edges
+
+
+def pack_components(sizes: Sequence[Tuple[float, float]], spacing: float,
+                    aspect_ratio: float) -> List[Tuple[float, float]]:
+    """Return the top-left corner of every component box.
+
+    The rows are as wide as the widest box, or wider to approach
+    ``aspect_ratio`` (width / height) for the whole drawing.
+    """
+    area = sum((w + spacing) * (h + spacing) for w, h in sizes)
+    max_width = max(max(w for w, _ in sizes), math.sqrt(area * aspect_ratio))
+
+    order = sorted(range(len(sizes)), key=lambda i: -sizes[i][0] * sizes[i][1])
+    positions = [(0.0, 0.0)] * len(sizes)
+    # The skyline: (left, right, bottom) segments covering [0, max_width)
+    skyline = [(0.0, math.inf, 0.0)]
+    x = 0.0
+    for i in order:
+        w, h = sizes[i]
+        if x > 0 and x + w > max_width:
+            x = 0.0
+        # The box and the spacing after it must lie below the skyline
+        covered = x + w + spacing
+        y = max(bottom for left, r, bottom in skyline if left < covered and r > x)
+        positions[i] = (x, y)
+
+        # Raise the skyline over the box and its spacing
+        updated = []
+        for left, r, bottom in skyline:
+            if r <= x or left >= covered:
+                updated.append((left, r, bottom))
+                continue
+            if left < x:
+                updated.append((left, x, bottom))
+            if r > covered:
+                updated.append((covered, r, bottom))
+        updated.append((x, covered, y + h + spacing))
+        updated.sort()
+        skyline = updated
+        x = covered
+    return positions
@@ -0,0 +1,336 @@
+"""Compound graph layout for the INCLUDE_CHILDREN hierarchy handling.
+
+The layered algorithm lays out a whole hierarchy in a single call. Each
+container's children form a level, and every level is laid out exactly once.
+Inner levels come first, so a container's size is known before its parent's
+level is laid out.
+
+Edges may connect any nodes and ports of the hierarchy. Such an edge is split
+into one segment for each level it passes through.
+
+Where an edge crosses a container's border, the container's level gets an
+external port dummy. This is a node placed in an extra first layer (for
+entering edges) or an extra last layer (for leaving edges). The position of
+the dummy becomes a hierarchical port on the container's border. In the
+parent's level the container takes part as a node with these ports fixed.
+The ports of containers are treated the same way.
+
+Finally the segments of each edge are joined into one section. Its
+coordinates are relative to the container the edge is defined in.
+"""
+import itertools
+from typing import Callable, Dict, List, Optional, Tuple
+
+from ...graph import GraphIndex
+from ...options import get_direction, get_effective_options, get_option
+from ...timing import phase
+
+Point = Tuple[float, float]
+
+# Options of the hierarchy's root that do not apply to nested containers
+PADDING_KEYS = ('elk.padding', 'padding', 'org.eclipse.elk.padding')
+
+
+class _Junction:
+    """A place where edges cross the border of a container."""
+
+    __slots__ = ('container', 'port', 'port_id', 'flow', 'exit', 'dummy', 'point')
+
+    def __init__(self, container: dict, port: Optional[dict], port_id: str):
+        self.container = container
+        self.port = port          # the container's own port, None if synthetic
+        self.port_id = port_id    # the port in the parent's level
+        self.flow = 0             # segments entering minus segments leaving
+        self.exit = False         # on the border edges leave through
+        self.dummy: Optional[dict] = None  # external port dummy in the container's level
+        self.point: Point = (0.0, 0.0)     # on the border, relative to the container
+
+
+class _Segment:
+    """The part of an edge within one level."""
+
+    __slots__ = ('level', 'source', 'target', 'edge')
+
+    def __init__(self, level: dict, source, target):
+        self.level = level
+        self.source = source  # a (node, port) pair or a _Junction
+        self.target = target
+        self.edge: Optional[dict] = None  # the edge laid out in the level
+
+
+def layout_compound(layout: Callable[[dict, Optional[dict]], None], graph: dict,
+                    global_options: Optional[dict] = None) -> None:
+    """Lay out ``graph`` and all nested containers, routing every edge.
+
+    ``layout`` lays out a single level, given as a graph whose children are
+    the level's nodes.
+    """
+    index = GraphIndex(graph, normalize=False)
+    # The options of the hierarchy's root apply to every level
+    options = dict(global_options or {})
+    options.update((k, v) for k, v in get_effective_options(graph).items()
+                   if k not in PADDING_KEYS)
+
+    # Containers in post-order, and the parent of every node
+    parent: Dict[int, dict] = {}
+    containers: List[dict] = []
+    stack = [(graph, False)]
+    while stack:
+        node, done = stack.pop()
+        if done:
+            containers.append(node)
+            continue
+        stack.append((node, True))
+        for child in reversed(node.get('children', [])):
+            parent[id(child)] = node
+            if child.get('children'):
+                stack.append((child, False))
+    is_container = {id(c) for c in containers}
+
+    junctions: Dict[int, List[_Junction]] = {id(c): [] for c in containers}
+    port_junctions: Dict[int, _Junction] = {}
+    synthetic_ids = itertools.count()
+
+    def junction(container: dict, port: Optional[dict]) -> _Junction:
+        if port is not None:
+            j = port_junctions.get(id(port))
+            if j is None:
+                j = port_junctions[id(port)] = _Junction(container, port, str(port['id']))
+                junctions[id(container)].append(j)
+            return j
+        j = _Junction(container, None, f'$hierarchical_port_{next(synthetic_ids)}')
+        junctions[id(container)].append(j)
+        return j
+
+    # Every port of a container is a junction, connected or not
+    for container in containers:
+        for port in container.get('ports', []):
+            if 'id' in port:
+                junction(container, port)
+
+    def outer_end(node: dict, port: Optional[dict]):
+        """The end of a segment at ``node`` in its parent's level."""
+        if port is not None and id(node) in is_container:
+            return junction(node, port)
+        return (node, port)
+
+    # Split the edges into segments
+    chains: List[Tuple[dict, dict, List[_Segment]]] = []
+    for edge_container, edge, sources, targets in index.edges:
+        if id(edge_container) not in is_container:
+            continue
+        for src_id in sources:
+            for tgt_id in targets:
+                s, s_port = _resolve(index, src_id)
+                t, t_port = _resolve(index, tgt_id)
+                if s is None or t is None:
+                    continue
+                segments = _split(graph, parent, is_container, edge_container,
+                                  s, s_port, t, t_port, junction, outer_end)
+                if segments:
+                    chains.append((edge_container, edge, segments))
+
+    level_segments: Dict[int, List[_Segment]] = {id(c): [] for c in containers}
+    for _, edge, segments in chains:
+        for segment in segments:
+            segment.edge = {'id': edge.get('id', '')}
+            level_segments[id(segment.level)].append(segment)
+            for end, entering in ((segment.source, True), (segment.target, False)):
+                if isinstance(end, _Junction):
+                    inner = end.container is segment.level
+                    end.flow += 1 if entering == inner else -1
+
+    # Lay out the levels, innermost first
+    for container in containers:
+        _layout_level(layout, container, options, is_container, junctions,
+                      level_segments[id(container)])
+
+    # Join the segments into sections relative to the edges' containers
+    origin: Dict[int, Point] = {id(graph): (0.0, 0.0)}
+    for container in reversed(containers[:-1]):
+        ox, oy = origin[id(parent[id(container)])]
+        origin[id(container)] = (ox + container.get('x', 0.0), oy + container.get('y', 0.0))
+    sections: Dict[int, List[dict]] = {}
+    for edge_container, edge, segments in chains:
+        points = _join(segments, origin)
+        if points is None:
+            continue
+        ox, oy = origin[id(edge_container)]
+        edge_sections = sections.setdefault(id(edge), [])
+        section = {
+            'id': f"{edge.get('id', '')}_s{len(edge_sections)}",
+            'startPoint': {'x': points[0][0] - ox, 'y': points[0][1] - oy},
+            'endPoint': {'x': points[-1][0] - ox, 'y': points[-1][1] - oy},
+        }
+        if len(points) > 2:
+            section['bendPoints'] = [{'x': x - ox, 'y': y - oy} for x, y in points[1:-1]]
+        edge_sections.append(section)
+        edge['sections'] = edge_sections
+
+
+def _resolve(index: GraphIndex, element_id: str):
+    """Return ``(node, port)`` for an edge endpoint ID, None where absent."""
+    owner = index.port_owner.get(element_id)
+    if owner is not None:
+        return owner, index.ports[element_id]
+    return index.nodes.get(element_id), None
+
+
+def _split(graph, parent, is_container, edge_container, s, s_port, t, t_port,
+           junction, outer_end) -> Optional[List[_Segment]]:
+    """Split an edge from ``s`` to ``t`` into the segments of each level."""
+    def ancestors(node):
+        chain = [node]
+        while id(chain[-1]) in parent:
+            chain.append(parent[id(chain[-1])])
+        return chain
+
+    if s is t:
+        # Between ports of one node: inside it if the edge is defined there
+        if id(s) in is_container and (edge_container is s or s is graph):
+            level, inner_source = s, True
+        elif s is graph:
+            return None
+        else:
+            level, inner_source = parent[id(s)], False
+        inner_target = inner_source
+    else:
+        t_ancestors = {id(n) for n in ancestors(t)}
+        level = next(n for n in ancestors(s) if id(n) in t_ancestors)
+        inner_source, inner_target = s is level, t is level
+
+    segments = []
+    if inner_source:
+        source = junction(level, s_port)
+    else:
+        node, source = s, outer_end(s, s_port)
+        while parent[id(node)] is not level:
+            node = parent[id(node)]
+            j = junction(node, None)
+            segments.append(_Segment(node, source, j))
+            source = j
+
+    down = []
+    if inner_target:
+        target = junction(level, t_port)
+    else:
+        node, target = t, outer_end(t, t_port)
+        while parent[id(node)] is not level:
+            node = parent[id(node)]
+            j = junction(node, None)
+            down.append(_Segment(node, j, target))
+            target = j
+
+    segments.append(_Segment(level, source, target))
+    segments.extend(reversed(down))
+    return segments
+
+
+def _layout_level(layout, container: dict, options: dict,
+                  is_container, junctions: Dict[int, List[_Junction]],
+                  segments: List[_Segment]) -> None:
+    """Lay out the children of a container and place its junctions."""
+    horizontal = get_direction(container, options) in ('RIGHT', 'LEFT')
+
+    # Child containers take part with their ports fixed
+    children, copies = [], []
+    for child in container['children']:
+        if id(child) not in is_container:
+            children.append(child)
+            continue
+        copy = {k: v for k, v in child.items() if k not in ('children', 'edges', 'ports')}
+        copy['layoutOptions'] = dict(child.get('layoutOptions') or {})
+        copy['layoutOptions']['elk.portConstraints'] = 'FIXED_POS'
+        copy['ports'] = [j.port if j.port is not None else
+                         {'id': j.port_id, 'x': j.point[0], 'y': j.point[1],
+                          'width': 0.0, 'height': 0.0}
+                         for j in junctions[id(child)]]
+        children.append(copy)
+        copies.append((child, copy))
+
+    # External port dummies in a first or last layer of their own
+    exit_side = 'EAST' if horizontal else 'SOUTH'
+    for j in junctions[id(container)]:
+        side = get_option(j.port, 'elk.port.side') if j.port is not None else None
+        j.exit = j.flow < 0 or (j.flow == 0 and side == exit_side)
+        j.dummy = {
+            'id': f'$external_{j.port_id}',
+            'width': j.port.get('width', 0.0) if j.port is not None else 0.0,
+            'height': j.port.get('height', 0.0) if j.port is not None else 0.0,
+            'layoutOptions': {'elk.layered.layering.layerConstraint':
+                              'LAST_SEPARATE' if j.exit else 'FIRST_SEPARATE'},
+        }
+        children.append(j.dummy)
+
+    def end_id(end) -> str:
+        if isinstance(end, _Junction):
+            return end.dummy['id'] if end.container is container else end.port_id
+        node, port = end
+        return str((port if port is not None else node).get('id', ''))
+
+    edges = []
+    for segment in segments:
+        segment.edge['sources'] = [end_id(segment.source)]
+        segment.edge['targets'] = [end_id(segment.target)]
+        edges.append(segment.edge)
+
+    level = dict(container)
+    level['children'] = children
+    level['edges'] = edges
+    with phase(f"Level {container.get('id', '?')}", nodes=len(children), edges=len(edges)):
+        layout(level, options)
+    container['width'], container['height'] = level['width'], level['height']
+    for child, copy in copies:
+        child['x'], child['y'] = copy['x'], copy['y']
+
+    # Move the junctions onto the border, in line with their dummies
+    width, height = container['width'], container['height']
+    for j in junctions[id(container)]:
+        d = j.dummy
+        cx, cy = d['x'] + d['width'] / 2, d['y'] + d['height'] / 2
+        if horizontal:
+            j.point = (width if j.exit else 0.0, cy)
+        else:
+            j.point = (cx, height if j.exit else 0.0)
+        if j.port is not None:
+            pw, ph = j.port.get('width', 0.0), j.port.get('height', 0.0)
+            if horizontal:
+                j.port['x'], j.port['y'] = (width if j.exit else -pw), cy - ph / 2
+            else:
+                j.port['x'], j.port['y'] = cx - pw / 2, (height if j.exit else -ph)
+
+
+def _join(segments: List[_Segment], origin: Dict[int, Point]) -> Optional[List[Point]]:
+    """Return the points of an edge through its segments, relative to the root."""
+    points: List[Point] = []
+    for segment in segments:
+        sections = segment.edge.get('sections')
+        if not sections:
+            return None
+        section = sections[0]
+        route = [(p['x'], p['y']) for p in
+                 [section['startPoint']] + section.get('bendPoints', []) + [section['endPoint']]]
+        # Continue to the borders: from inside, straight on from the
+        # dummies; from outside, the ends move to the hierarchical ports
+        for end, first in ((segment.source, True), (segment.target, False)):
+            if not isinstance(end, _Junction):
+                continue
+            if end.container is segment.level:
+                route.insert(0 if first else len(route), end.point)
+            else:
+                point = (end.container['x'] + end.point[0], end.container['y'] + end.point[1])
+                route[0 if first else -1] = point
+        ox, oy = origin[id(segment.level)]
+        for x, y in route:
+            point = (x + ox, y + oy)
+            if points and points[-1] == point:
+                continue
+            # Drop points the edge runs straight through, as at most junctions
+            if len(points) >= 2:
+                (ax, ay), (bx, by) = points[-2], points[-1]
+                if ((bx - ax) * (point[1] - by) == (by - ay) * (point[0] - bx) and
+                        (bx - ax) * (point[0] - bx) + (by - ay) * (point[1] - by) > 0):
+                    points[-1] = point
+                    continue
+            points.append(point)
+    return points
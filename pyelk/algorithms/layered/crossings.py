@@ -0,0 +1,293 @@
+"""Crossing counting and layer sweeps for the layered algorithm.
+
+Crossings are counted between each pair of adjacent layers with the
+accumulator tree of Barth, Jünger and Mutzel ("Simple and Efficient Bilayer
+Cross Counting", 2004) in O(E log V): the edges are sorted by their upper and
+then their lower end, and every edge then crosses exactly the edges sorted
+before it whose lower end lies further right.
+
+The sweep functions work on plain lists so that randomized restarts can run
+in worker processes.
+"""
+import random
+import time
+from typing import List, Optional, Sequence, Tuple
+
+from ...cancellation import check_cancelled
+from .lgraph import LGraph
+
+Segment = Tuple[int, int]  # (upper node, lower node)
+# Segment offsets and the upper and lower neighbor bias of port-aware sweeps
+PortData = Tuple[List[List[Tuple[float, float]]], List[float], List[float]]
+
+# A layer sweep stops after this many forward/backward sweep pairs
+MAX_SWEEPS = 10
+
+
+def layer_segments(lg: LGraph, layer_count: int) -> List[List[Segment]]:
+    """Split every edge into its segments between adjacent layers.
+
+    Returns one list per gap: ``segments[i]`` holds the segments between
+    layers ``i`` and ``i + 1``, running through the edges' dummy nodes.
+    Self-loops and edges that do not point to a later layer are left out.
+    """
+    layer = lg.layer
+    segments: List[List[Segment]] = [[] for _ in range(max(0, layer_count - 1))]
+    for e in range(lg.edge_count):
+        s, t = lg.source[e], lg.target[e]
+        if layer[t] <= layer[s]:
+            continue
+        upper = s
+        for lower in list(lg.dummies(e)) + [t]:
+            if layer[lower] == layer[upper] + 1:
+                segments[layer[upper]].append((upper, lower))
+            upper = lower
+    return segments
+
+
+def segment_offsets(lg: LGraph, layer_count: int,
+                    port_offsets: Sequence[float]) -> List[List[Tuple[float, float]]]:
+    """Return the port offsets of the ends of every segment.
+
+    The lists are parallel to those of ``layer_segments``. An end gets its
+    port's offset from the node's center (a fraction of one position, see
+    ``ports.port_offsets``) and 0 where it has no port.
+    """
+    layer = lg.layer
+    offsets: List[List[Tuple[float, float]]] = [[] for _ in range(max(0, layer_count - 1))]
+    for e in range(lg.edge_count):
+        s, t = lg.source[e], lg.target[e]
+        if layer[t] <= layer[s]:
+            continue
+        p, q = lg.source_port[e], lg.target_port[e]
+        upper, upper_offset = s, port_offsets[p] if p >= 0 else 0.0
+        for lower in list(lg.dummies(e)) + [t]:
+            lower_offset = port_offsets[q] if lower == t and q >= 0 else 0.0
+            if layer[lower] == layer[upper] + 1:
+                offsets[layer[upper]].append((upper_offset, lower_offset))
+            upper, upper_offset = lower, 0.0
+    return offsets
+
+
+def bilayer_crossings(segments: Sequence[Segment], position: Sequence[int],
+                      lower_size: int,
+                      offsets: Optional[Sequence[Tuple[float, float]]] = None) -> int:
+    """Count the crossings among the segments between two adjacent layers.
+
+    With ``offsets`` (see ``segment_offsets``) the segments end at their
+    ports, so segments sharing a node cross where their ports demand it.
+    """
+    if len(segments) < 2:
+        return 0
+    if offsets is None:
+        # Lower positions in lexicographic order of (upper, lower) positions
+        keys = sorted(position[u] * lower_size + position[v] for u, v in segments)
+        lower_indices = [key % lower_size for key in keys]
+    else:
+        ends = sorted((position[u] + upper_offset, position[v] + lower_offset)
+                      for (u, v), (upper_offset, lower_offset) in zip(segments, offsets))
+        rank = {c: i for i, c in enumerate(sorted({lower for _, lower in ends}))}
+        lower_size = len(rank)
+        lower_indices = [rank[lower] for _, lower in ends]
+
+    first_leaf = 1
+    while first_leaf < lower_size:
+        first_leaf *= 2
+    tree = [0] * (2 * first_leaf - 1)
+    first_leaf -= 1
+
+    crossings = 0
+    for index in lower_indices:
+        index += first_leaf
+        tree[index] += 1
+        while index > 0:
+            if index % 2:  # left child: count the right sibling's entries
+                crossings += tree[index + 1]
+            index = (index - 1) // 2
+            tree[index] += 1
+    return crossings
+
+
+def count_crossings(segments: List[List[Segment]], position: Sequence[int],
+                    layers: List[List[int]],
+                    offsets: Optional[List[List[Tuple[float, float]]]] = None) -> int:
+    """Count the crossings of the whole layering."""
+    if offsets is None:
+        return sum(bilayer_crossings(gap, position, len(layers[i + 1]))
+                   for i, gap in enumerate(segments))
+    return sum(bilayer_crossings(gap, position, len(layers[i + 1]), offsets[i])
+               for i, gap in enumerate(segments))
+
+
+def segment_neighbors(segments: List[List[Segment]], node_count: int):
+    """Return every node's neighbors in the layer above and below it."""
+    upper: List[List[int]] = [[] for _ in range(node_count)]
+    lower: List[List[int]] = [[] for _ in range(node_count)]
+    for gap in segments:
+        for u, v in gap:
+            upper[v].append(u)
+            lower[u].append(v)
+    return upper, lower
+
+
+def neighbor_bias(segments: List[List[Segment]],
+                  offsets: List[List[Tuple[float, float]]], upper: List[List[int]],
+                  lower: List[List[int]]) -> Tuple[List[float], List[float]]:
+    """Return how far the ports of every node's neighbors shift its barycenters.
+
+    The first list applies to the barycenters of the neighbors in the layer
+    above, the second to those in the layer below, in positions. The ports
+    do not move during the sweeps, so the shifts stay the same.
+    """
+    node_count = len(upper)
+    upper_bias = [0.0] * node_count
+    lower_bias = [0.0] * node_count
+    for gap, gap_offsets in zip(segments, offsets):
+        for (u, v), (upper_offset, lower_offset) in zip(gap, gap_offsets):
+            upper_bias[v] += upper_offset
+            lower_bias[u] += lower_offset
+    for v in range(node_count):
+        if upper_bias[v]:
+            upper_bias[v] /= len(upper[v])
+        if lower_bias[v]:
+            lower_bias[v] /= len(lower[v])
+    return upper_bias, lower_bias
+
+
+def model_order(lg: LGraph, strategy: str) -> List[int]:
+    """Return the rank of every node in the model order of the input graph.
+
+    NODES_AND_EDGES ranks the real nodes by their order among the input
+    children and puts the dummy nodes of a long edge right after the
+    edge's source, in edge order. PREFER_EDGES ranks every node by its
+    first incoming edge in the input order, nodes without incoming edges
+    last; ties fall back to the node order.
+    """
+    if strategy == 'PREFER_EDGES':
+        # The first edge into every node; a dummy node's is its own edge
+        first_edge = [lg.edge_count] * lg.node_count
+        for e in range(lg.edge_count - 1, -1, -1):
+            for v in lg.dummies(e):
+                first_edge[v] = e
+            if lg.target[e] != lg.source[e]:
+                first_edge[lg.target[e]] = e
+        keys = [(first_edge[v], v, 0) for v in range(lg.node_count)]
+    else:
+        keys = [(v, 0, 0) for v in range(lg.node_count)]
+        for e in range(lg.edge_count):
+            for v in lg.dummies(e):
+                keys[v] = (lg.source[e], 1, e)
+
+    rank = [0] * lg.node_count
+    for i, v in enumerate(sorted(range(lg.node_count), key=keys.__getitem__)):
+        rank[v] = i
+    return rank
+
+
+def sort_by_barycenter(layer: List[int], neighbors: List[List[int]],
+                       position: List[int],
+                       tie_breaker: Optional[Sequence[int]] = None,
+                       bias: Optional[Sequence[float]] = None) -> None:
+    """Sort a layer by the barycenter of its nodes' neighbors in an adjacent layer.
+
+    Nodes without such neighbors move to the end. ``bias`` is added to
+    every node's barycenter where given. Ties keep the current order, or
+    follow ``tie_breaker`` (a rank per node) where given.
+    """
+    barycenters = []
+    for v in layer:
+        adjacent = neighbors[v]
+        if adjacent:
+            barycenter = sum(position[u] for u in adjacent) / len(adjacent)
+            barycenters.append(barycenter + bias[v] if bias is not None else barycenter)
+        else:
+            barycenters.append(float('inf'))
+
+    if tie_breaker is None:
+        order = sorted(range(len(layer)), key=barycenters.__getitem__)
+    else:
+        order = sorted(range(len(layer)),
+                       key=lambda i: (barycenters[i], tie_breaker[layer[i]]))
+    layer[:] = [layer[i] for i in order]
+    for pos, v in enumerate(layer):
+        position[v] = pos
+
+
+def layer_sweep(layers: List[List[int]], upper: List[List[int]],
+                lower: List[List[int]], segments: List[List[Segment]],
+                position: List[int], max_sweeps: int = MAX_SWEEPS,
+                tie_breaker: Optional[Sequence[int]] = None,
+                ports: Optional[PortData] = None) -> int:
+    """Reorder the layers in place with barycenter sweeps.
+
+    Alternates forward and backward sweeps until a sweep pair no longer
+    reduces the number of crossings or ``max_sweeps`` pairs ran, and keeps
+    the best ordering seen. ``position`` must hold the nodes' current
+    positions; ``tie_breaker`` is passed on to ``sort_by_barycenter``.
+    ``ports`` holds the segment offsets and the upper and lower neighbor
+    bias for port-aware sweeps. Returns the crossing count of the final
+    ordering.
+    """
+    offsets, upper_bias, lower_bias = ports if ports is not None else (None, None, None)
+    best = count_crossings(segments, position, layers, offsets)
+    best_layers = [list(layer) for layer in layers]
+
+    for _ in range(max_sweeps):
+        if not best:
+            break
+        improved = False
+        for forward in (True, False):
+            if forward:
+                for i in range(1, len(layers)):
+                    sort_by_barycenter(layers[i], upper, position, tie_breaker, upper_bias)
+            else:
+                for i in range(len(layers) - 2, -1, -1):
+                    sort_by_barycenter(layers[i], lower, position, tie_breaker, lower_bias)
+            crossings = count_crossings(segments, position, layers, offsets)
+            if crossings < best:
+                best, best_layers = crossings, [list(layer) for layer in layers]
+                improved = True
+        if not improved:
+            break
+
+    layers[:] = best_layers
+    for layer in layers:
+        for pos, v in enumerate(layer):
+            position[v] = pos
+    return best
+
+
+def randomized_sweeps(layers: List[List[int]], upper: List[List[int]],
+                      lower: List[List[int]], segments: List[List[Segment]],
+                      node_count: int, restarts: List[Tuple[int, int]],
+                      deadline: Optional[float] = None,
+                      tie_breaker: Optional[Sequence[int]] = None,
+                      ports: Optional[PortData] = None):
+    """Run ``layer_sweep`` from random orderings of the layers.
+
+    ``restarts`` lists ``(index, seed)`` pairs; each restart shuffles the
+    given layers with its seed. No restart starts after ``deadline``, a
+    ``time.monotonic()`` value: system clock changes do not move it, and
+    worker processes on the same machine share the clock. Returns
+    ``(crossings, index, layers)`` of the best restart, the lowest index
+    winning ties, or None if none ran. The given layers are not modified.
+    """
+    best = None
+    position = [0] * node_count
+    for index, seed in restarts:
+        if deadline is not None and time.monotonic() >= deadline:
+            break
+        check_cancelled()
+        rnd = random.Random(seed)
+        restart_layers = [list(layer) for layer in layers]
+        for layer in restart_layers:
+            rnd.shuffle(layer)
+            for pos, v in enumerate(layer):
+                position[v] = pos
+        crossings = layer_sweep(restart_layers, upper, lower, segments, position,
+                                tie_breaker=tie_breaker, ports=ports)
+        if best is None or (crossings, index) < best[:2]:
+            best = (crossings, index, restart_layers)
+        if not crossings:
+            break
+    return best
@@ -6,73 +6,36 @@ The algorithm proceeds in five phases:
 3. Crossing Minimization - reorder nodes within layers to minimize crossings
 4. Node Placement - assign coordinates to nodes
 5. Edge Routing - route edges between nodes
+
+All phases work on the integer-indexed ``LGraph`` (see ``lgraph.py``). They
+run as the processors of a ``LayeredPipeline`` (see ``pipeline.py``).
 """
-import math
-from collections import defaultdict
-from typing import Dict, List, Optional, Set, Tuple
-
-from ...options import (
-    get_option, get_padding, get_spacing, get_direction,
-    resolve_option_key, get_effective_options
-)
-from ...exceptions import UnsupportedConfigurationException
-
-
-class LNode:
-    """Internal node representation for layered layout."""
-
-    def __init__(self, node_id: str, width: float = 0, height: float = 0,
-                 original: dict = None, is_dummy: bool = False):
-        self.id = node_id
-        self.width = width
-        self.height = height
-        self.original = original
-        self.is_dummy = is_dummy
-        self.layer = -1
-        self.position = -1  # position within layer
-        self.x = 0.0
-        self.y = 0.0
-        self.incoming: List['LEdge'] = []
-        self.outgoing: List['LEdge'] = []
-        self.ports: List['LPort'] = []
-        self.labels: List[dict] = []
-        self.layer_constraint: Optional[str] = None
-
-
-class LPort:
-    """Internal port representation."""
-
-    def __init__(self, port_id: str, width: float = 0, height: float = 0,
-                 side: str = 'UNDEFINED', index: int = 0, original: dict = None):
-        self.id = port_id
-        self.width = width
-        self.height = height
-        self.side = side
-        self.index = index
-        self.original = original
-        self.owner: Optional[LNode] = None
-        self.x = 0.0
-        self.y = 0.0
-        self.incoming: List['LEdge'] = []
-        self.outgoing: List['LEdge'] = []
-
-
-class LEdge:
-    """Internal edge representation."""
-
-    def __init__(self, edge_id: str, source: LNode, target: LNode,
-                 source_port: LPort = None, target_port: LPort = None,
-                 original: dict = None):
-        self.id = edge_id
-        self.source = source
-        self.target = target
-        self.source_port = source_port
-        self.target_port = target_port
-        self.original = original
-        self.reversed = False
-        self.dummy_nodes: List[LNode] = []
-        self.is_self_loop = (source is target)
-        self.bend_points: List[Tuple[float, float]] = []
+import random
+import time
+from array import array
+from collections import defaultdict, deque
+from typing import Dict, List, Optional
+
+from ...options import get_option, get_padding, get_spacing, get_effective_options
+from ...exceptions import InvalidGraphException, UnsupportedConfigurationException
+from ...graph import merge_layout
+from ...parallel import shared_process_pool
+from ...timing import phase
+from .lgraph import LGraph
+from .brandes_koepf import brandes_koepf
+from .components import connected_components, pack_components
+from .compound import layout_compound
+from .crossings import (MAX_SWEEPS, count_crossings, layer_segments, layer_sweep,
+                        model_order, neighbor_bias, randomized_sweeps, segment_neighbors,
+                        segment_offsets)
+from .network_simplex import NetworkSimplex
+from .orthogonal import route_orthogonal
+from .pipeline import LayeredPipeline, LayeredState
+from .ports import assign_port_sides, order_ports, port_offsets
+
+
+# Network simplex may run thoroughness * factor * sqrt(nodes) iterations
+NETWORK_SIMPLEX_ITERATION_FACTOR = 4
 
 
 class LayeredLayoutProvider:
@@ -80,65 +43,275 @@ class LayeredLayoutProvider:
 
     def layout(self, graph: dict, global_options: dict = None) -> None:
         """Layout the graph using the layered algorithm."""
+        self.run(graph, global_options)
+
+    def pipeline(self) -> LayeredPipeline:
+        """Return a new pipeline of the default phases, free to be changed.
+
+        Subclasses registered as algorithms can override this to run their
+        own phases through ``ELK.layout``.
+        """
+        return LayeredPipeline([
+            ('Cycle breaking', self._cycle_breaking_phase),
+            ('Layer assignment', self._layer_assignment_phase),
+            ('Dummy node insertion', self._dummy_insertion_phase),
+            ('Crossing minimization', self._crossing_minimization_phase),
+            ('Node placement', self._node_placement_phase),
+            ('Edge routing', self._edge_routing_phase),
+            ('Label placement', self._label_placement_phase),
+            ('Write back', self._write_back_phase),
+        ])
+
+    def run(self, graph: dict, global_options: dict = None,
+            pipeline: Optional[LayeredPipeline] = None,
+            layering: Optional[Dict[str, int]] = None,
+            ordering: Optional[List[List[int]]] = None) -> Optional[LayeredState]:
+        """Layout the graph with ``pipeline`` (the default phases if None).
+
+        ``layering`` and ``ordering`` are a precomputed layering and
+        ordering (see ``LayeredState``); connected components are not laid
+        out separately then. Returns the final state, or None if the graph
+        has no nodes or was split into connected components.
+        """
         children = graph.get('children', [])
         if not children:
             self._set_empty_size(graph, global_options)
-            return
-
-        padding = get_padding(graph, global_options)
-        eff_options = get_effective_options(graph, global_options)
-        direction = get_direction(graph, global_options)
-
-        node_spacing = get_spacing(graph, 'elk.spacing.nodeNode', global_options, 20.0)
-        layer_spacing = get_spacing(
-            graph, 'elk.layered.spacing.nodeNodeBetweenLayers', global_options, 20.0)
-
-        # Get layering strategy
-        layering_strategy = (eff_options.get('elk.layered.layering.strategy') or
-                             eff_options.get('layering.strategy') or
-                             'LONGEST_PATH')
-
-        # Build internal graph
-        nodes, edges, node_map, port_map = self._build_internal_graph(
-            graph, eff_options, global_options)
+            return None
 
-        if not nodes:
+        state = LayeredState(graph, global_options, layering, ordering)
+        lg = state.lg = LGraph.from_graph(graph)
+        if not lg.real_count:
             self._set_empty_size(graph, global_options)
-            return
+            return None
 
         # Check for unsupported configurations
-        self._check_constraints(nodes, edges)
-
-        # Phase 1: Cycle breaking
-        self._break_cycles(nodes, edges)
-
-        # Phase 2: Layer assignment
-        self._assign_layers(nodes, edges, layering_strategy)
-
-        # Phase 3: Insert dummy nodes for long edges
-        all_nodes = list(nodes)
-        self._insert_dummy_nodes(all_nodes, edges)
-
-        # Organize nodes into layers
-        layers = self._organize_layers(all_nodes)
-
-        # Phase 4: Crossing minimization
-        self._minimize_crossings(layers)
-
-        # Phase 5: Node placement
-        horizontal = direction in ('RIGHT', 'LEFT')
-        self._place_nodes(layers, node_spacing, layer_spacing, padding, horizontal, direction)
-
-        # Phase 6: Edge routing
-        self._route_edges(edges, node_map, port_map, horizontal, direction)
-
-        # Place labels
-        self._place_labels(nodes, eff_options, global_options)
-
-        # Write back positions
-        self._write_back(graph, nodes, edges, horizontal, direction)
-
-        # Compute graph size
+        self._check_constraints(lg)
+
+        precomputed = layering is not None or ordering is not None
+        if (not precomputed and
+                str(state.eff_options.get('elk.separateConnectedComponents')).lower() == 'true'):
+            nodes, edges = connected_components(lg)
+            if len(nodes) > 1:
+                self._layout_components(graph, global_options, state.eff_options, lg,
+                                        nodes, edges, state.padding, pipeline)
+                return None
+
+        return (pipeline or self.pipeline()).run(state)
+
+    def _cycle_breaking_phase(self, state: LayeredState, log: Optional[dict]) -> None:
+        """Phase 1: make the graph acyclic.
+
+        With a precomputed layering, the edges pointing backwards in it are
+        reversed instead.
+        """
+        lg = state.lg
+        if state.layering is not None:
+            layer = self._precomputed_layers(state)
+            for e in range(lg.edge_count):
+                if layer[lg.source[e]] > layer[lg.target[e]]:
+                    lg.reverse_edge(e)
+            lg.build_adjacency()
+        else:
+            strategy = state.eff_options.get('elk.layered.cycleBreaking.strategy') or 'DEPTH_FIRST'
+            self._break_cycles(lg, strategy, state.horizontal)
+        if log is not None:
+            log.update(nodes=lg.real_count, edges=lg.edge_count,
+                       reversedEdges=sum(lg.reversed))
+
+    def _layer_assignment_phase(self, state: LayeredState, log: Optional[dict]) -> None:
+        """Phase 2: assign the nodes to layers, or take the precomputed layering."""
+        lg, eff_options = state.lg, state.eff_options
+        if log is not None:
+            log.update(nodes=lg.real_count, edges=lg.edge_count)
+        if state.layering is not None:
+            lg.layer[:lg.real_count] = self._precomputed_layers(state)
+            return
+        strategy = (eff_options.get('elk.layered.layering.strategy') or
+                    eff_options.get('layering.strategy') or
+                    'LONGEST_PATH')
+        thoroughness = int(eff_options.get('elk.layered.thoroughness') or 7)
+        layer_bound = int(eff_options.get('elk.layered.layering.coffmanGraham.layerBound') or 0)
+        self._assign_layers(lg, strategy, thoroughness, layer_bound, state.horizontal)
+
+    def _precomputed_layers(self, state: LayeredState) -> array:
+        """Return the layers of the real nodes given by ``state.layering``."""
+        lg = state.lg
+        try:
+            return array('i', (state.layering[node_id] for node_id in lg.node_ids))
+        except KeyError as missing:
+            raise InvalidGraphException(
+                f"The precomputed layering has no layer for node {missing}") from None
+
+    def _dummy_insertion_phase(self, state: LayeredState, log: Optional[dict]) -> None:
+        """Phase 3: split long edges by dummy nodes and organize the layers."""
+        lg = state.lg
+        lg.insert_dummy_nodes()
+        state.layers = lg.layers()
+        if log is not None:
+            log.update(dummyNodes=lg.node_count - lg.real_count, layers=len(state.layers))
+
+    def _crossing_minimization_phase(self, state: LayeredState, log: Optional[dict]) -> None:
+        """Phase 4: order the layers, or take the precomputed ordering."""
+        lg, layers, eff_options = state.lg, state.layers, state.eff_options
+        if log is not None:
+            log.update(nodes=lg.node_count, layers=len(layers))
+        if lg.port_ids:
+            assign_port_sides(lg, state.horizontal)
+            state.port_offsets = port_offsets(lg, state.horizontal)
+
+        if state.ordering is not None:
+            self._apply_ordering(lg, layers, state.ordering)
+            if log is not None:
+                segments = layer_segments(lg, len(layers))
+                offsets = None
+                if state.port_offsets is not None:
+                    offsets = segment_offsets(lg, len(layers), state.port_offsets)
+                state.crossings = count_crossings(segments, lg.position, layers, offsets)
+        else:
+            state.crossings = self._minimize_crossings(
+                lg, layers,
+                # Restarts only when thoroughness is set: one sweep by default
+                int(eff_options.get('elk.layered.thoroughness') or 1),
+                int(eff_options.get('elk.randomSeed', 1) or 0),
+                float(eff_options.get('elk.layered.crossingMinimization.timeLimit') or 0),
+                int(eff_options.get('elk.layered.crossingMinimization.workers') or 0),
+                eff_options.get('elk.layered.crossingMinimization.strategy') or 'LAYER_SWEEP',
+                state.horizontal,
+                eff_options.get('elk.layered.considerModelOrder.strategy') or 'NONE',
+                str(eff_options.get('elk.layered.crossingMinimization.forceNodeModelOrder')
+                    ).lower() == 'true',
+                state.port_offsets, log is not None)
+
+        if state.port_offsets is not None:
+            order_ports(lg, lg.position, state.port_offsets)
+        if log is not None and state.crossings is not None:
+            log['crossings'] = state.crossings
+
+    def _apply_ordering(self, lg: LGraph, layers: List[List[int]], ordering):
+        """Order the layers as given by a precomputed ordering."""
+        if (len(ordering) != len(layers) or
+                any(sorted(given) != layer for given, layer in zip(ordering, layers))):
+            raise InvalidGraphException(
+                "The precomputed ordering does not match the layers of the graph")
+        for layer, given in zip(layers, ordering):
+            layer[:] = given
+            for pos, v in enumerate(layer):
+                lg.position[v] = pos
+
+    def _node_placement_phase(self, state: LayeredState, log: Optional[dict]) -> None:
+        """Phase 5: assign coordinates to the nodes and place their ports."""
+        lg, graph, global_options = state.lg, state.graph, state.global_options
+        if log is not None:
+            log['nodes'] = lg.node_count
+        self._place_nodes(
+            lg, state.layers,
+            get_spacing(graph, 'elk.spacing.nodeNode', global_options, 20.0),
+            get_spacing(graph, 'elk.layered.spacing.nodeNodeBetweenLayers', global_options, 20.0),
+            state.padding, state.horizontal, state.direction,
+            state.eff_options.get('elk.layered.nodePlacement.strategy') or 'SIMPLE',
+            get_spacing(graph, 'elk.spacing.edgeNode', global_options, 10.0),
+            get_spacing(graph, 'elk.spacing.edgeEdge', global_options, 10.0))
+        for v in range(lg.real_count):
+            self._place_ports(lg, v)
+
+    def _edge_routing_phase(self, state: LayeredState, log: Optional[dict]) -> None:
+        """Phase 6: route the edges."""
+        lg, graph, global_options = state.lg, state.graph, state.global_options
+        if log is not None:
+            log['edges'] = lg.edge_count
+        if (state.eff_options.get('elk.edgeRouting') or 'POLYLINE') == 'ORTHOGONAL':
+            state.routes = route_orthogonal(
+                lg, state.layers, state.horizontal,
+                get_spacing(graph, 'elk.layered.spacing.edgeNodeBetweenLayers',
+                            global_options, 10.0),
+                get_spacing(graph, 'elk.layered.spacing.edgeEdgeBetweenLayers',
+                            global_options, 10.0))
+        else:
+            state.bend_points = self._route_edges(lg)
+        state.routed = True
+
+    def _label_placement_phase(self, state: LayeredState, log: Optional[dict]) -> None:
+        """Place the node labels."""
+        if log is not None:
+            log['nodes'] = state.lg.real_count
+        self._place_labels(state.lg, state.eff_options, state.global_options)
+
+    def _write_back_phase(self, state: LayeredState, log: Optional[dict]) -> None:
+        """Write the positions back to the graph and compute its size.
+
+        Edge sections are written only if the edges were routed.
+        """
+        lg = state.lg
+        if log is not None:
+            log.update(nodes=lg.real_count, edges=lg.edge_count)
+        self._write_back(state.graph, lg, state.bend_points, state.horizontal,
+                         state.direction, state.routes, state.routed)
+        self._compute_graph_size(state.graph, state.padding)
+
+    def layout_hierarchy(self, graph: dict, global_options: dict = None) -> None:
+        """Layout a graph and all nested containers (INCLUDE_CHILDREN)."""
+        layout_compound(self.layout, graph, global_options)
+
+    def _layout_components(self, graph, global_options, eff_options, lg: LGraph,
+                           nodes, edges, padding, pipeline=None):
+        """Layout each connected component on its own and pack them.
+
+        Components laid out in worker processes run the default pipeline.
+        """
+        spacing = get_spacing(graph, 'elk.spacing.componentComponent', global_options, 20.0)
+        aspect_ratio = float(eff_options.get('elk.aspectRatio') or 1.6)
+        workers = int(eff_options.get('elk.layered.components.workers') or 0)
+
+        # Every component is a graph of its own, without padding
+        options = {k: v for k, v in get_effective_options(graph).items()
+                   if k not in ('padding', 'elk.padding', 'org.eclipse.elk.padding')}
+        options['elk.separateConnectedComponents'] = False
+        options['elk.padding'] = '[left=0, top=0, right=0, bottom=0]'
+        components = []
+        for component_nodes, component_edges in zip(nodes, edges):
+            component_edge_list = list({id(lg.edge_originals[e]): lg.edge_originals[e]
+                                        for e in component_edges}.values())
+            components.append({
+                'id': graph.get('id', ''),
+                'layoutOptions': options,
+                'children': [lg.originals[v] for v in component_nodes],
+                'edges': component_edge_list,
+            })
+
+        with phase('Connected components', components=len(components)):
+            if workers > 0:
+                # Largest first; the children's own sub-graphs are laid out already
+                order = sorted(range(len(components)), key=lambda i: -len(nodes[i]))
+                pool = shared_process_pool(workers)
+                futures = [(i, pool.submit(_layout_component, _component_snapshot(
+                    components[i]), global_options)) for i in order]
+                try:
+                    for i, future in futures:
+                        merge_layout(components[i], future.result())
+                finally:
+                    for _, future in futures:
+                        future.cancel()
+            else:
+                for component in components:
+                    self.run(component, global_options, pipeline)
+
+        positions = pack_components([(c['width'], c['height']) for c in components],
+                                    spacing, aspect_ratio)
+        for component, (x, y) in zip(components, positions):
+            dx, dy = x + padding['left'], y + padding['top']
+            for child in component['children']:
+                child['x'] += dx
+                child['y'] += dy
+            for edge in component['edges']:
+                for section in edge.get('sections', []):
+                    for point in ([section['startPoint'], section['endPoint']] +
+                                  section.get('bendPoints', [])):
+                        point['x'] += dx
+                        point['y'] += dy
+                for label in edge.get('labels', []):
+                    if 'x' in label and 'y' in label:
+                        label['x'] += dx
+                        label['y'] += dy
         self._compute_graph_size(graph, padding)
 
     def _set_empty_size(self, graph, global_options):
@@ -146,552 +319,673 @@ class LayeredLayoutProvider:
         graph.setdefault('width', padding['left'] + padding['right'])
         graph.setdefault('height', padding['top'] + padding['bottom'])
 
-    def _build_internal_graph(self, graph, eff_options, global_options):
-        """Build internal LNode/LEdge representation from the JSON graph."""
-        nodes = []
-        node_map = {}  # id -> LNode
-        port_map = {}  # id -> LPort
-
-        for child in graph.get('children', []):
-            node_id = str(child.get('id', ''))
-            lnode = LNode(
-                node_id=node_id,
-                width=child.get('width', 0),
-                height=child.get('height', 0),
-                original=child
-            )
-
-            # Check for layer constraint
-            lc = get_option(child, 'layerConstraint')
-            if lc is None:
-                lc = get_option(child, 'elk.layered.layering.layerConstraint')
-            if lc:
-                lnode.layer_constraint = lc
-
-            # Process ports
-            for port_data in child.get('ports', []):
-                port_id = str(port_data.get('id', ''))
-                side = (get_option(port_data, 'port.side') or
-                        get_option(port_data, 'elk.port.side') or 'UNDEFINED')
-                index = int(get_option(port_data, 'port.index') or
-                            get_option(port_data, 'elk.port.index') or 0)
-                lport = LPort(
-                    port_id=port_id,
-                    width=port_data.get('width', 0),
-                    height=port_data.get('height', 0),
-                    side=side,
-                    index=index,
-                    original=port_data
-                )
-                lport.owner = lnode
-                lnode.ports.append(lport)
-                port_map[port_id] = lport
-
-            # Process labels
-            for label_data in child.get('labels', []):
-                lnode.labels.append(label_data)
-
-            nodes.append(lnode)
-            node_map[node_id] = lnode
-
-        # Build edges
-        edges = []
-        for edge_data in graph.get('edges', []):
-            edge_id = str(edge_data.get('id', ''))
-            sources = edge_data.get('sources', [])
-            targets = edge_data.get('targets', [])
-            if not sources and 'source' in edge_data:
-                sources = [str(edge_data['source'])]
-            if not targets and 'target' in edge_data:
-                targets = [str(edge_data['target'])]
-
-            for src_id in sources:
-                for tgt_id in targets:
-                    src_id = str(src_id)
-                    tgt_id = str(tgt_id)
-
-                    # Resolve source - could be node or port
-                    src_node = node_map.get(src_id)
-                    src_port = port_map.get(src_id)
-                    if src_port and not src_node:
-                        src_node = src_port.owner
-
-                    tgt_node = node_map.get(tgt_id)
-                    tgt_port = port_map.get(tgt_id)
-                    if tgt_port and not tgt_node:
-                        tgt_node = tgt_port.owner
-
-                    if src_node and tgt_node:
-                        ledge = LEdge(
-                            edge_id=edge_id,
-                            source=src_node,
-                            target=tgt_node,
-                            source_port=src_port,
-                            target_port=tgt_port,
-                            original=edge_data
-                        )
-                        src_node.outgoing.append(ledge)
-                        tgt_node.incoming.append(ledge)
-                        if src_port:
-                            src_port.outgoing.append(ledge)
-                        if tgt_port:
-                            tgt_port.incoming.append(ledge)
-                        edges.append(ledge)
-
-        return nodes, edges, node_map, port_map
-
-    def _check_constraints(self, nodes, edges):
+    def _check_constraints(self, lg: LGraph):
         """Check for unsupported configurations."""
         # Check if all nodes have FIRST layer constraint in a cycle
-        first_nodes = [n for n in nodes if n.layer_constraint == 'FIRST']
-        if len(first_nodes) >= 2:
-            # Check if they form a cycle
-            first_ids = {n.id for n in first_nodes}
-            for edge in edges:
-                if (edge.source.id in first_ids and edge.target.id in first_ids
-                        and not edge.is_self_loop):
-                    # Check if there's a cycle among FIRST nodes
-                    if self._has_cycle_among(first_nodes, edges):
-                        raise UnsupportedConfigurationException(
-                            "Cycle among nodes with FIRST layer constraint")
-
-    def _has_cycle_among(self, nodes, edges):
+        first = [v for v in range(lg.real_count) if lg.layer_constraints[v] == 'FIRST']
+        if len(first) >= 2:
+            if self._has_cycle_among(lg, set(first)):
+                raise UnsupportedConfigurationException(
+                    "Cycle among nodes with FIRST layer constraint")
+
+    def _has_cycle_among(self, lg: LGraph, nodes):
         """Check if there's a cycle among the given nodes."""
-        node_ids = {n.id for n in nodes}
         # Build subgraph adjacency
         adj = defaultdict(list)
-        for edge in edges:
-            if edge.source.id in node_ids and edge.target.id in node_ids:
-                if not edge.is_self_loop:
-                    adj[edge.source.id].append(edge.target.id)
-
-        # DFS cycle detection
-        WHITE, GRAY, BLACK = 0, 1, 2
-        color = {nid: WHITE for nid in node_ids}
-
-        def dfs(u):
-            color[u] = GRAY
+        in_degree = dict.fromkeys(nodes, 0)
+        for e in range(lg.edge_count):
+            s, t = lg.source[e], lg.target[e]
+            if s in nodes and t in nodes and s != t:
+                adj[s].append(t)
+                in_degree[t] += 1
+
+        # The nodes are acyclic iff a topological sort reaches all of them
+        queue = [v for v in nodes if not in_degree[v]]
+        for u in queue:  # grows while iterating
             for v in adj[u]:
-                if color[v] == GRAY:
-                    return True
-                if color[v] == WHITE and dfs(v):
-                    return True
-            color[u] = BLACK
-            return False
-
-        for nid in node_ids:
-            if color[nid] == WHITE:
-                if dfs(nid):
-                    return True
-        return False
-
-    def _break_cycles(self, nodes, edges):
-        """Break cycles using DFS-based approach."""
+                in_degree[v] -= 1
+                if not in_degree[v]:
+                    queue.append(v)
+        return len(queue) < len(nodes)
+
+    def _break_cycles(self, lg: LGraph, strategy='DEPTH_FIRST', horizontal=False):
+        """Make the graph acyclic by reversing edges, then build its adjacency.
+
+        INTERACTIVE first reverses the edges pointing backwards in the input
+        coordinates, then the back edges of the cycles that remain.
+        """
+        if strategy == 'INTERACTIVE':
+            start = self._input_coordinates(lg, horizontal)[0]
+            for e in range(lg.edge_count):
+                if start[lg.source[e]] > start[lg.target[e]]:
+                    lg.reverse_edge(e)
+        lg.build_adjacency()
+        if strategy == 'GREEDY':
+            reversed_edges = self._greedy_feedback_arcs(lg)
+        else:
+            reversed_edges = self._depth_first_back_edges(lg)
+        for e in reversed_edges:
+            lg.reverse_edge(e)
+        lg.build_adjacency()
+
+    def _depth_first_back_edges(self, lg: LGraph) -> List[int]:
+        """Return the back edges of a depth-first search."""
         WHITE, GRAY, BLACK = 0, 1, 2
-        color = {n.id: WHITE for n in nodes}
+        color = bytearray(lg.node_count)
+        out_offsets, out_edges, target = lg.out_offsets, lg.out_edges, lg.target
 
-        # Build adjacency (excluding self-loops)
-        adj = defaultdict(list)
-        edge_map = {}
-        for edge in edges:
-            if not edge.is_self_loop:
-                adj[edge.source.id].append(edge.target.id)
-                edge_map[(edge.source.id, edge.target.id)] = edge
-
-        def dfs(u):
-            color[u] = GRAY
-            for v in adj[u]:
+        back_edges = []
+        for root in range(lg.real_count):
+            if color[root] != WHITE:
+                continue
+            color[root] = GRAY
+            # Stack of (node, index of the next out-edge to follow)
+            stack = [(root, out_offsets[root])]
+            while stack:
+                u, k = stack[-1]
+                if k == out_offsets[u + 1]:
+                    color[u] = BLACK
+                    stack.pop()
+                    continue
+                stack[-1] = (u, k + 1)
+                e = out_edges[k]
+                v = target[e]
                 if color[v] == GRAY:
-                    # Back edge - reverse it
-                    edge = edge_map.get((u, v))
-                    if edge:
-                        self._reverse_edge(edge)
+                    back_edges.append(e)
                 elif color[v] == WHITE:
-                    dfs(v)
-            color[u] = BLACK
-
-        for node in nodes:
-            if color[node.id] == WHITE:
-                dfs(node.id)
-
-    def _reverse_edge(self, edge):
-        """Reverse an edge."""
-        # Remove from current source/target
-        if edge in edge.source.outgoing:
-            edge.source.outgoing.remove(edge)
-        if edge in edge.target.incoming:
-            edge.target.incoming.remove(edge)
-
-        # Swap
-        edge.source, edge.target = edge.target, edge.source
-        edge.source_port, edge.target_port = edge.target_port, edge.source_port
-
-        # Add to new source/target
-        edge.source.outgoing.append(edge)
-        edge.target.incoming.append(edge)
-        edge.reversed = not edge.reversed
-
-    def _assign_layers(self, nodes, edges, strategy='LONGEST_PATH'):
+                    color[v] = GRAY
+                    stack.append((v, out_offsets[v]))
+        return back_edges
+
+    def _greedy_feedback_arcs(self, lg: LGraph) -> List[int]:
+        """Return the edges against the node order of Eades, Lin and Smyth.
+
+        Sinks are repeatedly moved to the back of the order and sources to
+        the front; when neither is left, the node with the largest
+        difference of out- and in-degree goes to the front. The nodes that
+        are neither sources nor sinks are kept in buckets by that
+        difference, doubly linked for O(1) moves, which makes this O(V + E).
+        """
+        n = lg.real_count
+        out_offsets, out_edges, in_offsets, in_edges = (
+            lg.out_offsets, lg.out_edges, lg.in_offsets, lg.in_edges)
+        source, target = lg.source, lg.target
+        out_degree = [out_offsets[v + 1] - out_offsets[v] for v in range(n)]
+        in_degree = [in_offsets[v + 1] - in_offsets[v] for v in range(n)]
+
+        offset = max(max(out_degree, default=0), max(in_degree, default=0))
+        head = [-1] * (2 * offset + 1)  # first node of every bucket
+        next_node = [-1] * n
+        prev_node = [-1] * n
+        bucket = [-1] * n  # bucket index, -1 if not in a bucket
+        top = -1  # no bucket above is occupied
+
+        def insert(v):
+            nonlocal top
+            b = out_degree[v] - in_degree[v] + offset
+            bucket[v] = b
+            next_node[v], prev_node[v] = head[b], -1
+            if head[b] >= 0:
+                prev_node[head[b]] = v
+            head[b] = v
+            top = max(top, b)
+
+        def unlink(v):
+            b = bucket[v]
+            if prev_node[v] >= 0:
+                next_node[prev_node[v]] = next_node[v]
+            else:
+                head[b] = next_node[v]
+            if next_node[v] >= 0:
+                prev_node[next_node[v]] = prev_node[v]
+            bucket[v] = -1
+
+        sinks, sources = deque(), deque()
+        for v in range(n):
+            if not out_degree[v]:
+                sinks.append(v)
+            elif not in_degree[v]:
+                sources.append(v)
+            else:
+                insert(v)
+
+        removed = bytearray(n)
+        front, back = [], []
+
+        def remove(v):
+            removed[v] = 1
+            for k in range(out_offsets[v], out_offsets[v + 1]):
+                w = target[out_edges[k]]
+                if removed[w]:
+                    continue
+                in_degree[w] -= 1
+                if bucket[w] >= 0:
+                    unlink(w)
+                    if in_degree[w]:
+                        insert(w)
+                    else:
+                        sources.append(w)
+            for k in range(in_offsets[v], in_offsets[v + 1]):
+                u = source[in_edges[k]]
+                if removed[u]:
+                    continue
+                out_degree[u] -= 1
+                if bucket[u] >= 0:
+                    unlink(u)
+                    if out_degree[u]:
+                        insert(u)
+                    else:
+                        sinks.append(u)
+
+        remaining = n
+        while remaining:
+            if sinks:
+                v = sinks.popleft()
+                back.append(v)
+            elif sources:
+                v = sources.popleft()
+                front.append(v)
+            else:
+                while head[top] < 0:
+                    top -= 1
+                v = head[top]
+                unlink(v)
+                front.append(v)
+            if removed[v]:
+                continue
+            remove(v)
+            remaining -= 1
+
+        rank = [0] * n
+        for i, v in enumerate(front + back[::-1]):
+            rank[v] = i
+        return [e for e in range(lg.edge_count)
+                if source[e] != target[e] and rank[source[e]] > rank[target[e]]]
+
+    def _assign_layers(self, lg: LGraph, strategy='LONGEST_PATH', thoroughness=7,
+                       layer_bound=0, horizontal=False):
         """Assign nodes to layers."""
-        if strategy == 'NETWORK_SIMPLEX':
-            self._network_simplex_layering(nodes, edges)
+        if strategy == 'INTERACTIVE':
+            self._interactive_layering(lg, horizontal)
+        elif strategy == 'NETWORK_SIMPLEX':
+            self._network_simplex_layering(lg, thoroughness)
         elif strategy == 'COFFMAN_GRAHAM':
-            self._coffman_graham_layering(nodes, edges)
+            self._coffman_graham_layering(lg, layer_bound)
         else:
-            self._longest_path_layering(nodes, edges)
+            self._longest_path_layering(lg)
 
         # Apply layer constraints
-        self._apply_layer_constraints(nodes)
+        self._apply_layer_constraints(lg)
+
+    def _input_coordinates(self, lg: LGraph, horizontal):
+        """Return the input positions of the real nodes for interactive layout.
+
+        Returns the start of every node in the layer direction (x for RIGHT
+        and LEFT, y otherwise) and the center of every node within its
+        layer. Missing coordinates count as 0.
+        """
+        across, along = ('x', 'y') if horizontal else ('y', 'x')
+        along_size = lg.height if horizontal else lg.width
+        start, center = [], []
+        for v, original in enumerate(lg.originals):
+            start.append(original.get(across) or 0.0)
+            center.append((original.get(along) or 0.0) + along_size[v] / 2)
+        return start, center
+
+    def _interactive_layering(self, lg: LGraph, horizontal):
+        """Layer the nodes by their input positions.
+
+        Nodes whose extents in the layer direction overlap share a layer.
+        Edges that would not point to a later layer push their targets
+        forward, and layers left empty are dropped.
+        """
+        n = lg.real_count
+        start = self._input_coordinates(lg, horizontal)[0]
+        extent = lg.width if horizontal else lg.height
+        layer = lg.layer
+
+        current, end = -1, None
+        for v in sorted(range(n), key=start.__getitem__):
+            if end is None or start[v] >= end:
+                current += 1
+                end = start[v] + extent[v]
+            else:
+                end = max(end, start[v] + extent[v])
+            layer[v] = current
+
+        # Push targets forward in topological order
+        out_offsets, out_edges, target = lg.out_offsets, lg.out_edges, lg.target
+        in_degree = [0] * n
+        for e in range(lg.edge_count):
+            if lg.source[e] != target[e]:
+                in_degree[target[e]] += 1
+        queue = [v for v in range(n) if not in_degree[v]]
+        for v in queue:
+            for i in range(out_offsets[v], out_offsets[v + 1]):
+                t = target[out_edges[i]]
+                if t == v:
+                    continue
+                if layer[t] <= layer[v]:
+                    layer[t] = layer[v] + 1
+                in_degree[t] -= 1
+                if not in_degree[t]:
+                    queue.append(t)
+
+        used = {li: i for i, li in enumerate(sorted(set(layer[v] for v in range(n))))}
+        for v in range(n):
+            layer[v] = used[layer[v]]
 
-    def _longest_path_layering(self, nodes, edges):
+    def _longest_path_layering(self, lg: LGraph):
         """Longest path layering (default)."""
+        n = lg.real_count
+        out_offsets, out_edges, target = lg.out_offsets, lg.out_edges, lg.target
+
         # Compute in-degree (excluding self-loops)
-        in_degree = {n.id: 0 for n in nodes}
-        for edge in edges:
-            if not edge.is_self_loop:
-                in_degree[edge.target.id] += 1
+        in_degree = [lg.in_offsets[v + 1] - lg.in_offsets[v] for v in range(n)]
 
         # Topological sort
-        queue = [n for n in nodes if in_degree[n.id] == 0]
+        queue = deque(v for v in range(n) if in_degree[v] == 0)
         order = []
         while queue:
-            node = queue.pop(0)
-            order.append(node)
-            for edge in node.outgoing:
-                if not edge.is_self_loop:
-                    in_degree[edge.target.id] -= 1
-                    if in_degree[edge.target.id] == 0:
-                        queue.append(edge.target)
-
-        # Handle any remaining nodes (shouldn't happen after cycle breaking)
-        remaining = set(n.id for n in nodes) - set(n.id for n in order)
-        for node in nodes:
-            if node.id in remaining:
-                order.append(node)
-
-        # Assign layers based on longest path
-        layer_of = {}
-        for node in reversed(order):
-            max_target_layer = -1
-            for edge in node.outgoing:
-                if not edge.is_self_loop and edge.target.id in layer_of:
-                    max_target_layer = max(max_target_layer, layer_of[edge.target.id])
-            layer_of[node.id] = max_target_layer + 1
-
-        # Normalize layers (start from 0)
-        if layer_of:
-            max_layer = max(layer_of.values())
-            for node in nodes:
-                node.layer = max_layer - layer_of.get(node.id, 0)
-
-    def _network_simplex_layering(self, nodes, edges):
-        """Network simplex layering - produces optimal layer assignment."""
-        # Use longest path as initial feasible solution
-        self._longest_path_layering(nodes, edges)
-
-        # Network simplex optimization
-        non_self_edges = [e for e in edges if not e.is_self_loop]
-
-        for _ in range(50):  # max iterations
-            improved = False
-
-            for edge in non_self_edges:
-                slack = edge.target.layer - edge.source.layer - 1
-                if slack < 0:
-                    # Infeasible - fix
-                    edge.target.layer = edge.source.layer + 1
-                    improved = True
-
-            # Try to reduce total edge length by moving nodes
-            for node in nodes:
-                if not node.incoming and not node.outgoing:
-                    continue
-
-                target_layers = [e.target.layer for e in node.outgoing if not e.is_self_loop]
-                source_layers = [e.source.layer for e in node.incoming if not e.is_self_loop]
-
-                if target_layers:
-                    min_target = min(target_layers)
-                    ideal = min_target - 1
-                elif source_layers:
-                    max_source = max(source_layers)
-                    ideal = max_source + 1
-                else:
-                    continue
-
-                # Check if moving to ideal layer is feasible
-                feasible = True
-                for e in node.incoming:
-                    if not e.is_self_loop and e.source.layer >= ideal:
-                        feasible = False
-                        break
-                if feasible:
-                    for e in node.outgoing:
-                        if not e.is_self_loop and e.target.layer <= ideal:
-                            feasible = False
-                            break
-
-                if feasible and ideal != node.layer:
-                    node.layer = ideal
-                    improved = True
-
-            if not improved:
-                break
-
-        # Normalize
-        if nodes:
-            min_layer = min(n.layer for n in nodes)
-            for n in nodes:
-                n.layer -= min_layer
-
-    def _coffman_graham_layering(self, nodes, edges):
-        """Coffman-Graham layering."""
-        # Use longest path as base
-        self._longest_path_layering(nodes, edges)
-
-    def _apply_layer_constraints(self, nodes):
-        """Apply FIRST/LAST layer constraints."""
-        if not nodes:
-            return
-
-        min_layer = min(n.layer for n in nodes)
-        max_layer = max(n.layer for n in nodes)
-
-        for node in nodes:
-            if node.layer_constraint == 'FIRST':
-                node.layer = min_layer
-            elif node.layer_constraint == 'LAST':
-                node.layer = max_layer
-
-    def _insert_dummy_nodes(self, all_nodes, edges):
-        """Insert dummy nodes for edges spanning multiple layers."""
-        dummy_counter = 0
-        edges_to_process = list(edges)
-
-        for edge in edges_to_process:
-            if edge.is_self_loop:
-                continue
-
-            span = edge.target.layer - edge.source.layer
-            if span <= 1:
-                continue
-
-            # Insert dummy nodes
-            prev_node = edge.source
-            for i in range(1, span):
-                dummy_id = f"_dummy_{dummy_counter}"
-                dummy_counter += 1
-                dummy = LNode(
-                    node_id=dummy_id,
-                    width=0,
-                    height=0,
-                    is_dummy=True
-                )
-                dummy.layer = edge.source.layer + i
-                all_nodes.append(dummy)
-                edge.dummy_nodes.append(dummy)
-                prev_node = dummy
-
-    def _organize_layers(self, all_nodes):
-        """Organize nodes into layers."""
-        if not all_nodes:
-            return []
-        max_layer = max(n.layer for n in all_nodes)
-        layers = [[] for _ in range(max_layer + 1)]
-        for node in all_nodes:
-            if 0 <= node.layer <= max_layer:
-                layers[node.layer].append(node)
-        return layers
-
-    def _minimize_crossings(self, layers):
-        """Minimize edge crossings using the barycenter method."""
-        if len(layers) <= 1:
-            return
-
-        # Forward sweep
-        for i in range(1, len(layers)):
-            self._sort_layer_by_barycenter(layers[i], layers[i - 1], forward=True)
-
-        # Backward sweep
-        for i in range(len(layers) - 2, -1, -1):
-            self._sort_layer_by_barycenter(layers[i], layers[i + 1], forward=False)
-
-        # Assign positions
+            u = queue.popleft()
+            order.append(u)
+            for k in range(out_offsets[u], out_offsets[u + 1]):
+                v = target[out_edges[k]]
+                in_degree[v] -= 1
+                if in_degree[v] == 0:
+                    queue.append(v)
+
+        # Assign layers based on longest path to a sink
+        height = [0] * n
+        for u in reversed(order):
+            h = 0
+            for k in range(out_offsets[u], out_offsets[u + 1]):
+                h = max(h, height[target[out_edges[k]]] + 1)
+            height[u] = h
+
+        # Normalize layers (sources first, starting from 0)
+        max_layer = max(height)
+        layer = lg.layer
+        for v in range(n):
+            layer[v] = max_layer - height[v]
+
+    def _network_simplex_layering(self, lg: LGraph, thoroughness: int = 7):
+        """Network simplex layering - minimizes the total edge length."""
+        # Merge parallel edges into weighted ones
+        weights = {}
+        for e in range(lg.edge_count):
+            s, t = lg.source[e], lg.target[e]
+            if s != t:
+                weights[(s, t)] = weights.get((s, t), 0) + 1
+        n = lg.real_count
+        solver = NetworkSimplex(n, [s for s, _ in weights], [t for _, t in weights],
+                                list(weights.values()))
+        iteration_limit = thoroughness * NETWORK_SIMPLEX_ITERATION_FACTOR * max(1, int(n ** 0.5))
+
+        # Start from the longest path layering, which needs far fewer
+        # exchanges than a fresh ranking, and keep it should the iteration
+        # limit stop the solver before it caught up
+        self._longest_path_layering(lg)
+        initial = lg.layer[:n]
+        with phase('Network simplex', nodes=n, edges=len(weights)) as log:
+            ranks = solver.solve(iteration_limit, initial)
+            if log is not None:
+                log['iterations'] = solver.iterations
+
+        def total_length(rank):
+            return sum(w * (rank[t] - rank[s]) for (s, t), w in weights.items())
+
+        if total_length(ranks) <= total_length(initial):
+            lg.layer[:n] = ranks
+
+    def _coffman_graham_layering(self, lg: LGraph, layer_bound: int = 0):
+        """Coffman-Graham layering with at most ``layer_bound`` real nodes per layer.
+
+        Nodes are first labeled in a topological order that prefers nodes
+        whose predecessors' labels, sorted descending, are lexicographically
+        smallest. They are then placed from the sinks upwards in decreasing
+        label order, each into the lowest layer above all its successors that
+        still has room. A bound of 0 means unbounded, which yields the
+        longest path layering.
+
+        The labeling groups every node's successors by their label sequences
+        in one pass over its edges and orders only the distinct groups, so it
+        takes O(V + E) time plus O(k log k) for the k groups of each node;
+        that stays linear unless the successors of many nodes are spread over
+        many groups. The graph is not transitively reduced first.
+        """
+        n = lg.real_count
+        out_offsets, out_edges, target = lg.out_offsets, lg.out_edges, lg.target
+        in_degree = [lg.in_offsets[v + 1] - lg.in_offsets[v] for v in range(n)]
+
+        # Labeling. A node becomes ready when its last predecessor is labeled,
+        # so its label sequence then starts with the newest (largest) label
+        # and it sorts after every node that is ready already: the ready nodes
+        # form a queue. Nodes readied by the same label are ordered by their
+        # older labels, tracked as buckets of nodes with equal sequences that
+        # are split whenever a label is added to some of their members.
+        # Buckets are numbered in sequence order, and a node without labeled
+        # predecessors is in bucket -1.
+        bucket = [-1] * n
+        next_bucket = 0
+        order = []
+        ready = deque(v for v in range(n) if in_degree[v] == 0)
+        while ready:
+            u = ready.popleft()
+            order.append(u)
+            groups = {}
+            for k in range(out_offsets[u], out_offsets[u + 1]):
+                v = target[out_edges[k]]
+                in_degree[v] -= 1
+                groups.setdefault(bucket[v], []).append(v)
+            for old in sorted(groups):
+                next_bucket += 1
+                for v in groups[old]:
+                    if bucket[v] == next_bucket:
+                        continue  # a parallel edge listed v already
+                    bucket[v] = next_bucket
+                    if in_degree[v] == 0:
+                        ready.append(v)
+
+        # Layering from the sinks upwards. next_open finds the lowest layer at
+        # or above a given one with room, skipping full layers union-find style.
+        level = [0] * n
+        size = []
+        next_open = []
+
+        def find_open(i):
+            root = i
+            while root < len(size) and next_open[root] != root:
+                root = next_open[root]
+            while i < len(size) and next_open[i] != i:
+                next_open[i], i = root, next_open[i]
+            return root
+
+        for u in reversed(order):
+            lowest = 0
+            for k in range(out_offsets[u], out_offsets[u + 1]):
+                lowest = max(lowest, level[target[out_edges[k]]] + 1)
+            i = find_open(lowest) if layer_bound > 0 else lowest
+            while len(size) <= i:
+                size.append(0)
+                next_open.append(len(next_open))
+            level[u] = i
+            size[i] += 1
+            if layer_bound > 0 and size[i] >= layer_bound:
+                next_open[i] = i + 1
+
+        # Layers are numbered from the sources
+        max_level = max(level)
+        layer = lg.layer
+        for v in range(n):
+            layer[v] = max_level - level[v]
+
+    def _apply_layer_constraints(self, lg: LGraph):
+        """Apply FIRST/LAST layer constraints.
+
+        FIRST_SEPARATE and LAST_SEPARATE nodes get a layer of their own
+        before the first and after the last layer of the other nodes. Layers
+        left empty are dropped, and edges that point backwards afterwards are
+        reversed. Edges between nodes of one layer stay as they are.
+        """
+        layer = lg.layer
+        constraints = lg.layer_constraints
+        others = [layer[v] for v in range(lg.real_count)
+                  if constraints[v] not in ('FIRST_SEPARATE', 'LAST_SEPARATE')]
+        min_layer = min(others, default=0)
+        max_layer = max(others, default=0)
+
+        for v, constraint in enumerate(constraints):
+            if constraint == 'FIRST':
+                layer[v] = min_layer
+            elif constraint == 'LAST':
+                layer[v] = max_layer
+            elif constraint == 'FIRST_SEPARATE':
+                layer[v] = min_layer - 1
+            elif constraint == 'LAST_SEPARATE':
+                layer[v] = max_layer + 1
+
+        # Moved nodes can leave layers empty; number the rest densely
+        dense = {li: i for i, li in enumerate(sorted(set(layer[:lg.real_count])))}
+        for v in range(lg.real_count):
+            layer[v] = dense[layer[v]]
+
+        backwards = [e for e in range(lg.edge_count) if layer[lg.source[e]] > layer[lg.target[e]]]
+        for e in backwards:
+            lg.reverse_edge(e)
+        if backwards:
+            lg.build_adjacency()
+
+    def _minimize_crossings(self, lg: LGraph, layers: List[List[int]], thoroughness=1,
+                            seed=1, time_limit=0.0, workers=0, strategy='LAYER_SWEEP',
+                            horizontal=False, model_order_strategy='NONE',
+                            force_model_order=False, offsets=None, count=True) -> int:
+        """Minimize edge crossings using the barycenter method.
+
+        The layers are swept from their current order and, if ``thoroughness``
+        is above 1, from ``thoroughness - 1`` further random orders seeded by
+        ``seed``; the ordering with the fewest crossings wins. No restart
+        starts after ``time_limit`` milliseconds (0 for no limit). With
+        ``workers`` above 0 the random restarts run in that many processes.
+
+        INTERACTIVE orders the layers by the nodes' input positions instead
+        and runs a single sweep pair from there, without restarts, so the
+        previous order is kept unless a sweep removes crossings.
+
+        A ``model_order_strategy`` other than NONE orders the layers by the
+        model order of the input graph first (see ``model_order``) and lets
+        it break barycenter ties; with ``force_model_order`` the model order
+        is kept and no sweep runs. Its crossings are then only counted with
+        ``count``, otherwise 0 is returned.
+
+        ``offsets`` holds the ports' offsets from their owners' centers (see
+        ``port_offsets``) for port-aware barycenters. Returns the crossing
+        count.
+        """
+        interactive = strategy == 'INTERACTIVE'
+        tie_breaker = None
+        if model_order_strategy != 'NONE':
+            tie_breaker = model_order(lg, model_order_strategy)
+            if not interactive:
+                for layer in layers:
+                    layer.sort(key=tie_breaker.__getitem__)
+        if interactive:
+            self._sort_by_input_positions(lg, layers, horizontal)
+
+        position = lg.position
         for layer in layers:
-            for pos, node in enumerate(layer):
-                node.position = pos
-
-    def _sort_layer_by_barycenter(self, layer, ref_layer, forward=True):
-        """Sort nodes in a layer by barycenter of connected nodes in reference layer."""
-        ref_positions = {n.id: i for i, n in enumerate(ref_layer)}
-
-        barycenters = {}
-        for node in layer:
-            positions = []
-            if forward:
-                for edge in node.incoming:
-                    if not edge.is_self_loop:
-                        pos = ref_positions.get(edge.source.id)
-                        if pos is not None:
-                            positions.append(pos)
+            for pos, v in enumerate(layer):
+                position[v] = pos
+
+        forced = force_model_order and tie_breaker is not None
+        if len(layers) <= 1 or (forced and not count):
+            return 0
+
+        segments = layer_segments(lg, len(layers))
+        ports = None
+        if offsets is not None:
+            ports = (segment_offsets(lg, len(layers), offsets),)
+        if forced:
+            return count_crossings(segments, position, layers, ports and ports[0])
+
+        deadline = time.monotonic() + time_limit / 1000 if time_limit > 0 else None
+        upper, lower = segment_neighbors(segments, lg.node_count)
+        if ports is not None:
+            ports += neighbor_bias(segments, ports[0], upper, lower)
+        rnd = random.Random(seed)
+        # An interactive run keeps to the previous order: no restarts, one sweep pair
+        restarts = ([] if interactive else
+                    [(i, rnd.getrandbits(32)) for i in range(1, thoroughness)])
+        args = ([list(layer) for layer in layers], upper, lower, segments, lg.node_count)
+
+        futures = None
+        if workers > 0 and restarts:
+            # One task per worker, so the graph is sent to each worker once
+            pool = shared_process_pool(workers)
+            futures = [pool.submit(randomized_sweeps, *args, restarts[i::workers], deadline,
+                                   tie_breaker, ports)
+                       for i in range(min(workers, len(restarts)))]
+        try:
+            best = layer_sweep(layers, upper, lower, segments, position,
+                               1 if interactive else MAX_SWEEPS, tie_breaker, ports)
+            if futures:
+                results = [future.result() for future in futures]
+            elif best:
+                results = [randomized_sweeps(*args, restarts, deadline, tie_breaker, ports)]
             else:
-                for edge in node.outgoing:
-                    if not edge.is_self_loop:
-                        pos = ref_positions.get(edge.target.id)
-                        if pos is not None:
-                            positions.append(pos)
-
-            if positions:
-                barycenters[node.id] = sum(positions) / len(positions)
-            else:
-                barycenters[node.id] = float('inf')
-
-        layer.sort(key=lambda n: barycenters.get(n.id, float('inf')))
+                results = []
+        finally:
+            for future in futures or ():
+                future.cancel()
+
+        # The sweep from the current order wins ties
+        best_result = min((r for r in results if r is not None), default=None,
+                          key=lambda r: r[:2])
+        if best_result is not None and best_result[0] < best:
+            best = best_result[0]
+            layers[:] = best_result[2]
+            for layer in layers:
+                for pos, v in enumerate(layer):
+                    position[v] = pos
+        return best
+
+    def _sort_by_input_positions(self, lg: LGraph, layers: List[List[int]], horizontal):
+        """Sort every layer by the nodes' input centers within the layers.
+
+        A dummy node takes the point where its edge's input route crosses
+        the start line of the dummy's layer (where dummy nodes are placed),
+        or lies on the line between the edge's ends if the edge has no
+        route there.
+        """
+        start, center = self._input_coordinates(lg, horizontal)
+        across, along = ('x', 'y') if horizontal else ('y', 'x')
+        layer_of = lg.layer
+
+        # The start line of every layer that holds real nodes
+        layer_start: List[Optional[float]] = [None] * len(layers)
+        for v in range(lg.real_count):
+            li = layer_of[v]
+            if layer_start[li] is None or start[v] < layer_start[li]:
+                layer_start[li] = start[v]
+
+        center.extend([0.0] * (lg.node_count - lg.real_count))
+        for e in range(lg.edge_count):
+            s, t = lg.source[e], lg.target[e]
+            span = layer_of[t] - layer_of[s]
+            route = []
+            for section in lg.edge_originals[e].get('sections') or ():
+                points = ([section.get('startPoint')] + list(section.get('bendPoints') or ()) +
+                          [section.get('endPoint')])
+                route.extend((p.get(along, 0.0), p.get(across, 0.0)) for p in points if p)
+            for i, d in enumerate(lg.dummies(e), 1):
+                line = layer_start[layer_of[d]]
+                position = _route_position(route, line) if line is not None else None
+                if position is None:
+                    position = center[s] + (center[t] - center[s]) * i / span
+                center[d] = position
+        for layer in layers:
+            layer.sort(key=center.__getitem__)
 
-    def _place_nodes(self, layers, node_spacing, layer_spacing, padding,
-                     horizontal, direction):
+    def _place_nodes(self, lg: LGraph, layers, node_spacing, layer_spacing,
+                     padding, horizontal, direction, strategy='SIMPLE',
+                     edge_node_spacing=10.0, edge_edge_spacing=10.0):
         """Place nodes, assigning x/y coordinates."""
         if not layers:
             return
 
+        # For RIGHT: layers go left-to-right, nodes go top-to-bottom.
+        # For DOWN: layers go top-to-bottom, nodes go left-to-right.
         if horizontal:
-            self._place_horizontal(layers, node_spacing, layer_spacing, padding, direction)
+            along, across, along_pos, across_pos = lg.height, lg.width, lg.y, lg.x
+            along_start, across_start = padding['top'], padding['left']
         else:
-            self._place_vertical(layers, node_spacing, layer_spacing, padding, direction)
-
-    def _place_vertical(self, layers, node_spacing, layer_spacing, padding, direction):
-        """Place nodes for DOWN/UP direction."""
-        # For DOWN: layers go top-to-bottom, nodes go left-to-right
-        # Compute max width per layer first for centering
-        layer_widths = []
-        for layer in layers:
-            total_width = sum(n.width for n in layer)
-            total_width += node_spacing * max(len(layer) - 1, 0)
-            layer_widths.append(total_width)
-
-        max_width = max(layer_widths) if layer_widths else 0
-
-        current_y = padding['top']
-        for li, layer in enumerate(layers):
-            # Center nodes within max_width
-            total_width = layer_widths[li]
-            start_x = padding['left'] + (max_width - total_width) / 2
-
-            current_x = start_x
-            max_height = 0
-            for node in layer:
-                node.x = current_x
-                node.y = current_y
-                current_x += node.width + node_spacing
-                max_height = max(max_height, node.height)
-
-            current_y += max_height + layer_spacing
-
-    def _place_horizontal(self, layers, node_spacing, layer_spacing, padding, direction):
-        """Place nodes for RIGHT/LEFT direction."""
-        # For RIGHT: layers go left-to-right, nodes go top-to-bottom
-        layer_heights = []
+            along, across, along_pos, across_pos = lg.width, lg.height, lg.x, lg.y
+            along_start, across_start = padding['left'], padding['top']
+
+        centers = None
+        if strategy == 'BRANDES_KOEPF':
+            upper, lower = segment_neighbors(layer_segments(lg, len(layers)), lg.node_count)
+            centers = brandes_koepf(layers, upper, lower, along, lg.real_count,
+                                    node_spacing, edge_node_spacing, edge_edge_spacing)
+        self._place_layers(layers, along, across, along_pos, across_pos,
+                           node_spacing, layer_spacing, along_start, across_start,
+                           centers)
+
+    def _place_layers(self, layers, along, across, along_pos, across_pos,
+                      node_spacing, layer_spacing, along_start, across_start,
+                      centers=None):
+        """Stack the layers and place the nodes within them.
+
+        ``along`` is the node extent within a layer and ``across`` the extent
+        in the layer direction; coordinates are written to ``along_pos`` and
+        ``across_pos``. Without ``centers``, the nodes of each layer are placed
+        side by side and the layers are centered on the widest one; otherwise
+        ``centers`` holds the center of every node within its layer.
+        """
+        if centers is not None:
+            offset = along_start - min(centers[v] - along[v] / 2
+                                       for layer in layers for v in layer)
+            for layer in layers:
+                for v in layer:
+                    along_pos[v] = centers[v] - along[v] / 2 + offset
+        else:
+            # Compute the extent of every layer first for centering
+            layer_sizes = []
+            for layer in layers:
+                total = sum(along[v] for v in layer)
+                total += node_spacing * max(len(layer) - 1, 0)
+                layer_sizes.append(total)
+
+            max_size = max(layer_sizes)
+            for li, layer in enumerate(layers):
+                pos = along_start + (max_size - layer_sizes[li]) / 2
+                for v in layer:
+                    along_pos[v] = pos
+                    pos += along[v] + node_spacing
+
+        current = across_start
         for layer in layers:
-            total_height = sum(n.height for n in layer)
-            total_height += node_spacing * max(len(layer) - 1, 0)
-            layer_heights.append(total_height)
-
-        max_height = max(layer_heights) if layer_heights else 0
-
-        current_x = padding['left']
-        for li, layer in enumerate(layers):
-            total_height = layer_heights[li]
-            start_y = padding['top'] + (max_height - total_height) / 2
-
-            current_y = start_y
-            max_width = 0
-            for node in layer:
-                node.x = current_x
-                node.y = current_y
-                current_y += node.height + node_spacing
-                max_width = max(max_width, node.width)
-
-            current_x += max_width + layer_spacing
-
-    def _route_edges(self, edges, node_map, port_map, horizontal, direction):
-        """Route edges between nodes."""
-        for edge in edges:
-            if edge.is_self_loop:
-                continue
-
-            src = edge.source
-            tgt = edge.target
-
-            # Compute start and end points
-            if edge.reversed:
-                actual_src, actual_tgt = tgt, src
-            else:
-                actual_src, actual_tgt = src, tgt
-
-            # Get port positions if applicable
-            if edge.source_port:
-                sp = self._get_port_position(edge.source_port, src, horizontal, direction, True)
-            else:
-                sp = self._get_node_connection_point(src, horizontal, direction, True)
-
-            if edge.target_port:
-                ep = self._get_port_position(edge.target_port, tgt, horizontal, direction, False)
-            else:
-                ep = self._get_node_connection_point(tgt, horizontal, direction, False)
-
-            if edge.reversed:
-                sp, ep = ep, sp
-
-            # Collect bend points from dummy nodes
-            bend_points = []
-            for dummy in edge.dummy_nodes:
-                if horizontal:
-                    bend_points.append((dummy.x + dummy.width / 2,
-                                        dummy.y + dummy.height / 2))
-                else:
-                    bend_points.append((dummy.x + dummy.width / 2,
-                                        dummy.y + dummy.height / 2))
-
-            edge.bend_points = bend_points
-
-    def _get_node_connection_point(self, node, horizontal, direction, is_source):
+            layer_extent = 0
+            for v in layer:
+                across_pos[v] = current
+                layer_extent = max(layer_extent, across[v])
+            current += layer_extent + layer_spacing
+
+    def _route_edges(self, lg: LGraph):
+        """Route edges through the centers of their dummy nodes.
+
+        Returns the bend points of every edge, indexed by edge.
+        """
+        x, y, width, height = lg.x, lg.y, lg.width, lg.height
+        return [[(x[d] + width[d] / 2, y[d] + height[d] / 2) for d in lg.dummies(e)]
+                for e in range(lg.edge_count)]
+
+    def _get_node_connection_point(self, lg: LGraph, v, horizontal, direction, is_source):
         """Get the connection point on a node for an edge."""
+        x, y, w, h = lg.x[v], lg.y[v], lg.width[v], lg.height[v]
         if horizontal:
             if is_source:
-                return (node.x + node.width, node.y + node.height / 2)
+                return (x + w, y + h / 2)
             else:
-                return (node.x, node.y + node.height / 2)
+                return (x, y + h / 2)
         else:
             if is_source:
-                return (node.x + node.width / 2, node.y + node.height)
+                return (x + w / 2, y + h)
             else:
-                return (node.x + node.width / 2, node.y)
-
-    def _get_port_position(self, port, node, horizontal, direction, is_source):
-        """Get the position of a port on its owner node."""
-        # Place port at the appropriate position on the node
-        if port.side == 'EAST' or (port.side == 'UNDEFINED' and is_source and horizontal):
-            return (node.x + node.width, node.y + port.y + port.height / 2)
-        elif port.side == 'WEST' or (port.side == 'UNDEFINED' and not is_source and horizontal):
-            return (node.x, node.y + port.y + port.height / 2)
-        elif port.side == 'SOUTH' or (port.side == 'UNDEFINED' and is_source and not horizontal):
-            return (node.x + port.x + port.width / 2, node.y + node.height)
-        elif port.side == 'NORTH' or (port.side == 'UNDEFINED' and not is_source and not horizontal):
-            return (node.x + port.x + port.width / 2, node.y)
-        else:
-            return (node.x + node.width / 2, node.y + node.height / 2)
+                return (x + w / 2, y)
 
-    def _place_labels(self, nodes, eff_options, global_options):
+    def _place_labels(self, lg: LGraph, eff_options, global_options):
         """Place labels on nodes based on placement options."""
-        for node in nodes:
-            if node.is_dummy or not node.labels:
-                continue
+        # Get node label placement
+        global_placement = (eff_options.get('elk.nodeLabels.placement') or
+                            (global_options or {}).get('elk.nodeLabels.placement') or '')
 
-            # Get node label placement
-            global_placement = (eff_options.get('elk.nodeLabels.placement') or
-                                (global_options or {}).get('elk.nodeLabels.placement') or '')
+        for v in range(lg.real_count):
+            labels = lg.originals[v].get('labels')
+            if not labels:
+                continue
 
-            for label in node.labels:
+            for label in labels:
                 # Check label's own placement option
                 placement = get_option(label, 'elk.nodeLabels.placement')
                 if placement is None:
@@ -702,8 +996,8 @@ class LayeredLayoutProvider:
 
                 lw = label.get('width', 0)
                 lh = label.get('height', 0)
-                nw = node.width
-                nh = node.height
+                nw = lg.width[v]
+                nh = lg.height[v]
 
                 # Label-node spacing (elk.spacing.labelNode default is 5)
                 label_node_spacing = 5.0
@@ -748,105 +1042,121 @@ class LayeredLayoutProvider:
                 label['x'] = lx
                 label['y'] = ly
 
-    def _write_back(self, graph, nodes, edges, horizontal, direction):
-        """Write computed positions back to the original graph."""
-        # Write node positions
-        for node in nodes:
-            if node.is_dummy or node.original is None:
-                continue
-            node.original['x'] = node.x
-            node.original['y'] = node.y
+    def _write_back(self, graph, lg: LGraph, bend_points, horizontal, direction,
+                    routes=None, routed=True):
+        """Write computed positions back to the original graph.
 
-            # Write port positions
-            self._place_ports(node)
+        Edges are written from ``routes`` (start point, bend points and end
+        point) where given, else from ``bend_points`` between the nodes'
+        connection points, and not at all unless ``routed``.
+        """
+        # Write node positions
+        for v in range(lg.real_count):
+            original = lg.originals[v]
+            original['x'] = lg.x[v]
+            original['y'] = lg.y[v]
+        if not routed:
+            return
 
         # Write edge sections
-        for edge in edges:
-            if edge.original is None:
-                continue
-            if edge.is_self_loop:
+        for e in range(lg.edge_count):
+            edge_id = lg.edge_ids[e]
+            src, tgt = lg.source[e], lg.target[e]
+            if src == tgt:
                 # Self-loops get a simple routing
-                src = edge.source
-                sx = src.x + src.width
-                sy = src.y
+                sx = lg.x[src] + lg.width[src]
+                sy = lg.y[src]
+                h = lg.height[src]
                 section = {
-                    'id': edge.id + '_s0',
+                    'id': edge_id + '_s0',
                     'startPoint': {'x': sx, 'y': sy},
-                    'endPoint': {'x': sx, 'y': sy + src.height},
+                    'endPoint': {'x': sx, 'y': sy + h},
                     'bendPoints': [
                         {'x': sx + 20, 'y': sy},
-                        {'x': sx + 20, 'y': sy + src.height},
+                        {'x': sx + 20, 'y': sy + h},
                     ]
                 }
-                edge.original['sections'] = [section]
+                lg.edge_originals[e]['sections'] = [section]
                 continue
 
-            src = edge.source
-            tgt = edge.target
+            if routes is not None and routes[e] is not None:
+                points = routes[e]
+                section = {
+                    'id': edge_id + '_s0',
+                    'startPoint': {'x': points[0][0], 'y': points[0][1]},
+                    'endPoint': {'x': points[-1][0], 'y': points[-1][1]},
+                }
+                if len(points) > 2:
+                    section['bendPoints'] = [{'x': bp[0], 'y': bp[1]} for bp in points[1:-1]]
+                lg.edge_originals[e]['sections'] = [section]
+                continue
 
-            if edge.reversed:
-                actual_src, actual_tgt = tgt, src
-            else:
-                actual_src, actual_tgt = src, tgt
+            if lg.reversed[e]:
+                src, tgt = tgt, src
 
-            sp = self._get_node_connection_point(actual_src, horizontal, direction, True)
-            ep = self._get_node_connection_point(actual_tgt, horizontal, direction, False)
+            sp = self._get_node_connection_point(lg, src, horizontal, direction, True)
+            ep = self._get_node_connection_point(lg, tgt, horizontal, direction, False)
 
             section = {
-                'id': edge.id + '_s0',
+                'id': edge_id + '_s0',
                 'startPoint': {'x': sp[0], 'y': sp[1]},
                 'endPoint': {'x': ep[0], 'y': ep[1]},
             }
 
-            if edge.bend_points:
-                section['bendPoints'] = [{'x': bp[0], 'y': bp[1]}
-                                         for bp in edge.bend_points]
+            if bend_points and bend_points[e]:
+                points = bend_points[e][::-1] if lg.reversed[e] else bend_points[e]
+                section['bendPoints'] = [{'x': bp[0], 'y': bp[1]} for bp in points]
 
-            edge.original['sections'] = [section]
+            lg.edge_originals[e]['sections'] = [section]
 
-    def _place_ports(self, node):
-        """Place ports on a node."""
-        if not node.ports:
+    def _place_ports(self, lg: LGraph, v: int):
+        """Place ports on a node, unless their positions are fixed."""
+        first, last = lg.port_offsets[v], lg.port_offsets[v + 1]
+        if first == last:
+            return
+        if get_option(lg.originals[v], 'elk.portConstraints') == 'FIXED_POS':
             return
 
         # Group ports by side
         sides = defaultdict(list)
-        for port in node.ports:
-            sides[port.side].append(port)
+        for p in range(first, last):
+            sides[lg.port_sides[p]].append(p)
 
         # Sort by index within each side
         for side, ports in sides.items():
-            ports.sort(key=lambda p: p.index)
+            ports.sort(key=lg.port_index.__getitem__)
 
         # Place ports evenly along each side
+        width, height = lg.width[v], lg.height[v]
         for side, ports in sides.items():
             n_ports = len(ports)
-            for i, port in enumerate(ports):
+            for i, p in enumerate(ports):
+                pw, ph = lg.port_width[p], lg.port_height[p]
                 if side == 'NORTH':
-                    spacing = node.width / (n_ports + 1)
-                    port.x = spacing * (i + 1) - port.width / 2
-                    port.y = -port.height
+                    spacing = width / (n_ports + 1)
+                    px = spacing * (i + 1) - pw / 2
+                    py = -ph
                 elif side == 'SOUTH':
-                    spacing = node.width / (n_ports + 1)
-                    port.x = spacing * (i + 1) - port.width / 2
-                    port.y = node.height
+                    spacing = width / (n_ports + 1)
+                    px = spacing * (i + 1) - pw / 2
+                    py = height
                 elif side == 'EAST':
-                    spacing = node.height / (n_ports + 1)
-                    port.x = node.width
-                    port.y = spacing * (i + 1) - port.height / 2
+                    spacing = height / (n_ports + 1)
+                    px = width
+                    py = spacing * (i + 1) - ph / 2
                 elif side == 'WEST':
-                    spacing = node.height / (n_ports + 1)
-                    port.x = -port.width
-                    port.y = spacing * (i + 1) - port.height / 2
+                    spacing = height / (n_ports + 1)
+                    px = -pw
+                    py = spacing * (i + 1) - ph / 2
                 else:
                     # Default placement
-                    port.x = 0
-                    port.y = 0
+                    px = 0
+                    py = 0
 
                 # Write back to original
-                if port.original:
-                    port.original['x'] = port.x
-                    port.original['y'] = port.y
+                original = lg.port_originals[p]
+                original['x'] = px
+                original['y'] = py
 
     def _compute_graph_size(self, graph, padding):
         """Compute the size of the graph from its children."""
@@ -876,3 +1186,30 @@ class LayeredLayoutProvider:
 
         graph['width'] = max_x + padding['right']
         graph['height'] = max_y + padding['bottom']
+
+
+def _route_position(route, across):
+    """Return where a route first crosses the line at ``across``, or None.
+
+    ``route`` lists the route's points as ``(along, across)`` pairs.
+    """
+    for (a1, c1), (a2, c2) in zip(route, route[1:]):
+        if min(c1, c2) <= across <= max(c1, c2):
+            if c1 == c2:
+                return (a1 + a2) / 2
+            return a1 + (a2 - a1) * (across - c1) / (c2 - c1)
+    return None
+
+
+def _component_snapshot(component: dict) -> dict:
+    """Copy what laying out a component needs, for sending it to a process."""
+    snapshot = dict(component)
+    snapshot['children'] = [{k: v for k, v in child.items() if k not in ('children', 'edges')}
+                            for child in component['children']]
+    return snapshot
+
+
+def _layout_component(component: dict, global_options: dict) -> dict:
+    """Process pool entry point: layout one connected component."""
+    LayeredLayoutProvider().layout(component, global_options)
+    return component
@@ -0,0 +1,242 @@
+"""Array-backed graph representation for the layered algorithm.
+
+Nodes, ports and edges are identified by dense integer indices and their
+attributes are kept in parallel ``array`` columns instead of per-element
+objects. Nodes ``0 .. real_count - 1`` are the children of the laid-out
+container in input order; dummy nodes created for long edges are appended
+after them. The dummy nodes of an edge form a chain with consecutive indices
+and layers, recorded by its first index only: they get entries in the
+numeric columns (layer, position, coordinates and the zero size) but no
+per-node Python objects.
+
+Adjacency is stored in compressed sparse row (CSR) form: the edges leaving
+node ``v`` are ``out_edges[out_offsets[v]:out_offsets[v + 1]]`` and the edges
+entering it are ``in_edges[in_offsets[v]:in_offsets[v + 1]]``. Self-loops are
+left out of the adjacency. Reversing an edge only swaps its endpoints, so the
+adjacency is built once cycle breaking is done.
+"""
+from array import array
+from typing import Dict, List, Optional
+
+from ...options import get_option
+
+
+class LGraph:
+    """A container's children and edges as integer-indexed arrays."""
+
+    def __init__(self):
+        # Nodes
+        self.real_count = 0
+        self.node_ids: List[str] = []  # real nodes only
+        self.originals: List[Optional[dict]] = []  # real nodes only
+        self.layer_constraints: List[Optional[str]] = []  # real nodes only
+        self.width = array('d')
+        self.height = array('d')
+        self.layer = array('i')
+        self.position = array('i')  # position within layer
+        self.x = array('d')
+        self.y = array('d')
+
+        # Ports, grouped by owner: the ports of node v are
+        # port_offsets[v] .. port_offsets[v + 1] - 1
+        self.port_offsets = array('i', [0])
+        self.port_ids: List[str] = []
+        self.port_originals: List[dict] = []
+        self.port_sides: List[str] = []
+        self.port_index = array('i')
+        self.port_width = array('d')
+        self.port_height = array('d')
+        self.port_owner = array('i')
+
+        # Edges (one per source/target pair of an input edge)
+        self.edge_ids: List[str] = []
+        self.edge_originals: List[dict] = []
+        self.source = array('i')
+        self.target = array('i')
+        self.source_port = array('i')  # -1 if connected to the node itself
+        self.target_port = array('i')
+        self.reversed = bytearray()
+        # Dummy nodes of edge e: dummy_offsets[e] .. dummy_offsets[e + 1] - 1,
+        # ordered from its (current) source towards its target
+        self.dummy_offsets = array('i')
+
+        # CSR adjacency, see build_adjacency()
+        self.out_offsets = array('i')
+        self.out_edges = array('i')
+        self.in_offsets = array('i')
+        self.in_edges = array('i')
+
+    @classmethod
+    def from_graph(cls, graph: dict) -> 'LGraph':
+        """Build the layered graph of a container's children and edges."""
+        lg = cls()
+        node_map: Dict[str, int] = {}
+        port_map: Dict[str, int] = {}
+
+        for child in graph.get('children', []):
+            node_id = str(child.get('id', ''))
+            v = lg._add_node(child.get('width', 0) or 0.0,
+                             child.get('height', 0) or 0.0, child)
+            lg.node_ids.append(node_id)
+
+            # Check for layer constraint
+            lc = get_option(child, 'layerConstraint')
+            if lc is None:
+                lc = get_option(child, 'elk.layered.layering.layerConstraint')
+            lg.layer_constraints[v] = lc or None
+
+            for port_data in child.get('ports', []):
+                port_id = str(port_data.get('id', ''))
+                side = (get_option(port_data, 'port.side') or
+                        get_option(port_data, 'elk.port.side') or 'UNDEFINED')
+                index = int(get_option(port_data, 'port.index') or
+                            get_option(port_data, 'elk.port.index') or 0)
+                port_map[port_id] = len(lg.port_ids)
+                lg.port_ids.append(port_id)
+                lg.port_originals.append(port_data)
+                lg.port_sides.append(side)
+                lg.port_index.append(index)
+                lg.port_width.append(port_data.get('width', 0) or 0.0)
+                lg.port_height.append(port_data.get('height', 0) or 0.0)
+                lg.port_owner.append(v)
+            lg.port_offsets.append(len(lg.port_ids))
+            node_map[node_id] = v
+        lg.real_count = len(lg.node_ids)
+
+        for edge_data in graph.get('edges', []):
+            edge_id = str(edge_data.get('id', ''))
+            sources = edge_data.get('sources', [])
+            targets = edge_data.get('targets', [])
+            if not sources and 'source' in edge_data:
+                sources = [str(edge_data['source'])]
+            if not targets and 'target' in edge_data:
+                targets = [str(edge_data['target'])]
+
+            for src_id in sources:
+                for tgt_id in targets:
+                    # Endpoints are nodes or ports of nodes
+                    src, src_port = lg._resolve(str(src_id), node_map, port_map)
+                    tgt, tgt_port = lg._resolve(str(tgt_id), node_map, port_map)
+                    if src >= 0 and tgt >= 0:
+                        lg.edge_ids.append(edge_id)
+                        lg.edge_originals.append(edge_data)
+                        lg.source.append(src)
+                        lg.target.append(tgt)
+                        lg.source_port.append(src_port)
+                        lg.target_port.append(tgt_port)
+                        lg.reversed.append(0)
+        return lg
+
+    def _resolve(self, element_id: str, node_map: Dict[str, int],
+                 port_map: Dict[str, int]):
+        """Return ``(node, port)`` for an edge endpoint ID, -1 where absent.
+
+        An ID that names both a node and a port refers to the port.
+        """
+        port = port_map.get(element_id, -1)
+        if port >= 0:
+            return self.port_owner[port], port
+        return node_map.get(element_id, -1), -1
+
+    def _add_node(self, width: float, height: float,
+                  original: Optional[dict] = None) -> int:
+        self.originals.append(original)
+        self.layer_constraints.append(None)
+        self.width.append(width)
+        self.height.append(height)
+        self.layer.append(-1)
+        self.position.append(-1)
+        self.x.append(0.0)
+        self.y.append(0.0)
+        return len(self.layer) - 1
+
+    @property
+    def node_count(self) -> int:
+        """Number of nodes, including dummy nodes."""
+        return len(self.layer)
+
+    @property
+    def edge_count(self) -> int:
+        return len(self.source)
+
+    def is_dummy(self, v: int) -> bool:
+        return v >= self.real_count
+
+    def is_self_loop(self, e: int) -> bool:
+        return self.source[e] == self.target[e]
+
+    def reverse_edge(self, e: int) -> None:
+        """Reverse an edge in O(1). The adjacency must be rebuilt afterwards."""
+        self.source[e], self.target[e] = self.target[e], self.source[e]
+        self.source_port[e], self.target_port[e] = self.target_port[e], self.source_port[e]
+        self.reversed[e] ^= 1
+
+    def build_adjacency(self) -> None:
+        """Build the CSR in/out adjacency of all non-self-loop edges."""
+        n = self.node_count
+        source, target = self.source, self.target
+        out_count = [0] * (n + 1)
+        in_count = [0] * (n + 1)
+        for e in range(self.edge_count):
+            s, t = source[e], target[e]
+            if s != t:
+                out_count[s + 1] += 1
+                in_count[t + 1] += 1
+        for v in range(n):
+            out_count[v + 1] += out_count[v]
+            in_count[v + 1] += in_count[v]
+        self.out_offsets = array('i', out_count)
+        self.in_offsets = array('i', in_count)
+
+        # Fill in edge order so that each node's edges keep input order
+        out_edges = array('i', [0]) * out_count[n]
+        in_edges = array('i', [0]) * in_count[n]
+        for e in range(self.edge_count):
+            s, t = source[e], target[e]
+            if s != t:
+                out_edges[out_count[s]] = e
+                out_count[s] += 1
+                in_edges[in_count[t]] = e
+                in_count[t] += 1
+        self.out_edges = out_edges
+        self.in_edges = in_edges
+
+    def insert_dummy_nodes(self) -> None:
+        """Split edges spanning several layers with a chain of dummy nodes."""
+        layer, source, target = self.layer, self.source, self.target
+        offsets = array('i', [self.node_count])
+        total = self.node_count
+        for e in range(self.edge_count):
+            s, t = source[e], target[e]
+            if s != t and layer[t] > layer[s] + 1:
+                # The chain's layers are filled in one go
+                layer.extend(range(layer[s] + 1, layer[t]))
+                total = len(layer)
+            offsets.append(total)
+        self.dummy_offsets = offsets
+
+        added = total - len(self.width)
+        zeros = array('d', [0.0]) * added
+        self.width.extend(zeros)
+        self.height.extend(zeros)
+        self.x.extend(zeros)
+        self.y.extend(zeros)
+        self.position.extend(array('i', [-1]) * added)
+
+        # The dummy nodes have no adjacency of their own
+        self.out_offsets.extend(array('i', [self.out_offsets[-1]]) * added)
+        self.in_offsets.extend(array('i', [self.in_offsets[-1]]) * added)
+
+    def dummies(self, e: int) -> range:
+        """Return the dummy nodes of an edge."""
+        return range(self.dummy_offsets[e], self.dummy_offsets[e + 1])
+
+    def layers(self) -> List[List[int]]:
+        """Group the nodes by layer, keeping index order within each layer."""
+        if not self.node_count:
+            return []
+        layers: List[List[int]] = [[] for _ in range(max(self.layer) + 1)]
+        for v, li in enumerate(self.layer):
+            if li >= 0:
+                layers[li].append(v)
+        return layers
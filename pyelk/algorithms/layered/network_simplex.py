@@ -0,0 +1,374 @@
+"""Network simplex ranking (Gansner, Koutsofios, North and Vo, "A Technique for
+Drawing Directed Graphs", 1993).
+
+Assigns every node of a DAG an integer rank such that each edge ``u -> v``
+satisfies ``rank(v) - rank(u) >= 1`` and the weighted total edge length is
+minimal. Used for layer assignment, where every unit of edge length beyond
+one is a dummy node.
+
+The solver starts from a feasible spanning tree of tight edges and then
+repeatedly exchanges a tree edge with a negative cut value for the non-tree
+edge of minimum slack across the same cut. Tree nodes carry ``low``/``lim``
+postorder numbers, so subtree membership is an O(1) interval test. An
+exchange only changes the cut values on the tree path between the entering
+edge's endpoints, and only the parts of the subtree below their lowest common
+ancestor whose shape changed are renumbered.
+"""
+import heapq
+from array import array
+from typing import List, Optional, Sequence
+
+# Number of negative cut values compared when choosing the leaving edge
+LEAVE_SEARCH_SIZE = 30
+
+
+class NetworkSimplex:
+    """Network simplex over a DAG with weighted edges of minimum length one.
+
+    Args:
+        node_count: Number of nodes, identified by ``0 .. node_count - 1``.
+        tails, heads, weights: The edges. Parallel edges must be merged into
+            one edge with the summed weight beforehand.
+    """
+
+    def __init__(self, node_count: int, tails: Sequence[int], heads: Sequence[int],
+                 weights: Sequence[int]):
+        self.n = node_count
+        self.tail = array('i', tails)
+        self.head = array('i', heads)
+        self.weight = array('i', weights)
+        self.incident: List[List[int]] = [[] for _ in range(node_count)]
+        for e in range(len(self.tail)):
+            self.incident[self.tail[e]].append(e)
+            self.incident[self.head[e]].append(e)
+
+        self.rank = array('i', [0]) * node_count
+        self.in_tree = bytearray(len(self.tail))
+        self.tree_incident: List[List[int]] = [[] for _ in range(node_count)]
+        self.parent = array('i', [-1]) * node_count
+        self.parent_edge = array('i', [-1]) * node_count
+        self.low = array('i', [-1]) * node_count
+        self.lim = array('i', [0]) * node_count
+        self.node_at_lim = array('i', [0]) * node_count
+        self.cut = [0] * len(self.tail)  # cut values of the tree edges
+        self.iterations = 0
+        self._numbered = False
+        self._search_start = 0
+
+    def solve(self, iteration_limit: int, ranks: Optional[Sequence[int]] = None) -> array:
+        """Compute and return the ranks, starting at 0 in every component.
+
+        Stops after ``iteration_limit`` exchanges; the ranking is feasible but
+        possibly not optimal if the limit is hit. ``ranks`` is an optional
+        feasible initial ranking; a good one saves many exchanges.
+        """
+        if ranks is None:
+            self._init_rank()
+        else:
+            self.rank[:] = array('i', ranks)
+        roots = self._feasible_forest()
+        next_lim = 0
+        for root in roots:
+            next_lim = self._number(root, next_lim)
+        self._numbered = True
+
+        while self.iterations < iteration_limit:
+            leaving = self._leave_edge()
+            if leaving < 0:
+                break
+            self._exchange(leaving, self._enter_edge(leaving))
+            self.iterations += 1
+
+        self._normalize(roots)
+        return self.rank
+
+    def _slack(self, e: int) -> int:
+        return self.rank[self.head[e]] - self.rank[self.tail[e]] - 1
+
+    def _init_rank(self) -> None:
+        """Rank every node directly below its lowest predecessor."""
+        rank, head = self.rank, self.head
+        in_degree = [0] * self.n
+        for h in head:
+            in_degree[h] += 1
+        queue = [v for v in range(self.n) if in_degree[v] == 0]
+        for u in queue:  # grows while iterating
+            for e in self.incident[u]:
+                if self.tail[e] == u:
+                    v = head[e]
+                    if rank[v] < rank[u] + 1:
+                        rank[v] = rank[u] + 1
+                    in_degree[v] -= 1
+                    if in_degree[v] == 0:
+                        queue.append(v)
+
+    def _feasible_forest(self) -> List[int]:
+        """Make the ranking tight along a spanning tree of every component.
+
+        Returns the root of each tree.
+        """
+        visited = bytearray(self.n)
+        roots = []
+        for root in range(self.n):
+            if not visited[root]:
+                roots.append(root)
+                self._feasible_tree(root, visited)
+        return roots
+
+    def _feasible_tree(self, root: int, visited: bytearray) -> None:
+        """Grow a tight tree from ``root`` over its connected component.
+
+        When no tight edge leaves the tree, the whole tree is shifted by the
+        smallest slack of an incident edge. Shifts are applied lazily through
+        ``shift``: tree nodes store their rank minus the shift at the time
+        they joined, and the incident edges wait in two heaps keyed by their
+        slack without the shift.
+        """
+        rank, tail, head = self.rank, self.tail, self.head
+        shift = 0
+        members = []
+        out_heap = []  # (slack + shift, edge): tail in tree, head outside
+        in_heap = []   # (slack - shift, edge): head in tree, tail outside
+        tight = [(root, -1)]
+
+        while True:
+            # Add nodes reachable over tight edges
+            while tight:
+                v, via = tight.pop()
+                if visited[v]:
+                    continue
+                visited[v] = 1
+                members.append(v)
+                if via >= 0:
+                    self._add_tree_edge(via)
+                rank[v] -= shift  # stored relative to the current shift
+                for e in self.incident[v]:
+                    if tail[e] == v:
+                        other = head[e]
+                        if visited[other]:
+                            continue
+                        base = rank[other] - rank[v] - 1
+                        if base == shift:
+                            tight.append((other, e))
+                        else:
+                            heapq.heappush(out_heap, (base, e))
+                    else:
+                        other = tail[e]
+                        if visited[other]:
+                            continue
+                        base = rank[v] - rank[other] - 1
+                        if base == -shift:
+                            tight.append((other, e))
+                        else:
+                            heapq.heappush(in_heap, (base, e))
+
+            # Drop edges whose other endpoint has joined the tree meanwhile
+            while out_heap and visited[head[out_heap[0][1]]]:
+                heapq.heappop(out_heap)
+            while in_heap and visited[tail[in_heap[0][1]]]:
+                heapq.heappop(in_heap)
+            if not out_heap and not in_heap:
+                break
+
+            # Shift the tree to make the edge of minimum slack tight
+            out_slack = out_heap[0][0] - shift if out_heap else None
+            in_slack = in_heap[0][0] + shift if in_heap else None
+            if in_slack is None or (out_slack is not None and out_slack <= in_slack):
+                _, e = heapq.heappop(out_heap)
+                shift += out_slack
+                tight.append((head[e], e))
+            else:
+                _, e = heapq.heappop(in_heap)
+                shift -= in_slack
+                tight.append((tail[e], e))
+
+        for v in members:
+            rank[v] += shift
+
+    def _number(self, root: int, next_lim: int) -> int:
+        """Assign parents and low/lim numbers below ``root``, starting at ``next_lim``.
+
+        ``root`` keeps its parent. Subtrees whose parent edge and first number
+        are unchanged are skipped, so nodes whose subtree changed must have
+        their ``low`` invalidated first. Cut values are computed for nodes
+        without a parent edge cut value yet (see ``solve``). Returns the next
+        free number.
+        """
+        parent, parent_edge = self.parent, self.parent_edge
+        low, lim, tree_incident = self.low, self.lim, self.tree_incident
+        tail, head, cut = self.tail, self.head, self.cut
+        initial = self.iterations == 0 and not self._numbered
+
+        low[root] = next_lim
+        stack = [(root, 0)]
+        while stack:
+            v, k = stack[-1]
+            incident = tree_incident[v]
+            while k < len(incident):
+                e = incident[k]
+                k += 1
+                if e != parent_edge[v]:
+                    child = head[e] if tail[e] == v else tail[e]
+                    if parent_edge[child] == e and low[child] == next_lim:
+                        next_lim = lim[child] + 1  # unchanged subtree
+                        continue
+                    parent[child] = v
+                    parent_edge[child] = e
+                    low[child] = next_lim
+                    stack[-1] = (v, k)
+                    stack.append((child, 0))
+                    break
+            else:
+                stack.pop()
+                lim[v] = next_lim
+                self.node_at_lim[next_lim] = v
+                next_lim += 1
+                if initial and v != root:
+                    cut[parent_edge[v]] = self._cut_value(v)
+        return next_lim
+
+    def _cut_value(self, child: int) -> int:
+        """Cut value of the tree edge between ``child`` and its parent.
+
+        The cut value of a tree edge is the weight of all edges from its tail
+        component to its head component minus the weight of the edges in the
+        opposite direction. The cut values of the tree edges to ``child``'s
+        own children must be known already.
+        """
+        tail, head, weight, in_tree = self.tail, self.head, self.weight, self.in_tree
+        parent_edge = self.parent_edge[child]
+        child_is_tail = tail[parent_edge] == child
+        cut = weight[parent_edge]
+        for e in self.incident[child]:
+            if e == parent_edge:
+                continue
+            points_to_head = (tail[e] == child) == child_is_tail
+            cut += weight[e] if points_to_head else -weight[e]
+            if in_tree[e]:
+                cut += -self.cut[e] if points_to_head else self.cut[e]
+        return cut
+
+    def _leave_edge(self) -> int:
+        """Return a tree edge with a negative cut value, or -1 if optimal.
+
+        The search continues where the previous one stopped and returns the
+        most negative of the first ``LEAVE_SEARCH_SIZE`` candidates.
+        """
+        cut, in_tree = self.cut, self.in_tree
+        m = len(cut)
+        start = self._search_start
+        best, found = -1, 0
+        for i in range(m):
+            e = (start + i) % m
+            if in_tree[e] and cut[e] < 0:
+                if best < 0 or cut[e] < cut[best]:
+                    best = e
+                found += 1
+                if found == LEAVE_SEARCH_SIZE:
+                    self._search_start = e + 1
+                    break
+        return best
+
+    def _lower(self, e: int) -> int:
+        """Return the endpoint of tree edge ``e`` farther from the root."""
+        t, h = self.tail[e], self.head[e]
+        return t if self.lim[t] < self.lim[h] else h
+
+    def _enter_edge(self, leaving: int) -> int:
+        """Return the non-tree edge of minimum slack replacing ``leaving``.
+
+        Removing the tree edge splits the tree into the subtree below it and
+        the rest. The entering edge must cross the cut in the direction
+        opposite to the leaving edge.
+        """
+        tail, head, lim = self.tail, self.head, self.lim
+        child = self._lower(leaving)
+        lo, hi = self.low[child], lim[child]
+        # Candidates point into the subtree if the leaving edge points out of it
+        into_subtree = tail[leaving] == child
+
+        best, best_slack = -1, None
+        for number in range(lo, hi + 1):
+            v = self.node_at_lim[number]
+            for e in self.incident[v]:
+                if self.in_tree[e]:
+                    continue
+                other = tail[e] if head[e] == v else head[e]
+                if lo <= lim[other] <= hi:
+                    continue  # both endpoints inside the subtree
+                if (head[e] == v) != into_subtree:
+                    continue
+                slack = self._slack(e)
+                if best_slack is None or slack < best_slack:
+                    best, best_slack = e, slack
+        return best
+
+    def _exchange(self, leaving: int, entering: int) -> None:
+        """Replace a tree edge with a non-tree edge and update the tree."""
+        tail, head, low, lim = self.tail, self.head, self.low, self.lim
+
+        # Shift the subtree below the leaving edge to make the entering edge tight
+        child = self._lower(leaving)
+        slack = self._slack(entering)
+        if low[child] <= lim[head[entering]] <= lim[child]:
+            slack = -slack
+        if slack:
+            rank = self.rank
+            for number in range(low[child], lim[child] + 1):
+                rank[self.node_at_lim[number]] += slack
+
+        # Only the cut values on the tree path closed by the entering edge change
+        cut_value = self.cut[leaving]
+        lca = self._update_path(tail[entering], head[entering], cut_value, True)
+        self._update_path(head[entering], tail[entering], cut_value, False)
+        self.cut[leaving] = 0
+        self.cut[entering] = -cut_value
+
+        # Nodes on that path get new subtrees and must be renumbered
+        lca_low = low[lca]
+        self._invalidate_path(lca, tail[entering])
+        self._invalidate_path(lca, head[entering])
+
+        self.in_tree[leaving] = 0
+        self.tree_incident[tail[leaving]].remove(leaving)
+        self.tree_incident[head[leaving]].remove(leaving)
+        self._add_tree_edge(entering)
+        self._number(lca, lca_low)
+
+    def _add_tree_edge(self, e: int) -> None:
+        self.in_tree[e] = 1
+        self.tree_incident[self.tail[e]].append(e)
+        self.tree_incident[self.head[e]].append(e)
+
+    def _update_path(self, v: int, w: int, cut_value: int, forward: bool) -> int:
+        """Adjust the cut values from ``v`` up to the common ancestor with ``w``.
+
+        Returns the lowest common ancestor of ``v`` and ``w``.
+        """
+        low, lim, tail = self.low, self.lim, self.tail
+        while not (low[v] <= lim[w] <= lim[v]):
+            e = self.parent_edge[v]
+            if (tail[e] == v) == forward:
+                self.cut[e] += cut_value
+            else:
+                self.cut[e] -= cut_value
+            v = self.parent[v]
+        return v
+
+    def _invalidate_path(self, lca: int, v: int) -> None:
+        """Mark the nodes from ``v`` up to ``lca`` for renumbering."""
+        low, parent = self.low, self.parent
+        while v != lca and low[v] != -1:
+            low[v] = -1
+            v = parent[v]
+        low[lca] = -1
+
+    def _normalize(self, roots: List[int]) -> None:
+        """Shift every component so that its smallest rank is 0."""
+        rank = self.rank
+        for root in roots:
+            first, last = self.low[root], self.lim[root]
+            nodes = [self.node_at_lim[i] for i in range(first, last + 1)]
+            min_rank = min(rank[v] for v in nodes)
+            for v in nodes:
+                rank[v] -= min_rank
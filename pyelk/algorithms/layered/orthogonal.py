@@ -0,0 +1,247 @@
+"""Orthogonal edge routing for the layered algorithm.
+
+Edges leave their source perpendicular to the layers, switch to their
+target's coordinate on a horizontal segment (for direction DOWN; vertical
+for RIGHT) in the gap between two layers, and enter the target
+perpendicularly. Long edges run straight through their dummy nodes.
+
+The segments of one gap that share an end point (a node or port) are merged
+into a hyperedge segment, and every segment that needs to switch coordinates
+is assigned a routing slot. Overlapping segments need different slots, and
+their order decides how many crossings they produce: a segment whose edges
+run towards higher coordinates should lie above (before) such segments that
+start further left, and the opposite holds for segments running towards
+lower coordinates. Segments are processed in that order and each takes the
+slot after the highest slot among the overlapping segments processed
+before it, which a max segment tree answers in O(log k). Slot assignment
+thus takes O(k log k) for k segments in a gap. Gaps between layers are
+widened only where their slots do not fit.
+"""
+from typing import Dict, List, Optional, Tuple
+
+from .lgraph import LGraph
+
+Point = Tuple[float, float]
+
+
+class _Segment:
+    """Edge segments of one gap merged by their shared end points."""
+
+    __slots__ = ('tops', 'bottoms', 'low', 'high', 'slot')
+
+    def __init__(self):
+        self.tops: List[float] = []     # coordinates of the ends in the upper layer
+        self.bottoms: List[float] = []  # coordinates of the ends in the lower layer
+        self.low = self.high = 0.0
+        self.slot = -1
+
+
+def route_orthogonal(lg: LGraph, layers: List[List[int]], horizontal: bool,
+                     edge_node_spacing: float,
+                     edge_edge_spacing: float) -> List[Optional[List[Point]]]:
+    """Route all edges orthogonally, widening gaps between layers as needed.
+
+    Node positions must be final apart from the layer shifts made here, the
+    ports must be placed and no layer may be empty. Returns the points
+    of every edge from its original source to its target, or None for
+    self-loops and edges within one layer, which layer constraints can
+    leave.
+    """
+    # Coordinates within the layers (along) and in the layer direction (across)
+    if horizontal:
+        along, across, along_size, across_size = lg.y, lg.x, lg.height, lg.width
+        port_along, port_across, port_along_size, port_across_size = 'y', 'x', 'height', 'width'
+    else:
+        along, across, along_size, across_size = lg.x, lg.y, lg.width, lg.height
+        port_along, port_across, port_along_size, port_across_size = 'x', 'y', 'width', 'height'
+
+    def attach(v: int, port: int, outgoing: bool) -> Tuple[float, float]:
+        """Return the along coordinate and the border of an edge end."""
+        if v >= lg.real_count:
+            return along[v], across[v]
+        if port < 0:
+            a = along[v] + along_size[v] / 2
+            return a, across[v] + (across_size[v] if outgoing else 0.0)
+        p = lg.port_originals[port]
+        rel = p.get(port_across, 0.0)
+        a = along[v] + p.get(port_along, 0.0) + p.get(port_along_size, 0.0) / 2
+        if outgoing:
+            return a, across[v] + max(across_size[v], rel + p.get(port_across_size, 0.0))
+        return a, across[v] + min(0.0, rel)
+
+    layer_of = lg.layer
+    gaps: List[Dict[tuple, _Segment]] = [dict() for _ in range(max(0, len(layers) - 1))]
+    parent: Dict[tuple, tuple] = {}
+
+    def find(key):
+        root = key
+        while parent.setdefault(root, root) != root:
+            root = parent[root]
+        while key != root:
+            parent[key], key = root, parent[key]
+        return root
+
+    # Collect each edge's segments per gap, keyed by their end points
+    chains = []
+    for e in range(lg.edge_count):
+        s, t = lg.source[e], lg.target[e]
+        if s == t or layer_of[t] <= layer_of[s]:
+            chains.append(None)
+            continue
+        nodes = [s] + list(lg.dummies(e)) + [t]
+        ports = [lg.source_port[e]] + [-1] * (len(nodes) - 2) + [lg.target_port[e]]
+        hops = []
+        for i in range(len(nodes) - 1):
+            u, v = nodes[i], nodes[i + 1]
+            if layer_of[v] != layer_of[u] + 1:
+                hops = None
+                break
+            a = attach(u, ports[i], True)[0]
+            b = attach(v, ports[i + 1], False)[0]
+            top, bottom = ('top', u, ports[i]), ('bottom', v, ports[i + 1])
+            parent[find(top)] = find(bottom)
+            hops.append((layer_of[u], top, a, b))
+        chains.append((nodes, ports, hops))
+
+    # Merge the segments of each gap by their connected end points
+    for chain in chains:
+        if chain is None or chain[2] is None:
+            continue
+        for gap, top, a, b in chain[2]:
+            key = find(top)
+            segment = gaps[gap].get(key)
+            if segment is None:
+                segment = gaps[gap][key] = _Segment()
+            segment.tops.append(a)
+            segment.bottoms.append(b)
+
+    # Assign slots and widen the gaps that need it. first_slot[i] is the
+    # across coordinate of the first slot of gap i.
+    shift = 0.0
+    first_slot = []
+    for i, layer in enumerate(layers):
+        for v in layer:
+            across[v] += shift
+        if i == len(gaps):
+            break
+        slots = _assign_slots(list(gaps[i].values()))
+        bottom = max(across[v] + across_size[v] for v in layer)
+        top = min(across[v] for v in layers[i + 1]) + shift
+        needed = 2 * edge_node_spacing + (slots - 1) * edge_edge_spacing
+        if slots and top - bottom < needed:
+            shift += needed - (top - bottom)
+            top = bottom + needed
+        first_slot.append(bottom + (top - bottom - (slots - 1) * edge_edge_spacing) / 2)
+
+    # Build the routes
+    routes: List[Optional[List[Point]]] = []
+    for e, chain in enumerate(chains):
+        if chain is None or chain[2] is None:
+            routes.append(None)
+            continue
+        nodes, ports, hops = chain
+        points = [attach(nodes[0], ports[0], True)]
+        for gap, top, a, b in hops:
+            segment = gaps[gap][find(top)]
+            if segment.slot >= 0 and a != b:
+                slot = first_slot[gap] + segment.slot * edge_edge_spacing
+                points.append((a, slot))
+                points.append((b, slot))
+        points.append(attach(nodes[-1], ports[-1], False))
+        if horizontal:
+            points = [(y, x) for x, y in points]
+        if lg.reversed[e]:
+            points.reverse()
+        routes.append(points)
+    return routes
+
+
+def _assign_slots(segments: List[_Segment]) -> int:
+    """Assign routing slots to the segments of a gap; return the slot count.
+
+    Segments whose ends all share one coordinate need no slot.
+    """
+    routed = []
+    for segment in segments:
+        ends = segment.tops + segment.bottoms
+        segment.low, segment.high = min(ends), max(ends)
+        if segment.low < segment.high:
+            routed.append(segment)
+    if not routed:
+        return 0
+
+    def order(segment):
+        top = sum(segment.tops) / len(segment.tops)
+        bottom = sum(segment.bottoms) / len(segment.bottoms)
+        if bottom > top:
+            return (0, -top)  # towards higher coordinates: later starts first
+        return (1, top)
+
+    routed.sort(key=order)
+
+    coordinates = sorted({c for s in routed for c in (s.low, s.high)})
+    index = {c: i for i, c in enumerate(coordinates)}
+    tree = _MaxTree(len(coordinates))
+    slots = 0
+    for segment in routed:
+        lo, hi = index[segment.low], index[segment.high]
+        segment.slot = tree.query(lo, hi) + 1
+        tree.update(lo, hi, segment.slot)
+        slots = max(slots, segment.slot + 1)
+    return slots
+
+
+class _MaxTree:
+    """Segment tree for range maximum queries and range maximum updates."""
+
+    def __init__(self, size: int):
+        # A power of two, so that the nodes covering a range have all their
+        # ancestors on the paths from the range's end leaves to the root
+        self.size = 1
+        while self.size < size:
+            self.size *= 2
+        size = self.size
+        self.value = [-1] * (2 * size)  # maximum within the subtree
+        self.tag = [-1] * (2 * size)    # applies to the whole subtree
+
+    def update(self, lo: int, hi: int, value: int) -> None:
+        """Raise the values at positions ``lo .. hi`` to at least ``value``."""
+        size, tree, tag = self.size, self.value, self.tag
+        left, right = lo + size, hi + size + 1
+        while left < right:
+            if left & 1:
+                tree[left] = max(tree[left], value)
+                tag[left] = max(tag[left], value)
+                left += 1
+            if right & 1:
+                right -= 1
+                tree[right] = max(tree[right], value)
+                tag[right] = max(tag[right], value)
+            left >>= 1
+            right >>= 1
+        for i in (lo + size, hi + size):
+            i >>= 1
+            while i:
+                tree[i] = max(tree[2 * i], tree[2 * i + 1], tag[i])
+                i >>= 1
+
+    def query(self, lo: int, hi: int) -> int:
+        """Return the maximum value at positions ``lo .. hi``."""
+        size, tree, tag = self.size, self.value, self.tag
+        result = -1
+        for i in (lo + size, hi + size):
+            i >>= 1
+            while i:
+                result = max(result, tag[i])
+                i >>= 1
+        left, right = lo + size, hi + size + 1
+        while left < right:
+            if left & 1:
+                result = max(result, tree[left])
+                left += 1
+            if right & 1:
+                right -= 1
+                result = max(result, tree[right])
+            left >>= 1
+            right >>= 1
+        return result
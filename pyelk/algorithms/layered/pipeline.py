@@ -0,0 +1,119 @@
+"""The phase pipeline of the layered algorithm.
+
+A ``LayeredPipeline`` is an ordered list of named processors that run one
+after another on a ``LayeredState``. The state holds the graph, its options
+and the intermediate results. ``LayeredLayoutProvider.pipeline`` builds the
+default phases:
+
+    Cycle breaking, Layer assignment, Dummy node insertion,
+    Crossing minimization, Node placement, Edge routing, Label placement,
+    Write back
+
+Callers can replace or remove a phase, or insert their own processors
+between phases. Each processor is called with the state and its logging
+entry (None unless logging is active), and is logged as a phase under its
+name. Hooks run before and after every processor, for example to time
+them.
+
+A layering and an ordering computed before can be passed in for graphs of
+the same topology, so that those phases reduce to copying them (see
+``LayeredState``). Without edge routing, only the nodes (and their ports)
+are written back.
+"""
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+from ...options import get_direction, get_effective_options, get_padding
+from ...timing import phase
+from .lgraph import LGraph
+
+Processor = Callable[['LayeredState', Optional[dict]], None]
+Hook = Callable[[str, 'LayeredState'], None]
+
+
+class LayeredState:
+    """The graph, its options and the intermediate results of one layout.
+
+    ``layering`` maps node IDs to layers and ``ordering`` lists the node
+    indices of every layer, dummy nodes included. Both are taken from a
+    previous layout of a graph with the same children and edges, in the
+    same order: ``node_layers()`` and ``layers`` after it has run.
+    """
+
+    def __init__(self, graph: dict, global_options: Optional[dict] = None,
+                 layering: Optional[Dict[str, int]] = None,
+                 ordering: Optional[List[List[int]]] = None):
+        self.graph = graph
+        self.global_options = global_options
+        self.eff_options = get_effective_options(graph, global_options)
+        self.padding = get_padding(graph, global_options)
+        self.direction = get_direction(graph, global_options)
+        self.horizontal = self.direction in ('RIGHT', 'LEFT')
+        self.layering = layering
+        self.ordering = ordering
+
+        # Intermediate results, filled in by the phases
+        self.lg: Optional[LGraph] = None
+        self.layers: Optional[List[List[int]]] = None
+        self.crossings: Optional[int] = None
+        self.port_offsets: Optional[List[float]] = None
+        self.routed = False
+        self.routes = None       # orthogonal routes, see route_orthogonal
+        self.bend_points = None  # polyline bend points of every edge
+
+    def node_layers(self) -> Dict[str, int]:
+        """Return the layer of every node by its ID."""
+        lg = self.lg
+        return {lg.node_ids[v]: lg.layer[v] for v in range(lg.real_count)}
+
+
+class LayeredPipeline:
+    """Named processors run in order on a ``LayeredState``."""
+
+    def __init__(self, processors: Iterable[Tuple[str, Processor]] = ()):
+        self.processors: List[Tuple[str, Processor]] = list(processors)
+        self.before_hooks: List[Hook] = []
+        self.after_hooks: List[Hook] = []
+
+    def names(self) -> List[str]:
+        """Return the names of the processors in order."""
+        return [name for name, _ in self.processors]
+
+    def _index(self, name: str) -> int:
+        for i, (processor_name, _) in enumerate(self.processors):
+            if processor_name == name:
+                return i
+        raise KeyError(f"No layered processor named {name!r}")
+
+    def replace(self, name: str, processor: Processor) -> None:
+        """Run ``processor`` in place of the one named ``name``."""
+        self.processors[self._index(name)] = (name, processor)
+
+    def remove(self, name: str) -> None:
+        """Skip the processor named ``name``."""
+        del self.processors[self._index(name)]
+
+    def insert_before(self, name: str, new_name: str, processor: Processor) -> None:
+        """Run ``processor`` as ``new_name`` right before ``name``."""
+        self.processors.insert(self._index(name), (new_name, processor))
+
+    def insert_after(self, name: str, new_name: str, processor: Processor) -> None:
+        """Run ``processor`` as ``new_name`` right after ``name``."""
+        self.processors.insert(self._index(name) + 1, (new_name, processor))
+
+    def add_hooks(self, before: Optional[Hook] = None, after: Optional[Hook] = None) -> None:
+        """Call ``before`` and ``after`` with each processor's name and the state."""
+        if before is not None:
+            self.before_hooks.append(before)
+        if after is not None:
+            self.after_hooks.append(after)
+
+    def run(self, state: LayeredState) -> LayeredState:
+        """Run all processors on ``state`` and return it."""
+        for name, processor in self.processors:
+            for hook in self.before_hooks:
+                hook(name, state)
+            with phase(name) as log:
+                processor(state, log)
+            for hook in self.after_hooks:
+                hook(name, state)
+        return state
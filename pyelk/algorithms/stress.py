@@ -1,6 +1,8 @@
 """Stress minimization layout algorithm."""
 import math
 import random
+from ..cancellation import check_cancelled
+from ..timing import phase
 from ..options import get_padding, get_spacing, get_option
 
 
@@ -47,70 +49,76 @@ class StressLayoutProvider:
                         adj[ti].append(si)
 
         # Compute shortest path distances (BFS)
-        dist = [[float('inf')] * n for _ in range(n)]
-        for i in range(n):
-            dist[i][i] = 0
-            queue = [i]
-            head = 0
-            while head < len(queue):
-                u = queue[head]
-                head += 1
-                for v in adj[u]:
-                    if dist[i][v] == float('inf'):
-                        dist[i][v] = dist[i][u] + 1
-                        queue.append(v)
-
-        # Replace inf with max_dist + 1
-        max_dist = 0
-        for i in range(n):
-            for j in range(n):
-                if dist[i][j] != float('inf'):
-                    max_dist = max(max_dist, dist[i][j])
-        for i in range(n):
-            for j in range(n):
-                if dist[i][j] == float('inf'):
-                    dist[i][j] = max_dist + 1
+        with phase('Shortest paths', nodes=n, edges=len(graph.get('edges', []))):
+            dist = [[float('inf')] * n for _ in range(n)]
+            for i in range(n):
+                check_cancelled()
+                dist[i][i] = 0
+                queue = [i]
+                head = 0
+                while head < len(queue):
+                    u = queue[head]
+                    head += 1
+                    for v in adj[u]:
+                        if dist[i][v] == float('inf'):
+                            dist[i][v] = dist[i][u] + 1
+                            queue.append(v)
+
+            # Replace inf with max_dist + 1
+            max_dist = 0
+            for i in range(n):
+                for j in range(n):
+                    if dist[i][j] != float('inf'):
+                        max_dist = max(max_dist, dist[i][j])
+            for i in range(n):
+                for j in range(n):
+                    if dist[i][j] == float('inf'):
+                        dist[i][j] = max_dist + 1
 
         # Stress minimization iterations
         positions = [(c['x'] + c['width'] / 2, c['y'] + c['height'] / 2)
                      for c in children]
 
-        for iteration in range(200):
-            max_movement = 0.0
-            new_positions = list(positions)
-
-            for i in range(n):
-                num_x, num_y, denom = 0.0, 0.0, 0.0
-
-                for j in range(n):
-                    if i == j:
-                        continue
-                    d_ij = dist[i][j] * desired_edge_length
-                    w_ij = 1.0 / (d_ij * d_ij) if d_ij > 0 else 0
-
-                    dx = positions[i][0] - positions[j][0]
-                    dy = positions[i][1] - positions[j][1]
-                    actual = math.sqrt(dx * dx + dy * dy)
-
-                    if actual > 0.001:
-                        num_x += w_ij * (positions[j][0] + d_ij * dx / actual)
-                        num_y += w_ij * (positions[j][1] + d_ij * dy / actual)
-                    else:
-                        num_x += w_ij * (positions[j][0] + d_ij)
-                        num_y += w_ij * positions[j][1]
-                    denom += w_ij
-
-                if denom > 0:
-                    new_x = num_x / denom
-                    new_y = num_y / denom
-                    movement = math.sqrt((new_x - positions[i][0]) ** 2 +
-                                         (new_y - positions[i][1]) ** 2)
-                    max_movement = max(max_movement, movement)
-                    new_positions[i] = (new_x, new_y)
-
-            positions = new_positions
-            if max_movement < 0.01:
-                break
+        with phase('Stress iterations', nodes=n) as log:
+            for iteration in range(200):
+                check_cancelled()
+                max_movement = 0.0
+                new_positions = list(positions)
+
+                for i in range(n):
+                    num_x, num_y, denom = 0.0, 0.0, 0.0
+
+                    for j in range(n):
+                        if i == j:
+                            continue
+                        d_ij = dist[i][j] * desired_edge_length
+                        w_ij = 1.0 / (d_ij * d_ij) if d_ij > 0 else 0
+
+                        dx = positions[i][0] - positions[j][0]
+                        dy = positions[i][1] - positions[j][1]
+                        actual = math.sqrt(dx * dx + dy * dy)
+
+                        if actual > 0.001:
+                            num_x += w_ij * (positions[j][0] + d_ij * dx / actual)
+                            num_y += w_ij * (positions[j][1] + d_ij * dy / actual)
+                        else:
+                            num_x += w_ij * (positions[j][0] + d_ij)
+                            num_y += w_ij * positions[j][1]
+                        denom += w_ij
+
+                    if denom > 0:
+                        new_x = num_x / denom
+                        new_y = num_y / denom
+                        movement = math.sqrt((new_x - positions[i][0]) ** 2 +
+                                             (new_y - positions[i][1]) ** 2)
+                        max_movement = max(max_movement, movement)
+                        new_positions[i] = (new_x, new_y)
+
+                positions = new_positions
+                if max_movement < 0.01:
+                    break
+            if log is not None:
+                log['iterations'] = iteration + 1
 
         # Apply positions
         min_x = min(p[0] for p in positions)
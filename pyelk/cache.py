@@ -0,0 +1,277 @@
+"""Content-addressed cache of layout results.
+
+Layouts are keyed by a canonical hash of everything a layout depends on: the
+graph's topology, node sizes, ports, labels, layout options and the effective
+options and algorithm of the root. Inputs that are also layout outputs (the
+size of containers, node positions for algorithms and strategies that do not
+start from them) are left out, so a laid-out graph hashes the same as the
+input it came from.
+
+Cached results are stored as JSON in a bounded in-memory LRU and optionally in
+a directory on disk that survives restarts.
+"""
+import hashlib
+import json
+import os
+import re
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from .graph import LAYOUT_KEYS
+from .options import get_algorithm, get_effective_options
+
+
+# Algorithms that use the input positions of their children
+POSITION_SENSITIVE_ALGORITHMS = frozenset({
+    'org.eclipse.elk.fixed',
+    'org.eclipse.elk.force',
+    'org.eclipse.elk.stress',
+    'org.eclipse.elk.sporeCompaction',
+    'org.eclipse.elk.sporeOverlap',
+})
+
+# Layered strategy options (full or short keys); INTERACTIVE strategies
+# start from the input positions
+_STRATEGY_KEY = re.compile(r'^(?:(?:org\.eclipse\.)?elk\.layered\.)?\w+\.strategy$')
+
+_OPTION_KEYS = ('layoutOptions', 'properties')
+
+
+def layout_key(graph: dict, global_options: Optional[dict] = None) -> str:
+    """Compute the cache key of a (normalized) graph and its global options."""
+    global_options = global_options or {}
+    canonical = {
+        'global': global_options,
+        'effective': get_effective_options(graph, global_options),
+        'algorithm': get_algorithm(graph, global_options),
+        'graph': canonical_node(graph, global_options, False),
+    }
+    return _digest(canonical)
+
+
+def canonical_node(node: dict, global_options: dict, with_position: bool) -> dict:
+    """Return the layout-relevant content of a node and its subtree."""
+    result = _canonical_own(node, with_position)
+    children = node.get('children', [])
+    if children:
+        sensitive = _uses_positions(node, global_options)
+        result['children'] = [canonical_node(c, global_options, sensitive)
+                              for c in children]
+    return result
+
+
+def container_fingerprints(graph: dict,
+                           global_options: Optional[dict] = None) -> Dict[str, Tuple[str, dict]]:
+    """Fingerprint the subtree of every container, computed bottom-up.
+
+    Returns a map from container ID to ``(fingerprint, container)``. A
+    container's fingerprint covers everything its own layout and the layouts
+    nested inside it depend on, but not its position in the parent.
+    """
+    global_options = global_options or {}
+    result = {}
+    _fingerprint(graph, global_options, result)
+    return result
+
+
+def _fingerprint(node: dict, global_options: dict, result: dict) -> str:
+    canonical = _canonical_own(node, False)
+    sensitive = _uses_positions(node, global_options)
+    entries = []
+    for child in node.get('children', []):
+        if child.get('children'):
+            entry = {'fingerprint': _fingerprint(child, global_options, result)}
+            if sensitive:
+                entry['position'] = (child.get('x'), child.get('y'))
+        else:
+            entry = _canonical_own(child, sensitive)
+        entries.append(entry)
+    canonical['children'] = entries
+    fingerprint = _digest({'global': global_options, 'node': canonical})
+    if 'id' in node:
+        result[str(node['id'])] = (fingerprint, node)
+    return fingerprint
+
+
+def _uses_positions(node: dict, global_options: dict) -> bool:
+    """Return whether the layout of a node's children uses their positions."""
+    if get_algorithm(node, global_options) in POSITION_SENSITIVE_ALGORITHMS:
+        return True
+    return any(value == 'INTERACTIVE' and _STRATEGY_KEY.match(key)
+               for key, value in get_effective_options(node, global_options).items())
+
+
+def _canonical_own(node: dict, with_position: bool) -> dict:
+    """Return the layout-relevant content of a node without its children."""
+    result = {'id': node.get('id')}
+    if not node.get('children'):
+        result['size'] = (node.get('width', 0), node.get('height', 0))
+    if with_position:
+        result['position'] = (node.get('x'), node.get('y'))
+    _add_options(result, node)
+    if node.get('ports'):
+        result['ports'] = [_canonical_shape(p, 'id') for p in node['ports']]
+    if node.get('labels'):
+        result['labels'] = [_canonical_shape(l, 'id', 'text') for l in node['labels']]
+    if node.get('edges'):
+        result['edges'] = [_canonical_shape(e, 'id', 'sources', 'targets')
+                           for e in node['edges']]
+    return result
+
+
+def _digest(canonical) -> str:
+    data = json.dumps(canonical, sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def _canonical_shape(element: dict, *keys: str) -> dict:
+    result = {k: element.get(k) for k in keys}
+    if 'width' in element or 'height' in element:
+        result['size'] = (element.get('width', 0), element.get('height', 0))
+    _add_options(result, element)
+    if element.get('labels'):
+        result['labels'] = [_canonical_shape(l, 'id', 'text') for l in element['labels']]
+    return result
+
+
+def _add_options(result: dict, element: dict) -> None:
+    for key in _OPTION_KEYS:
+        if element.get(key):
+            result[key] = element[key]
+
+
+def extract_layout(graph: dict) -> List[dict]:
+    """Collect the computed layout of every element in traversal order."""
+    payload = []
+    _extract(graph, payload)
+    return payload
+
+
+def _extract(node: dict, payload: List[dict]) -> None:
+    payload.append({k: node[k] for k in LAYOUT_KEYS if k in node})
+    for key in ('ports', 'labels', 'edges'):
+        for element in node.get(key, []):
+            payload.append({k: element[k] for k in LAYOUT_KEYS if k in element})
+            # Labels of ports and edges
+            for label in element.get('labels', []):
+                payload.append({k: label[k] for k in LAYOUT_KEYS if k in label})
+    for child in node.get('children', []):
+        _extract(child, payload)
+
+
+def apply_layout(graph: dict, payload: List[dict]) -> None:
+    """Write a layout collected by ``extract_layout`` onto a matching graph."""
+    _apply(graph, iter(payload))
+
+
+def _apply(node: dict, values) -> None:
+    node.update(next(values))
+    for key in ('ports', 'labels', 'edges'):
+        for element in node.get(key, []):
+            element.update(next(values))
+            for label in element.get('labels', []):
+                label.update(next(values))
+    for child in node.get('children', []):
+        _apply(child, values)
+
+
+class LayoutCache:
+    """LRU cache of layout results with an optional on-disk tier.
+
+    Args:
+        max_entries: Maximum number of results kept in memory.
+        max_bytes: Maximum total size of the results kept in memory.
+        directory: If given, results are also stored as files in this
+            directory and looked up there on a memory miss. The disk tier is
+            not bounded.
+    """
+
+    def __init__(self, max_entries: int = 1024, max_bytes: int = 64 * 1024 * 1024,
+                 directory: Optional[str] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries: 'OrderedDict[str, str]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[List[dict]]:
+        """Return the cached layout for ``key`` or None."""
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+        if data is None and self.directory is not None:
+            data = self._read_file(key)
+            if data is not None:
+                self._store(key, data)
+        with self._lock:
+            if data is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return json.loads(data)
+
+    def put(self, key: str, payload: List[dict]) -> None:
+        """Store the layout for ``key``."""
+        data = json.dumps(payload, separators=(',', ':'))
+        self._store(key, data)
+        if self.directory is not None:
+            try:
+                self._write_file(key, data)
+            except OSError:
+                pass  # the result stays in memory; a failed write must not fail a layout
+
+    def clear(self) -> None:
+        """Remove all in-memory entries (the disk tier is kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit, miss and eviction counters and the memory usage."""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._bytes,
+            }
+
+    def _store(self, key: str, data: str) -> None:
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._bytes -= len(old)
+            if len(data) > self.max_bytes:
+                return
+            self._entries[key] = data
+            self._bytes += len(data)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted)
+                self.evictions += 1
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key[:2], key + '.json')
+
+    def _read_file(self, key: str) -> Optional[str]:
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                return f.read()
+        except OSError:
+            return None
+
+    def _write_file(self, key: str, data: str) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write to a temporary file first so readers never see partial data
+        tmp_path = f'{path}.{os.getpid()}.{threading.get_ident()}.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
@@ -0,0 +1,34 @@
+"""Cooperative cancellation of running layouts.
+
+A layout runs synchronously, so it cannot be interrupted from the outside.
+Instead, callers install a ``threading.Event`` with ``cancellation_scope`` and
+layout code calls ``check_cancelled`` at phase and iteration boundaries, which
+raises ``LayoutCancelledException`` once the event is set.
+"""
+import contextvars
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from .exceptions import LayoutCancelledException
+
+
+_cancel_event: contextvars.ContextVar = contextvars.ContextVar(
+    'pyelk_cancel_event', default=None)
+
+
+@contextmanager
+def cancellation_scope(event: Optional[threading.Event]) -> Iterator[None]:
+    """Make layouts run in this context stop once ``event`` is set."""
+    token = _cancel_event.set(event)
+    try:
+        yield
+    finally:
+        _cancel_event.reset(token)
+
+
+def check_cancelled() -> None:
+    """Raise LayoutCancelledException if the current layout was cancelled."""
+    event = _cancel_event.get()
+    if event is not None and event.is_set():
+        raise LayoutCancelledException("Layout was cancelled")
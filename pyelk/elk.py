@@ -1,18 +1,19 @@
 """Main ELK class - the primary API for the pyelk library."""
-import copy
 import time
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterable, List, Optional
 
+from .cancellation import check_cancelled
 from .exceptions import (
     ElkError, UnsupportedConfigurationException,
     UnsupportedGraphException, InvalidGraphException
 )
-from .graph import validate_graph, validate_id, normalize_edges, collect_nodes
+from .graph import GraphIndex, copy_structure, merge_layout
+from .timing import logging_scope, new_entry
 from .options import (
     get_algorithm, get_option, resolve_algorithm, get_padding,
     get_effective_options, ALGORITHM_ALIASES
 )
-from .algorithms import get_layout_provider, ALGORITHM_REGISTRY
+from .algorithms import available_algorithms, get_layout_provider
 
 
 class ELK:
@@ -28,18 +29,72 @@ class ELK:
     Args:
         default_layout_options: Default layout options applied to all layouts.
         algorithms: List of algorithm IDs to register (for future use).
+        executor: Opt-in parallel layout of independent containers in
+            SEPARATE_CHILDREN mode. Either 'thread', 'process' or an existing
+            ``concurrent.futures.Executor``. Defaults to serial layout.
+        max_workers: Number of workers for an executor created from
+            'thread' or 'process'.
+        cache: Reuse results of identical layouts. Either True for an
+            in-memory ``LayoutCache`` with default bounds, or a configured
+            ``LayoutCache`` (e.g. with an on-disk directory).
     """
 
     def __init__(self, default_layout_options: Optional[Dict[str, str]] = None,
-                 algorithms: Optional[List[str]] = None):
+                 algorithms: Optional[List[str]] = None,
+                 executor: Any = None, max_workers: Optional[int] = None,
+                 cache: Any = None):
         self.default_layout_options = default_layout_options or {}
         self.algorithms = algorithms or [
             'layered', 'stress', 'mrtree', 'radial', 'force',
             'disco', 'sporeOverlap', 'sporeCompaction', 'rectpacking'
         ]
+        if isinstance(executor, str) and executor not in ('thread', 'process'):
+            raise ValueError(
+                f"Unknown executor '{executor}', expected 'thread' or 'process'.")
+        self.executor = executor
+        self.max_workers = max_workers
+        self._owned_executor = None
+        self._batch_pool = None
+        self._batch_workers = None
+        if cache is True:
+            from .cache import LayoutCache
+            cache = LayoutCache()
+        self.cache = cache or None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self) -> None:
+        """Shut down any worker pool created by this instance."""
+        if self._owned_executor is not None:
+            self._owned_executor.shutdown()
+            self._owned_executor = None
+        if self._batch_pool is not None:
+            self._batch_pool.shutdown()
+            self._batch_pool = None
+
+    @property
+    def cache_stats(self) -> Optional[Dict[str, int]]:
+        """Hit, miss and eviction counters of the layout cache, if enabled."""
+        if self.cache is None:
+            return None
+        return self.cache.stats()
+
+    def _get_executor(self):
+        """Return the executor for parallel container layout, if enabled."""
+        if self.executor is None or not isinstance(self.executor, str):
+            return self.executor
+        if self._owned_executor is None:
+            from .parallel import create_executor
+            self._owned_executor = create_executor(self.executor, self.max_workers)
+        return self._owned_executor
 
     def layout(self, graph: dict = None, layout_options: Optional[Dict[str, str]] = None,
-               logging: bool = False, measure_execution_time: bool = False) -> dict:
+               logging: bool = False, measure_execution_time: bool = False,
+               previous: Optional[dict] = None, in_place: bool = True):
         """Perform layout on a graph.
 
         Args:
@@ -49,9 +104,17 @@ class ELK:
                 set directly on elements.
             logging: If True, include logging information in the result.
             measure_execution_time: If True, include execution time measurement.
+            previous: The result of laying out an earlier version of this
+                graph with the same options. Containers whose subtree is
+                unchanged keep their previous layout and only the changed
+                containers are laid out again. Their IDs are reported in
+                ``graph['logging']['recomputed']``.
+            in_place: If False, leave ``graph`` untouched and return a
+                ``LayoutResult`` mapping element IDs to their coordinates.
 
         Returns:
-            The laid-out graph with computed coordinates.
+            The laid-out graph with computed coordinates, or a ``LayoutResult``
+            if ``in_place`` is False.
 
         Raises:
             ValueError: If graph is missing.
@@ -61,19 +124,19 @@ class ELK:
         if graph is None:
             raise ValueError("Missing mandatory parameter 'graph'.")
 
+        if not in_place:
+            from .result import LayoutResult
+            laid_out = self.layout(copy_structure(graph), layout_options, logging,
+                                   measure_execution_time, previous)
+            return LayoutResult.from_graph(laid_out, graph)
+
         # Clean up logging from previous runs
         graph.pop('logging', None)
 
-        start_time = time.time() if measure_execution_time else None
-
-        # Validate graph
-        try:
-            validate_graph(graph)
-        except InvalidGraphException as e:
-            raise e
+        start_time = time.perf_counter() if measure_execution_time else None
 
-        # Normalize edge formats
-        normalize_edges(graph)
+        # Validate graph and normalize edge formats in a single pass
+        index = GraphIndex(graph)
 
         # Merge options: default < global (layout_options) < element-specific
         # Global options from constructor default + per-call layout_options
@@ -85,8 +148,27 @@ class ELK:
         # Layout the graph recursively
         log_data = {'name': 'Root', 'children': []} if logging else None
 
+        cache_key = None
+        cached = None
+        if self.cache is not None:
+            from .cache import layout_key
+            cache_key = layout_key(graph, global_options)
+            cached = self.cache.get(cache_key)
+
+        incremental = None
+        if previous is not None:
+            from .incremental import IncrementalLayout
+            incremental = IncrementalLayout(graph, previous, global_options)
+
         try:
-            self._layout_recursive(graph, global_options, log_data)
+            if cached is not None:
+                from .cache import apply_layout
+                apply_layout(graph, cached)
+            else:
+                self._layout(graph, global_options, index, log_data, incremental)
+                if cache_key is not None:
+                    from .cache import extract_layout
+                    self.cache.put(cache_key, extract_layout(graph))
         except (UnsupportedConfigurationException, UnsupportedGraphException):
             raise
         except ElkError:
@@ -95,41 +177,145 @@ class ELK:
             raise
 
         # Add logging info if requested
-        if logging or measure_execution_time:
+        if logging or measure_execution_time or incremental is not None:
             logging_info = {}
             if logging and log_data:
                 logging_info['name'] = log_data.get('name', 'Root')
                 logging_info['children'] = log_data.get('children', [])
             if measure_execution_time and start_time is not None:
-                elapsed = (time.time() - start_time) * 1000  # ms
+                elapsed = (time.perf_counter() - start_time) * 1000  # ms
                 logging_info['executionTime'] = elapsed
+            if incremental is not None:
+                logging_info['recomputed'] = incremental.recomputed
             graph['logging'] = logging_info
 
         return graph
 
+    def _layout(self, graph: dict, global_options: dict, index: GraphIndex,
+                log_data: Optional[dict] = None, incremental=None) -> None:
+        """Layout a validated and normalized graph, serially or in parallel."""
+        if incremental is not None and incremental.reuse(graph):
+            return
+
+        # Check for cross-hierarchy edges
+        if self._hierarchy_handling(graph, global_options) == 'SEPARATE_CHILDREN':
+            self._check_cross_hierarchy_edges(graph, index)
+
+        executor = self._get_executor()
+        if executor is not None:
+            from .parallel import plan_containers, run_containers
+            tasks = plan_containers(self, graph, global_options, log_data, incremental)
+            run_containers(self, tasks, global_options, executor)
+        else:
+            self._layout_recursive(graph, global_options, log_data, incremental)
+
+    def layout_many(self, graphs: Iterable[dict],
+                    layout_options: Optional[Dict[str, str]] = None,
+                    workers: Optional[int] = None, chunksize: int = 1,
+                    ordered: bool = True, logging: bool = False,
+                    measure_execution_time: bool = False):
+        """Lay out many independent graphs on a persistent process pool.
+
+        The pool is created on first use, keeps every layout provider imported
+        and is reused by later calls until ``close()`` is called. Errors are
+        reported per graph instead of aborting the whole batch.
+
+        Args:
+            graphs: The graphs to layout (each modified in-place).
+            layout_options: Layout options applied to every graph, as for
+                ``layout()``.
+            workers: Number of worker processes. Defaults to the number of
+                CPUs; 0 lays the graphs out in the calling process.
+            chunksize: Number of graphs sent to a worker at a time.
+            ordered: If True, return a list in input order. Otherwise return
+                an iterator yielding results as they complete.
+            logging: If True, include logging information in each result.
+            measure_execution_time: If True, include execution time measurement.
+
+        Returns:
+            ``BatchResult(index, graph, error)`` tuples, one per input graph.
+        """
+        from .parallel import chunked, layout_batch
+
+        graphs = list(graphs)
+        global_options = dict(self.default_layout_options)
+        if layout_options:
+            global_options.update(layout_options)
+        chunks = chunked(graphs, max(1, chunksize))
+        args = (global_options, logging, measure_execution_time)
+
+        if workers == 0:
+            outcomes = (r for chunk in chunks for r in layout_batch(chunk, *args))
+        else:
+            from concurrent.futures import as_completed
+            pool = self._get_batch_pool(workers)
+            futures = [pool.submit(layout_batch, chunk, *args) for chunk in chunks]
+            completed = futures if ordered else as_completed(futures)
+            outcomes = (r for future in completed for r in future.result())
+
+        results = self._collect_batch(graphs, outcomes)
+        return list(results) if ordered else results
+
+    def _get_batch_pool(self, workers: Optional[int]):
+        """Return the batch process pool, (re)creating it for ``workers``."""
+        if self._batch_pool is not None and self._batch_workers != workers:
+            self._batch_pool.shutdown()
+            self._batch_pool = None
+        if self._batch_pool is None:
+            from concurrent.futures import ProcessPoolExecutor
+            from .parallel import init_batch_worker
+            self._batch_pool = ProcessPoolExecutor(
+                max_workers=workers, initializer=init_batch_worker)
+            self._batch_workers = workers
+        return self._batch_pool
+
+    def _collect_batch(self, graphs: List[dict], outcomes):
+        """Copy worker results back onto the input graphs."""
+        from .parallel import BatchResult
+        for index, laid_out, error in outcomes:
+            graph = graphs[index]
+            if laid_out is not None and laid_out is not graph:
+                merge_layout(graph, laid_out)
+                graph.pop('logging', None)
+                if 'logging' in laid_out:
+                    graph['logging'] = laid_out['logging']
+            yield BatchResult(index, graph, error)
+
     def _layout_recursive(self, graph: dict, global_options: dict,
-                          log_data: Optional[dict] = None) -> None:
+                          log_data: Optional[dict] = None, incremental=None) -> None:
         """Recursively layout a graph and its children."""
-        eff_options = get_effective_options(graph, global_options)
+        hierarchy = self._hierarchy_handling(graph, global_options)
 
-        # Check for hierarchy handling
-        hierarchy = eff_options.get('elk.hierarchyHandling') or eff_options.get(
-            'hierarchyHandling') or 'SEPARATE_CHILDREN'
-
-        # Check for cross-hierarchy edges
         if hierarchy == 'SEPARATE_CHILDREN':
-            self._check_cross_hierarchy_edges(graph)
+            # Layout children's sub-graphs first (bottom-up)
+            for child in graph.get('children', []):
+                if child.get('children'):
+                    if incremental is not None and incremental.reuse(child):
+                        continue
+                    self._layout_recursive(child, global_options, log_data, incremental)
 
-        # Layout children's sub-graphs first (bottom-up)
-        for child in graph.get('children', []):
-            if child.get('children'):
-                if hierarchy == 'INCLUDE_CHILDREN':
-                    # Include children in parent layout
-                    pass
-                else:
-                    self._layout_recursive(child, global_options, log_data)
+        check_cancelled()
+        alg_id, provider = self._resolve_provider(graph, global_options)
+
+        # Add log entry
+        entry = None
+        if log_data is not None:
+            entry = self._log_entry(graph, alg_id)
+            log_data['children'].append(entry)
+        if incremental is not None:
+            incremental.mark_recomputed(graph)
+
+        with logging_scope(entry):
+            self._run_provider(graph, global_options, provider, hierarchy)
+
+    def _hierarchy_handling(self, graph: dict, global_options: dict) -> str:
+        """Return the hierarchy handling configured for a graph level."""
+        eff_options = get_effective_options(graph, global_options)
+        return (eff_options.get('elk.hierarchyHandling') or
+                eff_options.get('hierarchyHandling') or 'SEPARATE_CHILDREN')
 
-        # Get the algorithm for this graph level
+    def _resolve_provider(self, graph: dict, global_options: dict):
+        """Return the algorithm id and layout provider for a graph level."""
         alg_id = get_algorithm(graph, global_options)
 
         # Check if algorithm exists
@@ -137,16 +323,26 @@ class ELK:
         if provider is None:
             raise UnsupportedConfigurationException(
                 f"No layout algorithm with id '{alg_id}' is known.")
+        return alg_id, provider
 
-        # Add log entry
-        if log_data is not None:
-            child_log = {
-                'name': f'{alg_id} on {graph.get("id", "?")}',
-                'children': [],
-            }
-            log_data['children'].append(child_log)
+    def _log_entry(self, graph: dict, alg_id: str) -> dict:
+        """Create the logging entry for one graph level."""
+        return new_entry(f'{alg_id} on {graph.get("id", "?")}',
+                         nodes=len(graph.get('children', [])),
+                         edges=len(graph.get('edges', [])))
+
+    def _run_provider(self, graph: dict, global_options: dict, provider,
+                      hierarchy: str) -> None:
+        """Run a provider on a single graph level.
+
+        Child containers must already have been laid out when the hierarchy
+        handling is SEPARATE_CHILDREN.
+        """
+        if hierarchy == 'INCLUDE_CHILDREN' and hasattr(provider, 'layout_hierarchy'):
+            # The provider lays out the whole hierarchy in one pass
+            provider.layout_hierarchy(graph, global_options)
+            return
 
-        # Run the layout
         provider.layout(graph, global_options)
 
         # For INCLUDE_CHILDREN: also layout child containers and their internal edges
@@ -206,70 +402,47 @@ class ELK:
                     'endPoint': {'x': tx, 'y': ty},
                 }]
 
-    def _check_cross_hierarchy_edges(self, graph: dict) -> None:
-        """Check for edges that cross hierarchy boundaries in SEPARATE_CHILDREN mode."""
-        children = graph.get('children', [])
-        if not children:
-            return
-
-        # For each child container, check that its edges only reference
-        # its own descendants (not itself or anything outside).
-        for child in children:
-            child_id = str(child.get('id', ''))
+    def _check_cross_hierarchy_edges(self, graph: dict,
+                                     index: Optional[GraphIndex] = None) -> None:
+        """Check for edges that cross hierarchy boundaries in SEPARATE_CHILDREN mode.
 
-            # Collect IDs of strict descendants (children of this child, not the child itself)
-            inner_ids = set()
-            for grandchild in child.get('children', []):
-                self._collect_descendant_ids(grandchild, inner_ids)
-            # Include ports of the child (these are valid edge endpoints)
-            for port in child.get('ports', []):
-                pid = port.get('id')
-                if pid is not None:
-                    inner_ids.add(str(pid))
-
-            for edge in child.get('edges', []):
-                sources = edge.get('sources', [])
-                targets = edge.get('targets', [])
-                if not sources and 'source' in edge:
-                    sources = [edge['source']]
-                if not targets and 'target' in edge:
-                    targets = [edge['target']]
-
-                for src in sources:
-                    for tgt in targets:
-                        src_str = str(src)
-                        tgt_str = str(tgt)
-
-                        # If either endpoint references the container itself
-                        # or something outside the container, it's cross-hierarchy
-                        if src_str == child_id or tgt_str == child_id:
-                            raise UnsupportedGraphException(
-                                f"Cross-hierarchy edge {edge.get('id', '')} "
-                                f"references container node in SEPARATE_CHILDREN mode")
-                        if src_str not in inner_ids or tgt_str not in inner_ids:
-                            raise UnsupportedGraphException(
-                                f"Cross-hierarchy edge {edge.get('id', '')} "
-                                f"not supported in SEPARATE_CHILDREN mode")
-
-            # Recurse into child's children
-            self._check_cross_hierarchy_edges(child)
-
-    def _collect_descendant_ids(self, node: dict, ids: set) -> None:
-        """Collect all descendant IDs of a node."""
-        nid = node.get('id')
-        if nid is not None:
-            ids.add(str(nid))
-        for port in node.get('ports', []):
-            pid = port.get('id')
-            if pid is not None:
-                ids.add(str(pid))
-        for child in node.get('children', []):
-            self._collect_descendant_ids(child, ids)
+        The edges of every container below ``graph`` may only reference the
+        container's own ports and its strict descendants (and their ports).
+        """
+        if index is None:
+            index = GraphIndex(graph, normalize=False)
+
+        for container, edge, sources, targets in index.edges:
+            if container is graph or not index.is_inside(container, graph):
+                continue
+            container_id = str(container.get('id', ''))
+            for src in sources:
+                for tgt in targets:
+                    # If either endpoint references the container itself
+                    # or something outside the container, it's cross-hierarchy
+                    if src == container_id or tgt == container_id:
+                        raise UnsupportedGraphException(
+                            f"Cross-hierarchy edge {edge.get('id', '')} "
+                            f"references container node in SEPARATE_CHILDREN mode")
+                    if not (self._is_inner_endpoint(index, src, container) and
+                            self._is_inner_endpoint(index, tgt, container)):
+                        raise UnsupportedGraphException(
+                            f"Cross-hierarchy edge {edge.get('id', '')} "
+                            f"not supported in SEPARATE_CHILDREN mode")
+
+    @staticmethod
+    def _is_inner_endpoint(index: GraphIndex, element_id: str, container: dict) -> bool:
+        """Return True if an edge inside ``container`` may reference ``element_id``."""
+        port_owner = index.port_owner.get(element_id)
+        if port_owner is container:
+            return True
+        owner = port_owner if port_owner is not None else index.nodes.get(element_id)
+        return owner is not None and index.is_inside(owner, container)
 
     def known_layout_algorithms(self) -> List[dict]:
         """Return descriptions of all known layout algorithms."""
         result = []
-        for alg_id in ALGORITHM_REGISTRY:
+        for alg_id in available_algorithms():
             result.append({
                 'id': alg_id,
                 'name': alg_id.split('.')[-1],
@@ -10,7 +10,9 @@ class UnsupportedConfigurationException(ElkError):
     """Raised when a graph configuration is unsupported."""
 
     def __init__(self, message=""):
-        full = f"org.eclipse.elk.core.UnsupportedConfigurationException: {message}"
+        prefix = "org.eclipse.elk.core.UnsupportedConfigurationException: "
+        # Re-raising or unpickling passes the already prefixed message
+        full = message if message.startswith(prefix) else prefix + message
         super().__init__(full)
 
 
@@ -18,10 +20,17 @@ class UnsupportedGraphException(ElkError):
     """Raised when a graph structure is unsupported."""
 
     def __init__(self, message=""):
-        full = f"org.eclipse.elk.core.UnsupportedGraphException: {message}"
+        prefix = "org.eclipse.elk.core.UnsupportedGraphException: "
+        # Re-raising or unpickling passes the already prefixed message
+        full = message if message.startswith(prefix) else prefix + message
         super().__init__(full)
 
 
 class InvalidGraphException(ElkError):
     """Raised when a graph is invalid (bad IDs, missing fields)."""
     pass
+
+
+class LayoutCancelledException(ElkError):
+    """Raised inside a running layout when it has been cancelled."""
+    pass
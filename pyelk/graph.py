@@ -22,22 +22,141 @@ def validate_id(element_id) -> str:
     raise InvalidGraphException(f"Element ID must be a string or integer, got {type(element_id).__name__}")
 
 
-def validate_graph(graph: dict) -> None:
-    """Validate a graph structure, raising InvalidGraphException on errors."""
-    if not isinstance(graph, dict):
-        raise InvalidGraphException("Graph must be a dict")
-    if 'id' not in graph:
-        raise InvalidGraphException("Graph must have an 'id' field")
-    validate_id(graph['id'])
-    _validate_children(graph)
+class GraphIndex:
+    """Lookup tables for a graph, built in a single traversal.
+
+    Building the index validates all IDs, rejects duplicate IDs and (unless
+    disabled) normalizes the edge format, so callers do not need further
+    passes over the graph. Nodes, ports and edges have separate ID
+    namespaces: only two nodes, two ports or two edges may not share an ID.
+    Edge IDs are validated like node and port IDs. Every edge end must name a
+    node or port of the graph; an end whose ID names both refers to the port.
+
+    Attributes:
+        nodes: Node ID -> node.
+        ports: Port ID -> port.
+        elements: Edge end ID -> node or port, ports taking precedence.
+        parent: Node ID -> parent node (None for the root).
+        port_owner: Port ID -> node that owns the port.
+        depth: Node ID -> nesting depth (0 for the root).
+        containers: Non-root nodes that have children, in pre-order.
+        edges: ``(node, edge, sources, targets)`` for every edge, grouped by
+            the node containing the edge in pre-order. Sources and targets
+            are string IDs.
+    """
+
+    def __init__(self, graph: dict, normalize: bool = True):
+        if not isinstance(graph, dict):
+            raise InvalidGraphException("Graph must be a dict")
+        if 'id' not in graph:
+            raise InvalidGraphException("Graph must have an 'id' field")
+
+        self.root = graph
+        self.nodes: Dict[str, dict] = {}
+        self.ports: Dict[str, dict] = {}
+        self.elements: Dict[str, dict] = {}
+        self.parent: Dict[str, Optional[dict]] = {}
+        self.port_owner: Dict[str, dict] = {}
+        self.depth: Dict[str, int] = {}
+        self.containers: List[dict] = []
+        self.edges: List[Tuple[dict, dict, List[str], List[str]]] = []
+        # Pre-order containment intervals, keyed by object identity so that
+        # nodes without an ID are covered as well
+        self._interval: Dict[int, Tuple[int, int]] = {}
+        self._build(graph, normalize)
+        self._check_ends()
+
+    def _build(self, graph: dict, normalize: bool) -> None:
+        edge_ids = set()
+        counter = 0
+        # Explicit stack of (node, parent, depth); None marks a finished subtree
+        stack = [(graph, None, 0)]
+        open_nodes = []
+        while stack:
+            entry = stack.pop()
+            if entry is None:
+                node = open_nodes.pop()
+                self._interval[id(node)] = (self._interval[id(node)][0], counter)
+                continue
+            node, parent, depth = entry
+            counter += 1
+            self._interval[id(node)] = (counter, counter)
+            open_nodes.append(node)
+            stack.append(None)
+
+            if 'id' in node:
+                node_id = self._add_element(node, 'node', self.nodes)
+                self.elements.setdefault(node_id, node)
+                self.parent[node_id] = parent
+                self.depth[node_id] = depth
+            for port in node.get('ports', []):
+                if 'id' in port:
+                    port_id = self._add_element(port, 'port', self.ports)
+                    self.elements[port_id] = port
+                    self.port_owner[port_id] = node
+
+            for edge in node.get('edges', []):
+                if normalize:
+                    _normalize_edge(edge)
+                edge_id = edge.get('id')
+                if edge_id is not None:
+                    validate_id(edge_id)
+                    edge_id = str(edge_id)
+                    if edge_id in edge_ids:
+                        raise InvalidGraphException(f"Duplicate edge ID '{edge_id}'")
+                    edge_ids.add(edge_id)
+                sources = edge.get('sources', [])
+                targets = edge.get('targets', [])
+                if not sources and 'source' in edge:
+                    sources = [edge['source']]
+                if not targets and 'target' in edge:
+                    targets = [edge['target']]
+                self.edges.append((node, edge, [str(s) for s in sources],
+                                   [str(t) for t in targets]))
+
+            children = node.get('children', [])
+            if children and parent is not None:
+                self.containers.append(node)
+            for child in reversed(children):
+                stack.append((child, node, depth + 1))
+
+    def _check_ends(self) -> None:
+        """Reject edge ends that name no node or port of the graph."""
+        elements = self.elements
+        for _, edge, sources, targets in self.edges:
+            for end in sources + targets:
+                if end not in elements:
+                    raise InvalidGraphException(
+                        f"Edge '{edge.get('id', '')}' references unknown element '{end}'")
+
+    @staticmethod
+    def _add_element(element: dict, kind: str, table: Dict[str, dict]) -> str:
+        validate_id(element['id'])
+        element_id = str(element['id'])
+        if element_id in table:
+            raise InvalidGraphException(f"Duplicate {kind} ID '{element_id}'")
+        table[element_id] = element
+        return element_id
 
+    def owner(self, element_id: str) -> Optional[dict]:
+        """Return the node an ID refers to, resolving ports to their owner."""
+        port_owner = self.port_owner.get(element_id)
+        if port_owner is not None:
+            return port_owner
+        return self.elements.get(element_id)
 
-def _validate_children(node: dict) -> None:
-    """Recursively validate children."""
-    for child in node.get('children', []):
-        if 'id' in child:
-            validate_id(child['id'])
-        _validate_children(child)
+    def is_inside(self, node: dict, container: dict) -> bool:
+        """Return True if ``node`` is a strict descendant of ``container``."""
+        inner = self._interval.get(id(node))
+        outer = self._interval.get(id(container))
+        if inner is None or outer is None:
+            return False
+        return outer[0] < inner[0] <= outer[1]
+
+
+def validate_graph(graph: dict) -> None:
+    """Validate a graph structure, raising InvalidGraphException on errors."""
+    GraphIndex(graph, normalize=False)
 
 
 def deep_copy_graph(graph: dict) -> dict:
@@ -68,16 +187,8 @@ def _normalize_edge(edge: dict) -> None:
 
 
 def collect_nodes(graph: dict) -> Dict[str, dict]:
-    """Collect all nodes by ID into a flat dict."""
-    nodes = {}
-    if 'id' in graph:
-        nodes[str(graph['id'])] = graph
-    for child in graph.get('children', []):
-        nodes.update(collect_nodes(child))
-    for port in graph.get('ports', []):
-        if 'id' in port:
-            nodes[str(port['id'])] = port
-    return nodes
+    """Collect all nodes and ports by ID into a flat dict, ports taking precedence."""
+    return GraphIndex(graph, normalize=False).elements
 
 
 def collect_edges(graph: dict) -> List[dict]:
@@ -113,3 +224,42 @@ def compute_graph_size(graph: dict, padding: dict) -> None:
 
     graph['width'] = max_x + padding['right']
     graph['height'] = max_y + padding['bottom']
+
+
+# Keys written by layout providers onto graph elements
+LAYOUT_KEYS = ('x', 'y', 'width', 'height', 'sections')
+
+
+def merge_layout(target: dict, source: dict, copy_values: bool = False) -> None:
+    """Copy computed layout data from ``source`` onto the matching ``target``.
+
+    Both graphs must share the same structure; ``source`` is typically a copy
+    of ``target`` that was laid out elsewhere (e.g. in another process).
+    Nested children are only visited where ``source`` contains them. With
+    ``copy_values`` edge sections are copied instead of shared.
+    """
+    for key in LAYOUT_KEYS:
+        if key in source:
+            value = source[key]
+            target[key] = copy.deepcopy(value) if copy_values and key == 'sections' else value
+    for key in ('children', 'ports', 'labels', 'edges'):
+        src_items = source.get(key)
+        if src_items:
+            for tgt_item, src_item in zip(target.get(key, []), src_items):
+                merge_layout(tgt_item, src_item, copy_values)
+
+
+def copy_structure(graph: dict) -> dict:
+    """Copy the element dicts of a graph, sharing all other values.
+
+    Layout only assigns keys on elements, so this is enough to lay out the copy
+    without touching the original, and much cheaper than a deep copy.
+    """
+    if not isinstance(graph, dict):
+        return graph
+    result = dict(graph)
+    for key in ('children', 'ports', 'labels', 'edges'):
+        items = graph.get(key)
+        if isinstance(items, list):
+            result[key] = [copy_structure(item) for item in items]
+    return result
@@ -0,0 +1,54 @@
+"""Incremental relayout of hierarchical graphs.
+
+When a graph is laid out again after a small edit, containers whose subtree
+did not change keep the size and internal coordinates computed by the previous
+layout. Only the containers on the path from the edit up to the root, whose
+fingerprints differ from the previous result, are laid out again.
+"""
+from typing import Dict, List
+
+from .cache import container_fingerprints
+from .graph import merge_layout
+
+
+class IncrementalLayout:
+    """Tracks which containers of a graph can reuse a previous layout.
+
+    Args:
+        graph: The (normalized) graph about to be laid out.
+        previous: The result of laying out an earlier version of the graph
+            with the same layout options.
+        global_options: The global layout options of this layout call.
+    """
+
+    def __init__(self, graph: dict, previous: dict, global_options: dict):
+        current = container_fingerprints(graph, global_options)
+        before = container_fingerprints(previous, global_options)
+        self._reusable: Dict[int, dict] = {}
+        for container_id, (fingerprint, node) in current.items():
+            old = before.get(container_id)
+            if old is not None and old[0] == fingerprint and 'width' in old[1]:
+                self._reusable[id(node)] = old[1]
+        self.recomputed: List[str] = []
+
+    def reuse(self, container: dict) -> bool:
+        """Copy the previous layout of an unchanged container.
+
+        Returns:
+            True if the container was unchanged and its layout was copied.
+        """
+        previous = self._reusable.get(id(container))
+        if previous is None:
+            return False
+        # The container's position and its ports and labels belong to the
+        # parent's layout; everything inside it can be taken over.
+        container['width'] = previous['width']
+        container['height'] = previous['height']
+        for key in ('children', 'edges'):
+            for node, old in zip(container.get(key, []), previous.get(key, [])):
+                merge_layout(node, old, copy_values=True)
+        return True
+
+    def mark_recomputed(self, container: dict) -> None:
+        """Record that a container was laid out again."""
+        self.recomputed.append(str(container.get('id', '')))
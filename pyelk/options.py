@@ -16,9 +16,18 @@ DEFAULTS = {
     'elk.layered.spacing.edgeEdgeBetweenLayers': 10.0,
     'elk.nodeLabels.placement': '',
     'elk.portConstraints': 'UNDEFINED',
+    'elk.layered.cycleBreaking.strategy': 'DEPTH_FIRST',
     'elk.layered.crossingMinimization.strategy': 'LAYER_SWEEP',
+    'elk.layered.crossingMinimization.forceNodeModelOrder': False,
+    'elk.layered.considerModelOrder.strategy': 'NONE',
     'elk.layered.layering.strategy': 'LONGEST_PATH',
+    'elk.layered.thoroughness': 7,
+    'elk.layered.nodePlacement.strategy': 'SIMPLE',
+    'elk.edgeRouting': 'POLYLINE',
     'elk.hierarchyHandling': 'SEPARATE_CHILDREN',
+    'elk.separateConnectedComponents': False,
+    'elk.spacing.componentComponent': 20.0,
+    'elk.aspectRatio': 1.6,
 }
 
 # Aliases: short names to full qualified names
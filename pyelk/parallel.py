@@ -0,0 +1,248 @@
+"""Parallel execution of layouts.
+
+In SEPARATE_CHILDREN mode the sub-graphs of sibling containers are independent
+until their parent is laid out. The containers of a hierarchy therefore form a
+dependency DAG: every container depends on its child containers only. This
+module runs that DAG on a thread or process pool, starting each parent as soon
+as its last child has finished.
+
+It also contains the worker side of ``ELK.layout_many``, which lays out
+batches of independent graphs on a persistent process pool, and the process
+pools that layout providers share between calls.
+"""
+import contextvars
+import pickle
+import threading
+from concurrent.futures import (
+    Executor, ProcessPoolExecutor, ThreadPoolExecutor, FIRST_COMPLETED, wait
+)
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from .cancellation import check_cancelled
+from .graph import merge_layout
+from .timing import logging_scope, new_entry
+
+
+EXECUTOR_KINDS = ('thread', 'process')
+
+# Persistent process pools of layout providers by worker count
+_shared_pools = {}
+_shared_pools_lock = threading.Lock()
+
+
+class BatchResult(NamedTuple):
+    """Outcome of laying out one graph of a batch.
+
+    Attributes:
+        index: Position of the graph in the input sequence.
+        graph: The input graph, laid out in place (unchanged on error).
+        error: The exception raised while laying out the graph, if any.
+    """
+    index: int
+    graph: dict
+    error: Optional[BaseException] = None
+
+
+class ContainerTask:
+    """A single graph level waiting to be laid out."""
+
+    def __init__(self, graph: dict, hierarchy: str, alg_id: str,
+                 parent: Optional['ContainerTask'] = None):
+        self.graph = graph
+        self.hierarchy = hierarchy
+        self.alg_id = alg_id
+        self.parent = parent
+        self.pending = 0  # number of child containers not yet laid out
+        self.log_entry: Optional[dict] = None
+
+
+def create_executor(kind: str, max_workers: Optional[int] = None) -> Executor:
+    """Create an executor for the given kind ('thread' or 'process')."""
+    if kind == 'thread':
+        return ThreadPoolExecutor(max_workers=max_workers)
+    if kind == 'process':
+        return ProcessPoolExecutor(max_workers=max_workers)
+    raise ValueError(f"Unknown executor kind '{kind}', expected one of {EXECUTOR_KINDS}")
+
+
+def shared_process_pool(workers: int) -> ProcessPoolExecutor:
+    """Return the persistent process pool with ``workers`` workers.
+
+    The pool is created on first use and reused by later layouts, so worker
+    start-up is paid once per process rather than once per layout.
+    """
+    with _shared_pools_lock:
+        pool = _shared_pools.get(workers)
+        if pool is None or getattr(pool, '_broken', False):
+            pool = _shared_pools[workers] = ProcessPoolExecutor(max_workers=workers)
+        return pool
+
+
+def shutdown_shared_pools() -> None:
+    """Shut down all persistent provider pools."""
+    with _shared_pools_lock:
+        pools = list(_shared_pools.values())
+        _shared_pools.clear()
+    for pool in pools:
+        pool.shutdown()
+
+
+def plan_containers(elk, graph: dict, global_options: dict,
+                    log_data: Optional[dict] = None,
+                    incremental=None) -> List[ContainerTask]:
+    """Build the container tasks of a hierarchy in serial (post-)order.
+
+    Resolves all providers before anything is laid out and records the log
+    entries in the order the serial path would. Containers that can reuse a
+    previous layout are not planned.
+    """
+    tasks = []
+
+    def visit(node: dict, parent: Optional[ContainerTask]) -> None:
+        hierarchy = elk._hierarchy_handling(node, global_options)
+        task = ContainerTask(node, hierarchy, '', parent)
+        if hierarchy == 'SEPARATE_CHILDREN':
+            for child in node.get('children', []):
+                if child.get('children'):
+                    if incremental is not None and incremental.reuse(child):
+                        continue
+                    task.pending += 1
+                    visit(child, task)
+        task.alg_id, _ = elk._resolve_provider(node, global_options)
+        if log_data is not None:
+            task.log_entry = elk._log_entry(node, task.alg_id)
+            log_data['children'].append(task.log_entry)
+        if incremental is not None:
+            incremental.mark_recomputed(node)
+        tasks.append(task)
+
+    visit(graph, None)
+    return tasks
+
+
+def run_containers(elk, tasks: List[ContainerTask], global_options: dict,
+                   executor: Executor) -> None:
+    """Lay out planned containers on an executor, children before parents."""
+    in_process = isinstance(executor, ProcessPoolExecutor)
+    futures = {}
+
+    def submit(task: ContainerTask) -> None:
+        if in_process:
+            future = executor.submit(_layout_snapshot, _snapshot(task),
+                                     global_options, task.alg_id, task.hierarchy,
+                                     task.log_entry is not None)
+        else:
+            # Threads start from an empty context: carry over the caller's
+            # cancellation and logging scopes
+            _, provider = elk._resolve_provider(task.graph, global_options)
+            future = executor.submit(contextvars.copy_context().run, _run_logged,
+                                     elk, task, global_options, provider)
+        futures[future] = task
+
+    for task in tasks:
+        if task.pending == 0:
+            submit(task)
+
+    try:
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            check_cancelled()
+            for future in done:
+                task = futures.pop(future)
+                result = future.result()
+                if in_process:
+                    laid_out, entry = result
+                    merge_layout(task.graph, laid_out)
+                    if entry is not None:
+                        task.log_entry['children'] = entry['children']
+                        task.log_entry['executionTime'] = entry['executionTime']
+                parent = task.parent
+                if parent is not None:
+                    parent.pending -= 1
+                    if parent.pending == 0:
+                        submit(parent)
+    finally:
+        for future in futures:
+            future.cancel()
+
+
+def _snapshot(task: ContainerTask) -> dict:
+    """Copy the part of a container its own layout needs.
+
+    With SEPARATE_CHILDREN the sub-graphs of child containers are already laid
+    out and only their sizes matter, so they are left out of the snapshot.
+    """
+    if task.hierarchy != 'SEPARATE_CHILDREN':
+        return task.graph
+    snapshot = dict(task.graph)
+    snapshot['children'] = [
+        {k: v for k, v in child.items() if k not in ('children', 'edges')}
+        for child in task.graph.get('children', [])
+    ]
+    return snapshot
+
+
+def _run_logged(elk, task: ContainerTask, global_options: dict, provider) -> None:
+    """Thread pool entry point: lay out a container, timing it if logging."""
+    with logging_scope(task.log_entry):
+        elk._run_provider(task.graph, global_options, provider, task.hierarchy)
+
+
+def _layout_snapshot(graph: dict, global_options: dict, alg_id: str,
+                     hierarchy: str, logging: bool = False) -> Tuple[dict, Optional[dict]]:
+    """Process pool entry point: lay out a single container snapshot.
+
+    Returns the laid-out snapshot and, if ``logging`` is set, a logging entry
+    with the timings recorded in the worker.
+    """
+    from .elk import ELK
+    from .algorithms import get_layout_provider
+    entry = new_entry(alg_id) if logging else None
+    with logging_scope(entry):
+        ELK()._run_provider(graph, global_options, get_layout_provider(alg_id), hierarchy)
+    return graph, entry
+
+
+def init_batch_worker() -> None:
+    """Process pool initializer: import every provider once per worker."""
+    from .algorithms import available_algorithms, get_layout_provider
+    for alg_id in available_algorithms():
+        get_layout_provider(alg_id)
+
+
+def layout_batch(items: List[Tuple[int, dict]], global_options: dict,
+                 logging: bool, measure_execution_time: bool) -> List[tuple]:
+    """Lay out a chunk of ``(index, graph)`` pairs, capturing errors per graph."""
+    from .elk import ELK
+    elk = ELK()
+    results = []
+    for index, graph in items:
+        try:
+            elk.layout(graph, layout_options=global_options, logging=logging,
+                       measure_execution_time=measure_execution_time)
+            results.append((index, graph, None))
+        except Exception as e:
+            results.append((index, None, _picklable_error(e)))
+    return results
+
+
+def _picklable_error(error: Exception) -> Exception:
+    """Return ``error`` or, if it cannot cross a process boundary, a stand-in."""
+    from .exceptions import ElkError
+    try:
+        pickle.dumps(error)
+    except Exception:
+        return ElkError(f"{type(error).__name__}: {error}")
+    return error
+
+
+def chunked(graphs: Iterable[dict], chunksize: int) -> Iterator[List[Tuple[int, dict]]]:
+    """Split graphs into lists of ``(index, graph)`` pairs."""
+    chunk = []
+    for index, graph in enumerate(graphs):
+        chunk.append((index, graph))
+        if len(chunk) >= chunksize:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
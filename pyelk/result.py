@@ -0,0 +1,113 @@
+"""Compact layout results for non-mutating layouts."""
+from collections.abc import Mapping
+from typing import Dict, Iterator, List, Optional
+
+from .graph import copy_structure, normalize_edges
+
+
+_GEOMETRY_KEYS = ('x', 'y', 'width', 'height')
+
+
+class LayoutResult(Mapping):
+    """Computed coordinates of a graph laid out with ``in_place=False``.
+
+    The result maps element IDs to their layout: nodes and ports to a dict
+    with ``x``, ``y``, ``width`` and ``height``, edges to a dict with their
+    ``sections``. The input graph is left untouched; use ``apply_to`` or
+    ``to_dict`` to materialize the full ELK JSON only when needed.
+
+    Attributes:
+        nodes: Node ID -> geometry (including the root graph).
+        ports: Port ID -> geometry relative to the owning node.
+        edges: Edge ID -> list of edge sections.
+        labels: Owner ID -> label geometries, in label order.
+        logging: Logging information, if requested.
+    """
+
+    def __init__(self, source: Optional[dict] = None):
+        self.source = source
+        self.nodes: Dict[str, dict] = {}
+        self.ports: Dict[str, dict] = {}
+        self.edges: Dict[str, list] = {}
+        self.labels: Dict[str, List[dict]] = {}
+        self.logging: Optional[dict] = None
+
+    @classmethod
+    def from_graph(cls, laid_out: dict, source: Optional[dict] = None) -> 'LayoutResult':
+        """Collect the layout of a laid-out graph."""
+        result = cls(source)
+        result.logging = laid_out.get('logging')
+        stack = [laid_out]
+        while stack:
+            node = stack.pop()
+            node_id = node.get('id')
+            if node_id is not None:
+                node_id = str(node_id)
+                result.nodes[node_id] = _geometry(node)
+                if node.get('labels'):
+                    result.labels[node_id] = [_geometry(l) for l in node['labels']]
+            for port in node.get('ports', []):
+                if port.get('id') is not None:
+                    result.ports[str(port['id'])] = _geometry(port)
+            for edge in node.get('edges', []):
+                if edge.get('id') is not None and 'sections' in edge:
+                    result.edges[str(edge['id'])] = edge['sections']
+            stack.extend(node.get('children', []))
+        return result
+
+    def __getitem__(self, element_id: str) -> dict:
+        element_id = str(element_id)
+        if element_id in self.nodes:
+            return self.nodes[element_id]
+        if element_id in self.ports:
+            return self.ports[element_id]
+        if element_id in self.edges:
+            return {'sections': self.edges[element_id]}
+        raise KeyError(element_id)
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.nodes
+        yield from self.ports
+        yield from self.edges
+
+    def __len__(self) -> int:
+        return len(self.nodes) + len(self.ports) + len(self.edges)
+
+    def apply_to(self, graph: dict) -> dict:
+        """Write the layout onto a graph with matching IDs and return it.
+
+        Primitive edges are normalized to ``sources`` and ``targets``, as an
+        in-place layout does.
+        """
+        normalize_edges(graph)
+        stack = [graph]
+        while stack:
+            node = stack.pop()
+            node_id = node.get('id')
+            if node_id is not None:
+                node_id = str(node_id)
+                node.update(self.nodes.get(node_id, {}))
+                for label, geometry in zip(node.get('labels', []),
+                                           self.labels.get(node_id, [])):
+                    label.update(geometry)
+            for port in node.get('ports', []):
+                if port.get('id') is not None:
+                    port.update(self.ports.get(str(port['id']), {}))
+            for edge in node.get('edges', []):
+                sections = self.edges.get(str(edge.get('id')))
+                if sections is not None:
+                    edge['sections'] = sections
+            stack.extend(node.get('children', []))
+        if self.logging is not None:
+            graph['logging'] = self.logging
+        return graph
+
+    def to_dict(self) -> dict:
+        """Return the laid-out graph in ELK JSON, leaving the input untouched."""
+        if self.source is None:
+            raise ValueError("The result does not reference its input graph")
+        return self.apply_to(copy_structure(self.source))
+
+
+def _geometry(element: dict) -> dict:
+    return {k: element[k] for k in _GEOMETRY_KEYS if k in element}
@@ -0,0 +1,60 @@
+"""Hierarchical timing of layout runs for the logging output.
+
+When logging is requested, every laid-out container gets an entry in
+``graph['logging']`` and the phases run by its layout provider are recorded as
+child entries with their elapsed time in milliseconds and element counts.
+Providers mark their phases with ``phase``; the active entry is tracked in a
+context variable so providers need no extra parameters.
+"""
+import contextvars
+import time
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+from .cancellation import check_cancelled
+
+
+_current_entry: contextvars.ContextVar = contextvars.ContextVar(
+    'pyelk_log_entry', default=None)
+
+
+def new_entry(name: str, **counts) -> dict:
+    """Create a logging entry."""
+    entry = {'name': name}
+    entry.update(counts)
+    entry['children'] = []
+    return entry
+
+
+@contextmanager
+def logging_scope(entry: Optional[dict]) -> Iterator[Optional[dict]]:
+    """Time the enclosed code into ``entry`` and record phases below it."""
+    if entry is None:
+        yield None
+        return
+    token = _current_entry.set(entry)
+    start = time.perf_counter()
+    try:
+        yield entry
+    finally:
+        entry['executionTime'] = (time.perf_counter() - start) * 1000  # ms
+        _current_entry.reset(token)
+
+
+@contextmanager
+def phase(name: str, **counts) -> Iterator[Optional[dict]]:
+    """Mark a layout phase.
+
+    Checks for cancellation before the phase starts. If logging is active,
+    adds a timed entry with the given element counts below the current entry
+    and yields it so further counts can be added; otherwise yields None.
+    """
+    check_cancelled()
+    parent = _current_entry.get()
+    if parent is None:
+        yield None
+        return
+    entry = new_entry(name, **counts)
+    parent['children'].append(entry)
+    with logging_scope(entry):
+        yield entry
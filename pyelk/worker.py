@@ -0,0 +1,91 @@
+"""Long-lived layout worker speaking the elkjs worker protocol over stdio.
+
+Run with ``python -m pyelk.worker``. The worker reads newline-delimited JSON
+messages from stdin and writes one JSON response per line to stdout, so a
+single warm process can serve an unbounded stream of requests.
+
+Messages mirror those posted to elkjs's ``elk-worker``::
+
+    {"id": 1, "cmd": "layout", "graph": {...},
+     "layoutOptions": {...}, "options": {"logging": false,
+                                         "measureExecutionTime": false}}
+    {"id": 2, "cmd": "knownLayoutAlgorithms"}
+    {"id": 3, "cmd": "knownLayoutOptions"}
+    {"id": 4, "cmd": "knownLayoutCategories"}
+    {"id": 5, "cmd": "register", "algorithms": [...]}
+
+Responses are ``{"id": ..., "data": ...}`` on success and
+``{"id": ..., "error": {"name": ..., "message": ...}}`` on failure.
+"""
+import json
+import sys
+from typing import Optional, TextIO
+
+from .algorithms import available_algorithms, get_layout_provider
+from .elk import ELK
+
+
+def handle_message(elk: ELK, message: dict) -> dict:
+    """Execute a single worker message and return its response."""
+    msg_id = message.get('id')
+    try:
+        cmd = message.get('cmd')
+        if cmd == 'layout':
+            options = message.get('options') or {}
+            data = elk.layout(
+                message.get('graph'),
+                layout_options=message.get('layoutOptions'),
+                logging=bool(options.get('logging', False)),
+                measure_execution_time=bool(options.get('measureExecutionTime', False)))
+        elif cmd == 'knownLayoutAlgorithms':
+            data = elk.known_layout_algorithms()
+        elif cmd == 'knownLayoutOptions':
+            data = elk.known_layout_options()
+        elif cmd == 'knownLayoutCategories':
+            data = elk.known_layout_categories()
+        elif cmd == 'register':
+            # Every algorithm is built in and already loaded
+            data = True
+        else:
+            raise ValueError(f"Unknown command '{cmd}'")
+    except Exception as e:
+        return {'id': msg_id, 'error': _describe_error(e)}
+    return {'id': msg_id, 'data': data}
+
+
+def _describe_error(error: Exception) -> dict:
+    return {'name': type(error).__name__, 'message': str(error)}
+
+
+def serve(input_stream: TextIO, output_stream: TextIO,
+          elk: Optional[ELK] = None) -> None:
+    """Serve worker messages from ``input_stream`` until it is closed."""
+    elk = elk or ELK()
+
+    # Import and instantiate every provider up front so requests start warm
+    for alg_id in available_algorithms():
+        get_layout_provider(alg_id)
+
+    for line in iter(input_stream.readline, ''):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            message = json.loads(line)
+            if not isinstance(message, dict):
+                raise ValueError("Message must be a JSON object")
+        except ValueError as e:
+            response = {'id': None, 'error': _describe_error(e)}
+        else:
+            response = handle_message(elk, message)
+        output_stream.write(json.dumps(response) + '\n')
+        output_stream.flush()
+
+
+def main() -> None:
+    """Entry point for ``python -m pyelk.worker``."""
+    serve(sys.stdin, sys.stdout)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,25 @@
+"""Graph factories shared by the tests."""
+
+
+def layered_graph(edges, node_count, widths=None, **options):
+    """Return a flat graph of nodes n0, n1, ... and edges between their indices.
+
+    Nodes are 20 wide (or ``widths[i]``) and 10 high. ``options`` are added
+    to the layout options, which default to the layered algorithm and
+    direction DOWN.
+    """
+    layout_options = {'elk.algorithm': 'layered', 'elk.direction': 'DOWN'}
+    layout_options.update(options)
+    return {
+        'id': 'root',
+        'layoutOptions': layout_options,
+        'children': [{'id': f'n{i}', 'width': widths[i] if widths else 20, 'height': 10}
+                     for i in range(node_count)],
+        'edges': [{'id': f'e{i}', 'sources': [f'n{s}'], 'targets': [f'n{t}']}
+                  for i, (s, t) in enumerate(edges)],
+    }
+
+
+def random_edges(rnd, node_count, edge_count):
+    """Return ``edge_count`` random edges between distinct nodes."""
+    return [tuple(rnd.sample(range(node_count), 2)) for _ in range(edge_count)]
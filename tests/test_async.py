@@ -0,0 +1,120 @@
+"""Tests for the asyncio layout API and layout cancellation."""
+import asyncio
+import copy
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+from pyelk import AsyncELK, ELK, InvalidGraphException, LayoutCancelledException
+from pyelk.cancellation import cancellation_scope
+
+
+SIMPLE_GRAPH = {
+    "id": "root",
+    "layoutOptions": {"elk.direction": "RIGHT"},
+    "children": [
+        {"id": "n1", "width": 10, "height": 10},
+        {"id": "n2", "width": 10, "height": 10},
+    ],
+    "edges": [
+        {"id": "e1", "sources": ["n1"], "targets": ["n2"]}
+    ],
+}
+
+
+def _large_stress_graph(n=300, graph_id="root"):
+    prefix = "" if graph_id == "root" else graph_id
+    return {
+        "id": graph_id,
+        "layoutOptions": {"elk.algorithm": "stress"},
+        "children": [{"id": f"{prefix}n{i}", "width": 10, "height": 10} for i in range(n)],
+        "edges": [{"id": f"{prefix}e{i}", "sources": [f"{prefix}n{i}"],
+                   "targets": [f"{prefix}n{i + 1}"]}
+                  for i in range(n - 1)],
+    }
+
+
+class TestAsyncELK:
+    """Tests for AsyncELK."""
+
+    def test_layout_matches_sync(self):
+        expected = ELK().layout(copy.deepcopy(SIMPLE_GRAPH))
+        result = asyncio.run(AsyncELK().layout(copy.deepcopy(SIMPLE_GRAPH)))
+        assert result == expected
+
+    def test_concurrent_layouts_are_bounded(self):
+        async def run():
+            elk = AsyncELK(max_concurrency=2)
+            graphs = [copy.deepcopy(SIMPLE_GRAPH) for _ in range(5)]
+            return await asyncio.gather(*(elk.layout(g) for g in graphs))
+
+        results = asyncio.run(run())
+        assert all(r['children'][1]['x'] > r['children'][0]['x'] for r in results)
+
+    def test_errors_propagate(self):
+        with pytest.raises(InvalidGraphException):
+            asyncio.run(AsyncELK().layout({"id": True}))
+
+    def test_process_pool_executor(self):
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            graph = copy.deepcopy(SIMPLE_GRAPH)
+            result = asyncio.run(AsyncELK(executor=pool).layout(graph))
+        assert result is graph
+        assert result['edges'][0]['sections'] == \
+            ELK().layout(copy.deepcopy(SIMPLE_GRAPH))['edges'][0]['sections']
+
+    def test_cancellation_stops_the_layout(self):
+        executor = ThreadPoolExecutor(max_workers=1)
+
+        async def run():
+            elk = AsyncELK(executor=executor)
+            task = asyncio.ensure_future(elk.layout(_large_stress_graph()))
+            await asyncio.sleep(0.2)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+        # The single worker thread must be free again shortly after cancelling
+        start = time.monotonic()
+        executor.submit(lambda: None).result(timeout=5)
+        assert time.monotonic() - start < 2
+        executor.shutdown()
+
+    def test_cancellation_reaches_container_threads(self):
+        executor = ThreadPoolExecutor(max_workers=1)
+        elk = ELK(executor='thread', max_workers=2)
+        graph = {"id": "root",
+                 "children": [_large_stress_graph(graph_id=f"c{i}") for i in range(2)]}
+
+        async def run():
+            task = asyncio.ensure_future(
+                AsyncELK(executor=executor, elk=elk).layout(graph))
+            await asyncio.sleep(0.2)
+            task.cancel()
+            with pytest.raises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(run())
+        # Both containers stop, not only the thread waiting for them
+        start = time.monotonic()
+        executor.submit(lambda: None).result(timeout=30)
+        elk.close()
+        assert time.monotonic() - start < 2
+        executor.shutdown()
+
+
+class TestCancellationScope:
+    """Tests for cooperative cancellation of synchronous layouts."""
+
+    def test_set_event_cancels_layout(self):
+        event = threading.Event()
+        event.set()
+        with cancellation_scope(event):
+            with pytest.raises(LayoutCancelledException):
+                ELK().layout(copy.deepcopy(SIMPLE_GRAPH))
+
+    def test_unset_event_does_not_cancel(self):
+        with cancellation_scope(threading.Event()):
+            assert ELK().layout(copy.deepcopy(SIMPLE_GRAPH)) is not None
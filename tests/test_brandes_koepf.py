@@ -0,0 +1,50 @@
+"""Tests for Brandes-Koepf node placement in the layered algorithm."""
+import random
+
+from pyelk import ELK
+
+from .helpers import layered_graph
+
+BRANDES_KOEPF = {'elk.layered.nodePlacement.strategy': 'BRANDES_KOEPF'}
+
+
+def _center_x(node):
+    return node['x'] + node['width'] / 2
+
+
+class TestBrandesKoepf:
+
+    def test_chain_is_straight(self):
+        graph = ELK().layout(layered_graph([(0, 1), (1, 2), (2, 3)], 4, **BRANDES_KOEPF))
+        assert len({_center_x(c) for c in graph['children']}) == 1
+
+    def test_long_edge_is_straight(self):
+        # n0 -> n3 passes n1 and n2 through two dummy nodes
+        graph = ELK().layout(layered_graph([(0, 1), (1, 2), (2, 3), (0, 3), (4, 2)], 5,
+                                           **BRANDES_KOEPF))
+        long_edge = graph['edges'][3]['sections'][0]
+        points = long_edge['bendPoints'] + [long_edge['endPoint']]
+        assert len({p['x'] for p in long_edge['bendPoints']}) == 1
+        assert len(points) == 3
+
+    def test_nodes_do_not_overlap(self):
+        rnd = random.Random(4)
+        edges = [tuple(sorted(rnd.sample(range(60), 2))) for _ in range(120)]
+        widths = [rnd.randint(10, 50) for _ in range(60)]
+        graph = ELK().layout(layered_graph(edges, 60, widths, **BRANDES_KOEPF))
+        rows = {}
+        for child in graph['children']:
+            rows.setdefault(child['y'], []).append((child['x'], child['x'] + child['width']))
+        for row in rows.values():
+            row.sort()
+            for (_, right), (left, _) in zip(row, row[1:]):
+                assert left - right >= 20 - 1e-9
+        # The leftmost node or long edge dummy sits at the padding
+        bends = [p['x'] for e in graph['edges'] for p in e['sections'][0].get('bendPoints', [])]
+        assert min([c['x'] for c in graph['children']] + bends) == 12
+
+    def test_horizontal_direction(self):
+        graph = ELK().layout(layered_graph([(0, 1), (1, 2)], 3, **BRANDES_KOEPF,
+                                           **{'elk.direction': 'RIGHT'}))
+        assert len({c['y'] for c in graph['children']}) == 1
+        assert len({c['x'] for c in graph['children']}) == 3
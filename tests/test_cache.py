@@ -0,0 +1,149 @@
+"""Tests for the content-addressed layout result cache."""
+import copy
+import pytest
+from pyelk import ELK
+from pyelk.cache import (
+    LayoutCache, apply_layout, container_fingerprints, extract_layout, layout_key)
+
+
+GRAPH = {
+    "id": "root",
+    "layoutOptions": {"elk.direction": "RIGHT"},
+    "children": [
+        {"id": "n1", "width": 10, "height": 10,
+         "ports": [{"id": "p1", "width": 4, "height": 4}],
+         "labels": [{"text": "n1", "width": 8, "height": 4,
+                     "layoutOptions": {"elk.nodeLabels.placement": "INSIDE V_TOP H_LEFT"}}]},
+        {"id": "n2", "width": 20, "height": 10},
+        {"id": "c", "children": [{"id": "a", "width": 5, "height": 5},
+                                 {"id": "b", "width": 5, "height": 5}],
+         "edges": [{"id": "e_ab", "sources": ["a"], "targets": ["b"]}]},
+    ],
+    "edges": [
+        {"id": "e1", "sources": ["p1"], "targets": ["n2"]},
+        {"id": "e2", "sources": ["n2"], "targets": ["c"]},
+    ],
+}
+
+
+def fresh_graph():
+    return copy.deepcopy(GRAPH)
+
+
+class TestLayoutKey:
+    """Tests for the canonical graph hash."""
+
+    def test_layout_output_does_not_change_key(self):
+        graph = fresh_graph()
+        key = layout_key(graph)
+        ELK().layout(graph)
+        assert layout_key(graph) == key
+
+    def test_sizes_and_options_change_key(self):
+        key = layout_key(fresh_graph())
+        graph = fresh_graph()
+        graph['children'][1]['width'] = 21
+        assert layout_key(graph) != key
+        assert layout_key(fresh_graph(), {'elk.direction': 'DOWN'}) != key
+
+    def test_port_and_edge_labels_change_key(self):
+        key = layout_key(fresh_graph())
+        graph = fresh_graph()
+        graph['children'][0]['ports'][0]['labels'] = [{'text': 'p', 'width': 6, 'height': 4}]
+        port_key = layout_key(graph)
+        graph['children'][0]['ports'][0]['labels'][0]['width'] = 7
+        assert len({key, port_key, layout_key(graph)}) == 3
+        graph = fresh_graph()
+        graph['edges'][0]['labels'] = [{'text': 'e', 'width': 6, 'height': 4}]
+        assert layout_key(graph) != key
+
+    def test_positions_only_matter_for_position_based_algorithms(self):
+        graph = fresh_graph()
+        graph['children'][0]['x'] = 50
+        assert layout_key(graph) == layout_key(fresh_graph())
+        options = {'elk.algorithm': 'fixed'}
+        assert layout_key(graph, options) != layout_key(fresh_graph(), options)
+        options = {'elk.layered.layering.strategy': 'INTERACTIVE'}
+        assert layout_key(graph, options) != layout_key(fresh_graph(), options)
+        graph['children'][2]['children'][0]['x'] = 50
+        assert (container_fingerprints(graph, options)['c'][0] !=
+                container_fingerprints(fresh_graph(), options)['c'][0])
+        assert (container_fingerprints(graph)['c'][0] ==
+                container_fingerprints(fresh_graph())['c'][0])
+
+
+class TestLayoutCache:
+    """Tests for cached layouts through ELK."""
+
+    def test_hit_writes_coordinates_back(self):
+        elk = ELK(cache=True)
+        expected = elk.layout(fresh_graph())
+        result = elk.layout(fresh_graph())
+        assert result == expected
+        assert elk.cache_stats['hits'] == 1
+        assert elk.cache_stats['misses'] == 1
+
+    def test_cached_results_are_not_shared(self):
+        elk = ELK(cache=True)
+        elk.layout(fresh_graph())
+        first = elk.layout(fresh_graph())
+        first['edges'][0]['sections'][0]['startPoint']['x'] = -1
+        second = elk.layout(fresh_graph())
+        assert second['edges'][0]['sections'][0]['startPoint']['x'] != -1
+
+    def test_moved_nodes_miss_with_interactive_strategies(self):
+        elk = ELK(cache=True)
+        options = {'elk.layered.crossingMinimization.strategy': 'INTERACTIVE'}
+        graph = ELK().layout(fresh_graph(), layout_options=options)
+        elk.layout(copy.deepcopy(graph), layout_options=options)
+        elk.layout(copy.deepcopy(graph), layout_options=options)
+        moved = copy.deepcopy(graph)
+        moved['children'][0]['y'] += 100
+        elk.layout(moved, layout_options=options)
+        assert elk.cache_stats['hits'] == 1
+        assert elk.cache_stats['misses'] == 2
+
+    def test_port_and_edge_label_positions_are_stored(self):
+        graph = fresh_graph()
+        graph['children'][0]['ports'][0]['labels'] = [{'text': 'p', 'x': 1, 'y': 2}]
+        graph['edges'][0]['labels'] = [{'text': 'e', 'x': 3, 'y': 4}]
+        target = fresh_graph()
+        target['children'][0]['ports'][0]['labels'] = [{'text': 'p'}]
+        target['edges'][0]['labels'] = [{'text': 'e'}]
+        apply_layout(target, extract_layout(graph))
+        assert target['children'][0]['ports'][0]['labels'][0] == {'text': 'p', 'x': 1, 'y': 2}
+        assert target['edges'][0]['labels'][0] == {'text': 'e', 'x': 3, 'y': 4}
+
+    def test_cache_disabled_by_default(self):
+        assert ELK().cache_stats is None
+
+    def test_lru_eviction_by_entries(self):
+        elk = ELK(cache=LayoutCache(max_entries=2))
+        for direction in ('RIGHT', 'DOWN', 'LEFT'):
+            elk.layout(fresh_graph(), layout_options={'elk.direction': direction})
+        assert elk.cache_stats['evictions'] == 1
+        assert elk.cache_stats['entries'] == 2
+
+    def test_lru_eviction_by_bytes(self):
+        cache = LayoutCache(max_bytes=1)
+        ELK(cache=cache).layout(fresh_graph())
+        assert cache.stats()['entries'] == 0
+        assert cache.stats()['bytes'] == 0
+
+    def test_disk_tier(self, tmp_path):
+        expected = ELK(cache=LayoutCache(directory=str(tmp_path))).layout(fresh_graph())
+        # A new cache (e.g. after a restart) finds the result on disk
+        elk = ELK(cache=LayoutCache(directory=str(tmp_path)))
+        assert elk.layout(fresh_graph()) == expected
+        assert elk.cache_stats['hits'] == 1
+        assert elk.cache_stats['entries'] == 1
+
+    def test_failed_disk_write_keeps_the_layout(self, tmp_path):
+        # The cache directory cannot be created where a file is
+        directory = tmp_path / 'cache'
+        directory.write_text('')
+        elk = ELK(cache=LayoutCache(directory=str(directory)))
+        expected = ELK().layout(fresh_graph())
+        assert elk.layout(fresh_graph()) == expected
+        assert elk.layout(fresh_graph()) == expected
+        assert elk.cache_stats['hits'] == 1
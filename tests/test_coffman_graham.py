@@ -0,0 +1,46 @@
+"""Tests for Coffman-Graham layer assignment."""
+from collections import Counter
+
+from pyelk import ELK
+
+from .helpers import layered_graph
+
+
+# Three independent chains below one source, plus five loose nodes
+CHAINS = [(0, 1), (1, 2), (0, 3), (3, 4), (0, 5), (5, 6)]
+
+
+def _chains(bound=None):
+    options = {'elk.layered.layering.strategy': 'COFFMAN_GRAHAM'}
+    if bound is not None:
+        options['elk.layered.layering.coffmanGraham.layerBound'] = bound
+    return layered_graph(CHAINS, 12, **options)
+
+
+def _layers(graph):
+    rows = sorted({c['y'] for c in graph['children']})
+    return {c['id']: rows.index(c['y']) for c in graph['children']}
+
+
+class TestCoffmanGraham:
+
+    def test_unbounded_matches_longest_path(self):
+        cg = ELK().layout(_chains())
+        lp = _chains()
+        lp['layoutOptions']['elk.layered.layering.strategy'] = 'LONGEST_PATH'
+        lp = ELK().layout(lp)
+        assert _layers(cg) == _layers(lp)
+
+    def test_layer_bound(self):
+        graph = ELK().layout(_chains(bound=3))
+        layers = _layers(graph)
+        assert max(Counter(layers.values()).values()) <= 3
+        for edge in graph['edges']:
+            assert layers[edge['sources'][0]] < layers[edge['targets'][0]]
+
+    def test_bound_of_one_gives_a_topological_order(self):
+        graph = ELK().layout(_chains(bound=1))
+        layers = _layers(graph)
+        assert sorted(layers.values()) == list(range(12))
+        for edge in graph['edges']:
+            assert layers[edge['sources'][0]] < layers[edge['targets'][0]]
@@ -0,0 +1,120 @@
+"""Tests for laying out connected components separately."""
+import copy
+import random
+
+from pyelk import ELK
+from pyelk.algorithms.layered.components import pack_components
+
+
+def _components_graph(**options):
+    # Two chains and an isolated node
+    layout_options = {'elk.algorithm': 'layered', 'elk.separateConnectedComponents': True}
+    layout_options.update(options)
+    edges = [('a0', 'a1'), ('a1', 'a2'), ('b0', 'b1'), ('b0', 'b2'), ('b1', 'b3')]
+    nodes = ['a0', 'b0', 'a1', 'b1', 'a2', 'b2', 'b3', 'c']
+    return {
+        'id': 'root',
+        'layoutOptions': layout_options,
+        'children': [{'id': v, 'width': 30, 'height': 20} for v in nodes],
+        'edges': [{'id': f'e{i}', 'sources': [s], 'targets': [t]}
+                  for i, (s, t) in enumerate(edges)],
+    }
+
+
+def _box(graph, prefix):
+    children = [c for c in graph['children'] if c['id'].startswith(prefix)]
+    return (min(c['x'] for c in children), min(c['y'] for c in children),
+            max(c['x'] + c['width'] for c in children),
+            max(c['y'] + c['height'] for c in children))
+
+
+def _find(entry, name):
+    if entry.get('name') == name:
+        return entry
+    for child in entry.get('children', []):
+        found = _find(child, name)
+        if found is not None:
+            return found
+    return None
+
+
+class TestConnectedComponents:
+
+    def test_components_are_laid_out_alone(self):
+        graph = ELK().layout(_components_graph())
+        alone = _components_graph()
+        alone['children'] = [c for c in alone['children'] if c['id'].startswith('b')]
+        alone['edges'] = alone['edges'][2:]
+        alone = ELK().layout(alone)
+        b0 = next(c for c in graph['children'] if c['id'] == 'b0')
+        for child, expected in zip([c for c in graph['children'] if c['id'].startswith('b')],
+                                   alone['children']):
+            assert (child['x'] - b0['x'], child['y'] - b0['y']) == (
+                expected['x'] - alone['children'][0]['x'],
+                expected['y'] - alone['children'][0]['y'])
+
+    def test_components_do_not_overlap(self):
+        graph = ELK().layout(_components_graph())
+        boxes = [_box(graph, prefix) for prefix in 'abc']
+        for i, (l1, t1, r1, b1) in enumerate(boxes):
+            for l2, t2, r2, b2 in boxes[i + 1:]:
+                assert r1 + 20 <= l2 or r2 + 20 <= l1 or b1 + 20 <= t2 or b2 + 20 <= t1
+        assert min(box[0] for box in boxes) == 12
+        assert graph['width'] == max(box[2] for box in boxes) + 12
+        # Edge sections move with their component
+        a0 = graph['children'][0]
+        assert graph['edges'][0]['sections'][0]['startPoint']['x'] == a0['x'] + 15
+
+    def test_edge_labels_move_with_their_component(self):
+        def labeled(graph):
+            edge = next(e for e in graph['edges'] if e['id'] == 'e2')
+            edge['labels'] = [{'id': 'l', 'text': 'b', 'width': 10, 'height': 8, 'x': 5, 'y': 5}]
+            return graph
+
+        graph = ELK().layout(labeled(_components_graph()))
+        # Components are laid out without padding, with the label where it was
+        alone = labeled(_components_graph(**{'elk.padding': '[left=0, top=0, right=0, bottom=0]'}))
+        alone['children'] = [c for c in alone['children'] if c['id'].startswith('b')]
+        alone['edges'] = alone['edges'][2:]
+        alone = ELK().layout(alone)
+        for result in (graph, alone):
+            edge = next(e for e in result['edges'] if e['id'] == 'e2')
+            start, label = edge['sections'][0]['startPoint'], edge['labels'][0]
+            result['offset'] = (label['x'] - start['x'], label['y'] - start['y'])
+        assert graph['offset'] == alone['offset']
+        assert graph['edges'][2]['labels'][0]['x'] != 5
+
+    def test_components_are_logged(self):
+        graph = ELK().layout(_components_graph(), logging=True)
+        assert _find(graph['logging'], 'Connected components')['components'] == 3
+
+    def test_workers_give_the_serial_result(self):
+        serial = ELK().layout(_components_graph())
+        parallel = ELK().layout(_components_graph(**{'elk.layered.components.workers': 2}))
+        assert parallel['children'] == serial['children']
+        assert parallel['edges'] == serial['edges']
+
+    def test_disabled_by_default(self):
+        graph = _components_graph()
+        del graph['layoutOptions']['elk.separateConnectedComponents']
+        together = ELK().layout(copy.deepcopy(graph))
+        # The chains share their layers
+        y = {c['id']: c['y'] for c in together['children']}
+        assert y['a0'] == y['b0'] and y['a1'] == y['b1']
+
+
+class TestPacking:
+
+    def test_boxes_keep_their_spacing(self):
+        rnd = random.Random(5)
+        sizes = [(rnd.randint(5, 100), rnd.randint(5, 100)) for _ in range(200)]
+        positions = pack_components(sizes, 10, 1.6)
+        boxes = [(x, y, x + w, y + h) for (x, y), (w, h) in zip(positions, sizes)]
+        for i, (l1, t1, r1, b1) in enumerate(boxes):
+            assert l1 >= 0 and t1 >= 0
+            for l2, t2, r2, b2 in boxes[i + 1:]:
+                assert r1 + 10 <= l2 or r2 + 10 <= l1 or b1 + 10 <= t2 or b2 + 10 <= t1
+        # Compaction leaves little space unused
+        width = max(b[2] for b in boxes) + 10
+        height = max(b[3] for b in boxes) + 10
+        assert sum((w + 10) * (h + 10) for w, h in sizes) > 0.65 * width * height
@@ -0,0 +1,111 @@
+"""Tests for the INCLUDE_CHILDREN compound layout of the layered algorithm."""
+import pytest
+
+from pyelk import ELK
+
+
+def _nested_graph(routing='ORTHOGONAL', direction='DOWN'):
+    # x -> port of A -> a1 -> b1 (inside B inside A) -> y, and b1 -> A itself
+    return {
+        'id': 'root',
+        'layoutOptions': {'elk.hierarchyHandling': 'INCLUDE_CHILDREN',
+                          'elk.edgeRouting': routing, 'elk.direction': direction},
+        'children': [
+            {'id': 'x', 'width': 30, 'height': 20},
+            {'id': 'A', 'ports': [{'id': 'pA', 'width': 4, 'height': 4}],
+             'children': [
+                 {'id': 'a1', 'width': 30, 'height': 20},
+                 {'id': 'B', 'children': [{'id': 'b1', 'width': 30, 'height': 20}]},
+             ],
+             'edges': [{'id': 'in', 'sources': ['pA'], 'targets': ['a1']},
+                       {'id': 'up', 'sources': ['b1'], 'targets': ['A']}]},
+            {'id': 'y', 'width': 30, 'height': 20},
+        ],
+        'edges': [{'id': 'e1', 'sources': ['x'], 'targets': ['pA']},
+                  {'id': 'e2', 'sources': ['b1'], 'targets': ['y']},
+                  {'id': 'e3', 'sources': ['a1'], 'targets': ['b1']}],
+    }
+
+
+def _absolute(graph):
+    """Absolute boxes of all nodes and the absolute origin of every container."""
+    boxes, origins = {}, {}
+
+    def visit(node, ox, oy):
+        origins[node['id']] = (ox, oy)
+        for child in node.get('children', []):
+            x, y = ox + child['x'], oy + child['y']
+            boxes[child['id']] = (x, y, x + child['width'], y + child['height'])
+            visit(child, x, y)
+
+    visit(graph, 0.0, 0.0)
+    return boxes, origins
+
+
+def _edges(node):
+    for edge in node.get('edges', []):
+        yield node, edge
+    for child in node.get('children', []):
+        yield from _edges(child)
+
+
+def _points(edge, origin):
+    section = edge['sections'][0]
+    points = [section['startPoint']] + section.get('bendPoints', []) + [section['endPoint']]
+    return [(p['x'] + origin[0], p['y'] + origin[1]) for p in points]
+
+
+class TestCompoundLayout:
+
+    def test_containers_enclose_their_children(self):
+        graph = ELK().layout(_nested_graph())
+        boxes, _ = _absolute(graph)
+        for container, inner in (('A', ('a1', 'B')), ('B', ('b1',))):
+            left, top, right, bottom = boxes[container]
+            for child in inner:
+                x0, y0, x1, y1 = boxes[child]
+                assert left < x0 and top < y0 and x1 < right and y1 < bottom
+        # Siblings do not overlap
+        for a, b in (('x', 'A'), ('A', 'y'), ('a1', 'B')):
+            assert boxes[a][3] <= boxes[b][1] or boxes[b][3] <= boxes[a][1]
+
+    @pytest.mark.parametrize('direction', ['DOWN', 'RIGHT'])
+    def test_cross_hierarchy_edges_connect_their_ends(self, direction):
+        graph = ELK().layout(_nested_graph(direction=direction))
+        boxes, origins = _absolute(graph)
+        boxes['pA'] = None
+        ends = {'e1': ('x', 'A'), 'e2': ('b1', 'y'), 'e3': ('a1', 'b1'),
+                'in': ('A', 'a1'), 'up': ('b1', 'A')}
+        for container, edge in _edges(graph):
+            points = _points(edge, origins[container['id']])
+            assert len(edge['sections']) == 1
+            for p, q in zip(points, points[1:]):
+                assert p[0] == q[0] or p[1] == q[1]
+            for point, node in zip((points[0], points[-1]), ends[edge['id']]):
+                left, top, right, bottom = boxes[node]
+                on_border = (left <= point[0] <= right and top <= point[1] <= bottom and
+                             point[0] in (left, right) or point[1] in (top, bottom))
+                assert on_border, (edge['id'], point, node)
+
+    def test_container_ports_lie_on_the_border(self):
+        graph = ELK().layout(_nested_graph())
+        container = graph['children'][1]
+        port = container['ports'][0]
+        # pA only has entering edges: on the top border, where e1 ends
+        assert port['y'] == -port['height']
+        boxes, origins = _absolute(graph)
+        e1 = _points(graph['edges'][0], origins['root'])
+        assert e1[-1][0] == boxes['A'][0] + port['x'] + port['width'] / 2
+
+    def test_polyline_routing(self):
+        graph = ELK().layout(_nested_graph(routing='POLYLINE'))
+        _, origins = _absolute(graph)
+        e2 = _points(graph['edges'][1], origins['root'])
+        b1 = _absolute(graph)[0]['b1']
+        assert e2[0] == ((b1[0] + b1[2]) / 2, b1[3])
+
+    def test_every_level_is_laid_out_once(self):
+        graph = ELK().layout(_nested_graph(), logging=True)
+        levels = [c['name'] for c in graph['logging']['children'][0]['children']]
+        assert levels == ['Level B', 'Level A', 'Level root']
+
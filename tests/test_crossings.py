@@ -0,0 +1,182 @@
+"""Tests for crossing counting in the layered algorithm."""
+import random
+import time
+
+from pyelk import ELK
+from pyelk.algorithms.layered.crossings import bilayer_crossings
+from pyelk.parallel import shared_process_pool
+
+
+def _brute_force(segments, position):
+    count = 0
+    for i, (a, b) in enumerate(segments):
+        for c, d in segments[i + 1:]:
+            if (position[a] - position[c]) * (position[b] - position[d]) < 0:
+                count += 1
+    return count
+
+
+def _find(entry, name):
+    if entry.get('name') == name:
+        return entry
+    for child in entry.get('children', []):
+        found = _find(child, name)
+        if found is not None:
+            return found
+    return None
+
+
+class TestCrossings:
+
+    def test_bilayer_crossings_match_brute_force(self):
+        for seed in range(100):
+            rnd = random.Random(seed)
+            upper, lower = rnd.randint(1, 12), rnd.randint(1, 12)
+            position = list(range(upper)) + list(range(lower))
+            segments = [(rnd.randrange(upper), upper + rnd.randrange(lower))
+                        for _ in range(rnd.randint(0, 30))]
+            assert (bilayer_crossings(segments, position, lower) ==
+                    _brute_force(segments, position))
+
+    def test_crossings_are_logged(self):
+        # a -> d and b -> c cross in input order
+        graph = {
+            'id': 'root',
+            'layoutOptions': {'elk.algorithm': 'layered'},
+            'children': [{'id': n, 'width': 10, 'height': 10} for n in 'abcd'],
+            'edges': [{'id': 'e1', 'sources': ['a'], 'targets': ['d']},
+                      {'id': 'e2', 'sources': ['b'], 'targets': ['c']}],
+        }
+        result = ELK().layout(graph, logging=True)
+        entry = _find(result['logging'], 'Crossing minimization')
+        assert entry['crossings'] == 0
+
+    def test_long_edges_are_counted(self):
+        # The long edge a -> e runs through a dummy node on b's layer
+        graph = {
+            'id': 'root',
+            'layoutOptions': {'elk.algorithm': 'layered'},
+            'children': [{'id': n, 'width': 10, 'height': 10} for n in 'abcde'],
+            'edges': [{'id': f'e{i}', 'sources': [s], 'targets': [t]}
+                      for i, (s, t) in enumerate(
+                          [('a', 'b'), ('b', 'e'), ('a', 'e'), ('c', 'd'), ('d', 'e')])],
+        }
+        result = ELK().layout(graph, logging=True)
+        entry = _find(result['logging'], 'Crossing minimization')
+        assert entry['crossings'] == 0
+
+
+def _random_graph(seed, options):
+    rnd = random.Random(seed)
+    children = [{'id': f'n{i}', 'width': 10, 'height': 10} for i in range(40)]
+    edges = []
+    for i in range(80):
+        a, b = sorted(rnd.sample(range(40), 2))
+        edges.append({'id': f'e{i}', 'sources': [f'n{a}'], 'targets': [f'n{b}']})
+    layout_options = {'elk.algorithm': 'layered'}
+    layout_options.update(options)
+    return {'id': 'root', 'layoutOptions': layout_options,
+            'children': children, 'edges': edges}
+
+
+def _layout(options, seed=3):
+    result = ELK().layout(_random_graph(seed, options), logging=True)
+    crossings = _find(result['logging'], 'Crossing minimization')['crossings']
+    return crossings, [(c['x'], c['y']) for c in result['children']]
+
+
+class TestRestarts:
+
+    def test_restarts_do_not_increase_crossings(self):
+        for seed in range(5):
+            single, _ = _layout({'elk.layered.thoroughness': 1}, seed)
+            restarts, _ = _layout({'elk.layered.thoroughness': 10}, seed)
+            assert restarts <= single
+
+    def test_default_is_a_single_pass(self):
+        assert _layout({}) == _layout({'elk.layered.thoroughness': 1})
+
+    def test_pool_is_reused(self):
+        options = {'elk.layered.thoroughness': 4,
+                   'elk.layered.crossingMinimization.workers': 2}
+        _layout(options)
+        pool = shared_process_pool(2)
+        _layout(options)
+        assert shared_process_pool(2) is pool
+
+    def test_restarts_are_reproducible(self):
+        options = {'elk.layered.thoroughness': 10, 'elk.randomSeed': 42}
+        assert _layout(options) == _layout(options)
+
+    def test_time_limit(self):
+        single, _ = _layout({'elk.layered.thoroughness': 1})
+        start = time.perf_counter()
+        limited, _ = _layout({'elk.layered.thoroughness': 10 ** 6,
+                              'elk.layered.crossingMinimization.timeLimit': 50})
+        assert time.perf_counter() - start < 5
+        assert limited <= single
+
+    def test_workers_give_the_serial_result(self):
+        options = {'elk.layered.thoroughness': 10, 'elk.randomSeed': 7}
+        parallel = dict(options, **{'elk.layered.crossingMinimization.workers': 2})
+        assert _layout(parallel) == _layout(options)
+
+
+def _rows(result):
+    rows = {}
+    for child in result['children']:
+        rows.setdefault(child['y'], []).append((child['x'], child['id']))
+    return [[i for _, i in sorted(row)] for _, row in sorted(rows.items())]
+
+
+class TestModelOrder:
+
+    def test_forced_node_order_is_kept(self):
+        # Sweeping would swap c and d to remove the crossing
+        graph = {
+            'id': 'root',
+            'layoutOptions': {'elk.algorithm': 'layered',
+                              'elk.layered.considerModelOrder.strategy': 'NODES_AND_EDGES',
+                              'elk.layered.crossingMinimization.forceNodeModelOrder': True},
+            'children': [{'id': n, 'width': 10, 'height': 10} for n in 'abcd'],
+            'edges': [{'id': 'e1', 'sources': ['a'], 'targets': ['d']},
+                      {'id': 'e2', 'sources': ['b'], 'targets': ['c']}],
+        }
+        result = ELK().layout(graph, logging=True)
+        assert _rows(result) == [['a', 'b'], ['c', 'd']]
+        assert _find(result['logging'], 'Crossing minimization')['crossings'] == 1
+
+    def test_prefer_edges_orders_nodes_by_incoming_edges(self):
+        graph = {
+            'id': 'root',
+            'layoutOptions': {'elk.algorithm': 'layered',
+                              'elk.layered.considerModelOrder.strategy': 'PREFER_EDGES',
+                              'elk.layered.crossingMinimization.forceNodeModelOrder': True},
+            'children': [{'id': n, 'width': 10, 'height': 10} for n in 'abcd'],
+            'edges': [{'id': 'e1', 'sources': ['a'], 'targets': ['d']},
+                      {'id': 'e2', 'sources': ['a'], 'targets': ['c']},
+                      {'id': 'e3', 'sources': ['a'], 'targets': ['b']}],
+        }
+        assert _rows(ELK().layout(graph)) == [['a'], ['d', 'c', 'b']]
+
+    def test_sweeps_keep_the_model_order_without_gain(self):
+        # b, c and d share the barycenter of a
+        graph = {
+            'id': 'root',
+            'layoutOptions': {'elk.algorithm': 'layered',
+                              'elk.layered.considerModelOrder.strategy': 'PREFER_EDGES'},
+            'children': [{'id': n, 'width': 10, 'height': 10} for n in 'abcd'],
+            'edges': [{'id': 'e1', 'sources': ['a'], 'targets': ['d']},
+                      {'id': 'e2', 'sources': ['a'], 'targets': ['c']},
+                      {'id': 'e3', 'sources': ['a'], 'targets': ['b']}],
+        }
+        assert _rows(ELK().layout(graph)) == [['a'], ['d', 'c', 'b']]
+        del graph['layoutOptions']['elk.layered.considerModelOrder.strategy']
+        assert _rows(ELK().layout(graph)) == [['a'], ['b', 'c', 'd']]
+
+    def test_sweeps_still_remove_crossings(self):
+        options = {'elk.layered.thoroughness': 1,
+                   'elk.layered.considerModelOrder.strategy': 'NODES_AND_EDGES'}
+        forced = dict(options, **{'elk.layered.crossingMinimization.forceNodeModelOrder': True})
+        for seed in range(5):
+            assert _layout(options, seed)[0] <= _layout(forced, seed)[0]
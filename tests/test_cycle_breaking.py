@@ -0,0 +1,73 @@
+"""Tests for cycle breaking in the layered algorithm."""
+import random
+
+import pytest
+
+from pyelk import ELK
+from pyelk.exceptions import UnsupportedConfigurationException
+
+from .helpers import layered_graph
+
+
+def _find(entry, name):
+    if entry.get('name') == name:
+        return entry
+    for child in entry.get('children', []):
+        found = _find(child, name)
+        if found is not None:
+            return found
+    return None
+
+
+def _reversed_edges(graph):
+    result = ELK().layout(graph, logging=True)
+    entry = _find(result['logging'], 'Cycle breaking')
+    return entry['reversedEdges'], result
+
+
+def _state_machine(seed, states=60):
+    # A main cycle of states with transitions back to earlier states
+    rnd = random.Random(seed)
+    edges = [(i, (i + 1) % states) for i in range(states)]
+    for _ in range(states):
+        a, b = rnd.sample(range(states), 2)
+        edges.append((a, b))
+    return edges
+
+
+class TestCycleBreaking:
+
+    @pytest.mark.parametrize('strategy', ['DEPTH_FIRST', 'GREEDY'])
+    def test_layers_follow_the_remaining_edges(self, strategy):
+        edges = _state_machine(1)
+        graph = layered_graph(edges, 60, **{'elk.layered.cycleBreaking.strategy': strategy})
+        count, result = _reversed_edges(graph)
+        y = {c['id']: c['y'] for c in result['children']}
+        backward = sum(y[f'n{s}'] > y[f'n{t}'] for s, t in edges)
+        assert 0 < count == backward
+
+    def test_greedy_reverses_fewer_edges(self):
+        for seed in range(5):
+            edges = _state_machine(seed)
+            depth_first, _ = _reversed_edges(layered_graph(edges, 60))
+            greedy, _ = _reversed_edges(
+                layered_graph(edges, 60, **{'elk.layered.cycleBreaking.strategy': 'GREEDY'}))
+            assert greedy <= depth_first
+        # A single cycle needs a single reversed edge
+        ring = [(i, (i + 1) % 10) for i in range(10)]
+        graph = layered_graph(ring, 10, **{'elk.layered.cycleBreaking.strategy': 'GREEDY'})
+        assert _reversed_edges(graph)[0] == 1
+
+    def test_long_pipelines(self):
+        # Deep enough to exhaust the recursion limit of a recursive search
+        n = 3000
+        edges = [(i, i + 1) for i in range(n - 1)] + [(n - 1, 0)]
+        graph = layered_graph(edges, n, **{'elk.layered.thoroughness': 1})
+        for child in graph['children']:
+            child['layoutOptions'] = {'elk.layered.layering.layerConstraint': 'FIRST'}
+        with pytest.raises(UnsupportedConfigurationException):
+            ELK().layout(graph)
+        graph['edges'].pop()
+        for strategy in ('DEPTH_FIRST', 'GREEDY'):
+            graph['layoutOptions']['elk.layered.cycleBreaking.strategy'] = strategy
+            ELK().layout(graph)
@@ -0,0 +1,141 @@
+"""Tests for the single-pass GraphIndex."""
+import pytest
+from pyelk import ELK, InvalidGraphException, UnsupportedGraphException
+from pyelk.graph import GraphIndex
+
+
+GRAPH = {
+    "id": "root",
+    "children": [
+        {"id": "A", "ports": [{"id": "A_p"}],
+         "children": [
+             {"id": "a1", "ports": [{"id": "a1_p"}]},
+             {"id": "B", "children": [{"id": "b1"}]},
+         ],
+         "edges": [{"id": "e1", "source": "a1_p", "target": "b1"},
+                   {"id": "e2", "sources": ["A_p"], "targets": ["a1"]}]},
+        {"id": "c"},
+    ],
+    "edges": [{"id": "e3", "sources": ["A"], "targets": ["c"]}],
+}
+
+
+def _graph():
+    import copy
+    return copy.deepcopy(GRAPH)
+
+
+class TestGraphIndex:
+    """Tests for the index tables."""
+
+    def test_lookup_tables(self):
+        graph = _graph()
+        index = GraphIndex(graph)
+        a = graph['children'][0]
+        assert index.elements['b1'] is a['children'][1]['children'][0]
+        assert index.parent['a1'] is a
+        assert index.parent['root'] is None
+        assert index.port_owner['a1_p'] is a['children'][0]
+        assert index.owner('a1_p') is a['children'][0]
+        assert index.depth['b1'] == 3
+        assert [c['id'] for c in index.containers] == ['A', 'B']
+
+    def test_edges_are_normalized_and_resolved(self):
+        graph = _graph()
+        index = GraphIndex(graph)
+        assert graph['children'][0]['edges'][0]['sources'] == ['a1_p']
+        assert [(n['id'], e['id'], s, t) for n, e, s, t in index.edges] == [
+            ('root', 'e3', ['A'], ['c']),
+            ('A', 'e1', ['a1_p'], ['b1']),
+            ('A', 'e2', ['A_p'], ['a1']),
+        ]
+
+    def test_containment(self):
+        graph = _graph()
+        index = GraphIndex(graph)
+        a = index.elements['A']
+        assert index.is_inside(index.elements['b1'], a)
+        assert index.is_inside(index.elements['B'], a)
+        assert not index.is_inside(a, a)
+        assert not index.is_inside(index.elements['c'], a)
+
+    @pytest.mark.parametrize("duplicate", [
+        {"id": "a1"},
+        {"id": "x", "ports": [{"id": "A_p"}]},
+    ])
+    def test_duplicate_ids(self, duplicate):
+        graph = _graph()
+        graph['children'].append(duplicate)
+        with pytest.raises(InvalidGraphException):
+            ELK().layout(graph)
+
+    def test_nodes_and_ports_have_separate_namespaces(self):
+        def with_port(port_id):
+            graph = _graph()
+            graph['children'][1]['ports'] = [{"id": port_id, "width": 4, "height": 4}]
+            graph['edges'].append({"id": "e4", "sources": ["A"], "targets": [port_id]})
+            return graph
+
+        # Node c gets a port named like container B; edge ends mean the port
+        graph = with_port("B")
+        index = GraphIndex(graph)
+        assert index.nodes['B'] is graph['children'][0]['children'][1]
+        assert index.ports['B'] is graph['children'][1]['ports'][0]
+        assert index.owner('B') is graph['children'][1]
+        result, expected = ELK().layout(graph), ELK().layout(with_port("c_p"))
+        assert result['edges'][-1]['sections'] == expected['edges'][-1]['sections']
+
+    def test_duplicate_edge_ids(self):
+        graph = _graph()
+        graph['edges'].append({"id": "e1", "sources": ["A"], "targets": ["c"]})
+        with pytest.raises(InvalidGraphException, match="Duplicate edge ID 'e1'"):
+            GraphIndex(graph)
+        with pytest.raises(InvalidGraphException):
+            ELK().layout(graph)
+
+    @pytest.mark.parametrize("edge_id", [1.5, (1, 2), True])
+    def test_edge_ids_are_validated_like_node_ids(self, edge_id):
+        graph = _graph()
+        graph['edges'][0]['id'] = edge_id
+        with pytest.raises(InvalidGraphException):
+            GraphIndex(graph)
+
+    def test_integral_edge_ids(self):
+        graph = _graph()
+        graph['edges'][0]['id'] = 7
+        graph['children'][0]['edges'][0]['id'] = 8.0
+        index = GraphIndex(graph)
+        assert [e['id'] for _, e, _, _ in index.edges] == [7, 8.0, 'e2']
+
+    @pytest.mark.parametrize("end", ["sources", "targets"])
+    def test_unknown_edge_ends(self, end):
+        graph = _graph()
+        graph['children'][0]['edges'][1][end] = ["missing"]
+        with pytest.raises(InvalidGraphException,
+                           match="Edge 'e2' references unknown element 'missing'"):
+            ELK().layout(graph)
+
+    def test_deep_hierarchy(self):
+        graph = node = {"id": "root"}
+        for i in range(5000):
+            child = {"id": f"n{i}"}
+            node['children'] = [child]
+            node = child
+        index = GraphIndex(graph)
+        assert index.depth['n4999'] == 5000
+        assert index.is_inside(node, graph)
+
+
+class TestCrossHierarchyCheck:
+    """The index-based check must accept container ports and reject escapes."""
+
+    def test_container_ports_are_valid_endpoints(self):
+        result = ELK().layout(_graph())
+        assert 'x' in result['children'][0]['children'][0]
+
+    def test_edges_leaving_a_container_are_rejected(self):
+        graph = _graph()
+        graph['children'][0]['children'][1]['edges'] = [
+            {"id": "bad", "sources": ["b1"], "targets": ["a1"]}]
+        with pytest.raises(UnsupportedGraphException):
+            ELK().layout(graph)
@@ -0,0 +1,71 @@
+"""Tests for incremental relayout of hierarchical graphs."""
+import copy
+import pytest
+from pyelk import ELK
+
+
+def _container(cid, depth):
+    children = [{"id": f"{cid}_n{i}", "width": 20, "height": 10} for i in range(3)]
+    if depth > 0:
+        children += [_container(f"{cid}_c{i}", depth - 1) for i in range(2)]
+    return {
+        "id": cid,
+        "children": children,
+        "edges": [
+            {"id": f"{cid}_e0", "source": f"{cid}_n0", "target": f"{cid}_n1"},
+            {"id": f"{cid}_e1", "source": f"{cid}_n1", "target": f"{cid}_n2"},
+        ],
+    }
+
+
+GRAPH = {
+    "id": "root",
+    "children": [_container("a", 2), _container("b", 1)],
+    "edges": [{"id": "e_root", "sources": ["a"], "targets": ["b"]}],
+}
+
+
+def _edit(graph):
+    """Resize a node two levels down inside container 'a'."""
+    graph['children'][0]['children'][3]['children'][4]['children'][1]['width'] = 50
+    return graph
+
+
+class TestIncrementalLayout:
+    """Tests for ELK.layout(previous=...)."""
+
+    @pytest.mark.parametrize("executor", [None, "thread"])
+    def test_only_dirty_path_is_recomputed(self, executor):
+        with ELK(executor=executor) as elk:
+            previous = elk.layout(copy.deepcopy(GRAPH))
+            graph = _edit(copy.deepcopy(GRAPH))
+            result = elk.layout(graph, previous=previous)
+        assert sorted(result['logging']['recomputed']) == ['a', 'a_c0', 'a_c0_c1', 'root']
+        expected = ELK().layout(_edit(copy.deepcopy(GRAPH)))
+        result.pop('logging')
+        assert result == expected
+
+    def test_unchanged_graph_reuses_everything(self):
+        elk = ELK()
+        previous = elk.layout(copy.deepcopy(GRAPH))
+        result = elk.layout(copy.deepcopy(GRAPH), previous=previous)
+        assert result['logging']['recomputed'] == []
+        result.pop('logging')
+        assert result == previous
+
+    def test_edited_result_can_be_passed_again(self):
+        elk = ELK()
+        previous = elk.layout(copy.deepcopy(GRAPH))
+        graph = copy.deepcopy(previous)
+        graph['children'][1]['children'][0]['height'] = 40
+        result = elk.layout(graph, previous=previous)
+        assert sorted(result['logging']['recomputed']) == ['b', 'root']
+
+    def test_reused_sections_are_not_shared(self):
+        elk = ELK()
+        previous = elk.layout(copy.deepcopy(GRAPH))
+        result = elk.layout(copy.deepcopy(GRAPH), previous=previous)
+        assert result['children'][1]['edges'][0]['sections'] == \
+            previous['children'][1]['edges'][0]['sections']
+        assert result['children'][1]['edges'][0]['sections'] is not \
+            previous['children'][1]['edges'][0]['sections']
@@ -0,0 +1,83 @@
+"""Tests for the interactive strategies of the layered algorithm."""
+import copy
+import random
+
+from pyelk import ELK
+
+from .helpers import layered_graph, random_edges
+
+INTERACTIVE = {
+    'elk.layered.cycleBreaking.strategy': 'INTERACTIVE',
+    'elk.layered.layering.strategy': 'INTERACTIVE',
+    'elk.layered.crossingMinimization.strategy': 'INTERACTIVE',
+}
+
+
+def _relayout(graph, **options):
+    graph = copy.deepcopy(graph)
+    graph['layoutOptions'].update(INTERACTIVE)
+    graph['layoutOptions'].update(options)
+    return ELK().layout(graph)
+
+
+def _coordinates(graph):
+    return {c['id']: (c['x'], c['y']) for c in graph['children']}
+
+
+class TestInteractive:
+
+    def test_relayout_reproduces_the_layout(self):
+        rnd = random.Random(3)
+        for direction, routing in (('DOWN', 'POLYLINE'), ('RIGHT', 'POLYLINE'),
+                                   ('DOWN', 'ORTHOGONAL')):
+            graph = ELK().layout(layered_graph(random_edges(rnd, 30, 50), 30,
+                                               **{'elk.direction': direction,
+                                                  'elk.edgeRouting': routing}))
+            assert _coordinates(_relayout(graph)) == _coordinates(graph)
+
+    def test_layers_follow_the_input_coordinates(self):
+        graph = layered_graph([(0, 1)], 3)
+        for child, y in zip(graph['children'], (0, 50, 5)):
+            child['y'] = y
+        graph = _relayout(graph)
+        nodes = {c['id']: c for c in graph['children']}
+        # n2 overlaps n0 and joins its layer
+        assert nodes['n0']['y'] == nodes['n2']['y'] < nodes['n1']['y']
+
+    def test_edges_against_the_input_coordinates_are_reversed(self):
+        graph = layered_graph([(0, 1), (1, 2), (2, 0)], 3)
+        for child, y in zip(graph['children'], (100, 0, 50)):
+            child['y'] = y
+        graph = _relayout(graph)
+        order = sorted(graph['children'], key=lambda c: c['y'])
+        assert [c['id'] for c in order] == ['n1', 'n2', 'n0']
+
+    def test_order_within_layers_is_kept(self):
+        # The previous drawing has n1 left of n0 although swapping them
+        # would not add crossings
+        graph = layered_graph([(0, 2), (1, 3)], 4)
+        for child, (x, y) in zip(graph['children'], ((100, 0), (0, 0), (100, 50), (0, 50))):
+            child['x'], child['y'] = x, y
+        graph = _relayout(graph)
+        nodes = {c['id']: c for c in graph['children']}
+        assert nodes['n1']['x'] < nodes['n0']['x']
+        assert nodes['n3']['x'] < nodes['n2']['x']
+
+    def test_small_edit_keeps_the_drawing(self):
+        rnd = random.Random(5)
+        edges = random_edges(rnd, 40, 60)
+        graph = ELK().layout(layered_graph(edges, 40))
+        before = _coordinates(graph)
+
+        graph['children'].append({'id': 'n40', 'width': 20, 'height': 10})
+        graph['edges'].append({'id': 'e60', 'sources': ['n40'], 'targets': ['n0']})
+        after = _coordinates(_relayout(graph))
+
+        def ranks(coordinates, axis):
+            order = sorted((c[axis], i) for i, c in coordinates.items() if i in before)
+            return [i for _, i in order]
+        assert ranks(after, 1) == ranks(before, 1)
+
+    def test_missing_coordinates(self):
+        graph = _relayout(layered_graph([(0, 1), (1, 2), (2, 0)], 3))
+        assert len({c['y'] for c in graph['children']}) == 3
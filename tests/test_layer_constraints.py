@@ -0,0 +1,22 @@
+"""Tests for the FIRST and LAST layer constraints of the layered algorithm."""
+from pyelk.algorithms.layered import LayeredLayoutProvider
+
+
+class TestSeparateLayers:
+
+    def test_layers_left_empty_are_dropped(self):
+        # One node per layer: a, c, b, s. c moves to the last layer of the
+        # other nodes and s to a layer of its own before them, emptying the
+        # layer c was in
+        constraints = {'c': 'LAST', 's': 'FIRST_SEPARATE'}
+        graph = {
+            'id': 'root',
+            'layoutOptions': {'elk.layered.layering.strategy': 'COFFMAN_GRAHAM',
+                              'elk.layered.layering.coffmanGraham.layerBound': 1},
+            'children': [{'id': n, 'width': 10, 'height': 10,
+                          'layoutOptions': {'elk.layered.layering.layerConstraint':
+                                            constraints.get(n, 'NONE')}}
+                         for n in 'acbs'],
+        }
+        state = LayeredLayoutProvider().run(graph)
+        assert state.node_layers() == {'s': 0, 'a': 1, 'b': 2, 'c': 2}
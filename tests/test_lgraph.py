@@ -0,0 +1,90 @@
+"""Tests for the array-backed graph of the layered algorithm."""
+from array import array
+
+from pyelk import ELK
+from pyelk.algorithms.layered.lgraph import LGraph
+
+
+GRAPH = {
+    "id": "root",
+    "children": [
+        {"id": "a", "width": 10, "height": 10,
+         "ports": [{"id": "a_out", "width": 2, "height": 2}]},
+        {"id": "b", "width": 20, "height": 10},
+        {"id": "c", "width": 30, "height": 10},
+    ],
+    "edges": [
+        {"id": "e1", "sources": ["a_out"], "targets": ["b"]},
+        {"id": "e2", "sources": ["b"], "targets": ["c"]},
+        {"id": "e3", "sources": ["a"], "targets": ["c"]},
+        {"id": "loop", "sources": ["c"], "targets": ["c"]},
+        {"id": "dangling", "sources": ["a"], "targets": ["missing"]},
+    ],
+}
+
+
+class TestLGraph:
+
+    def test_nodes_and_ports_are_indexed(self):
+        lg = LGraph.from_graph(GRAPH)
+        assert lg.real_count == lg.node_count == 3
+        assert lg.node_ids == ['a', 'b', 'c']
+        assert list(lg.width) == [10.0, 20.0, 30.0]
+        assert list(lg.port_offsets) == [0, 1, 1, 1]
+        assert lg.port_owner[0] == 0
+
+    def test_edges_resolve_ports_to_their_owner(self):
+        lg = LGraph.from_graph(GRAPH)
+        assert lg.edge_ids == ['e1', 'e2', 'e3', 'loop']
+        assert list(lg.source) == [0, 1, 0, 2]
+        assert list(lg.target) == [1, 2, 2, 2]
+        assert list(lg.source_port) == [0, -1, -1, -1]
+        assert lg.is_self_loop(3)
+
+    def test_csr_adjacency_skips_self_loops(self):
+        lg = LGraph.from_graph(GRAPH)
+        lg.build_adjacency()
+        outgoing = [list(lg.out_edges[lg.out_offsets[v]:lg.out_offsets[v + 1]])
+                    for v in range(3)]
+        incoming = [list(lg.in_edges[lg.in_offsets[v]:lg.in_offsets[v + 1]])
+                    for v in range(3)]
+        assert outgoing == [[0, 2], [1], []]
+        assert incoming == [[], [0], [1, 2]]
+
+    def test_reverse_edge(self):
+        lg = LGraph.from_graph(GRAPH)
+        lg.reverse_edge(0)
+        assert (lg.source[0], lg.target[0]) == (1, 0)
+        assert (lg.source_port[0], lg.target_port[0]) == (-1, 0)
+        assert lg.reversed[0] == 1
+
+    def test_dummy_nodes_follow_real_nodes(self):
+        lg = LGraph.from_graph(GRAPH)
+        lg.build_adjacency()
+        lg.layer[:] = array('i', [0, 1, 3])
+        lg.insert_dummy_nodes()
+        assert list(lg.dummies(1)) == [3]
+        assert list(lg.dummies(2)) == [4, 5]
+        assert [lg.layer[d] for d in lg.dummies(2)] == [1, 2]
+        assert lg.is_dummy(4) and not lg.is_dummy(2)
+        assert lg.layers() == [[0], [1, 4], [3, 5], [2]]
+        # Chains only fill the numeric columns
+        assert lg.node_count == len(lg.width) == len(lg.out_offsets) - 1 == 6
+        assert len(lg.originals) == 3
+
+
+class TestLargeGraphs:
+
+    def test_long_chain(self):
+        n = 3000
+        graph = {
+            "id": "root",
+            "children": [{"id": f"n{i}", "width": 10, "height": 10} for i in range(n)],
+            "edges": [{"id": f"e{i}", "sources": [f"n{i}"], "targets": [f"n{i + 1}"]}
+                      for i in range(n - 1)] +
+                     [{"id": "back", "sources": [f"n{n - 1}"], "targets": ["n0"]}],
+        }
+        result = ELK().layout(graph)
+        ys = [c['y'] for c in result['children']]
+        assert ys == sorted(ys)
+        assert len(set(ys)) == n
@@ -68,3 +68,56 @@ class TestLogging:
         # Second run without logging - should clear previous logging
         elk.layout(graph)
         assert graph.get('logging') is None
+
+
+def _phase_names(entry):
+    return [child['name'] for child in entry['children']]
+
+
+class TestTimingTree:
+    """Tests for the per-container, per-phase timings in the logging output."""
+
+    def test_container_entries_have_counts_and_times(self, elk):
+        result = elk.layout(fresh_graph(), logging=True)
+        entry = result['logging']['children'][0]
+        assert entry['name'] == 'org.eclipse.elk.layered on root'
+        assert entry['nodes'] == 2
+        assert entry['edges'] == 1
+        assert entry['executionTime'] >= 0
+
+    def test_layered_records_its_phases(self, elk):
+        result = elk.layout(fresh_graph(), logging=True)
+        entry = result['logging']['children'][0]
+        assert _phase_names(entry) == [
+            'Cycle breaking', 'Layer assignment', 'Dummy node insertion',
+            'Crossing minimization', 'Node placement', 'Edge routing',
+            'Label placement', 'Write back',
+        ]
+        for phase in entry['children']:
+            assert phase['executionTime'] >= 0
+        assert entry['children'][0]['reversedEdges'] == 0
+
+    def test_iterative_algorithms_record_iterations(self, elk):
+        result = elk.layout(fresh_graph(), layout_options={'algorithm': 'stress'},
+                            logging=True)
+        entry = result['logging']['children'][0]
+        assert _phase_names(entry) == ['Shortest paths', 'Stress iterations']
+        assert entry['children'][1]['iterations'] >= 1
+
+    def test_nested_containers_are_timed_separately(self, elk):
+        graph = {
+            "id": "root",
+            "children": [
+                {"id": "a", "children": [{"id": "a1", "width": 10, "height": 10}]},
+                {"id": "b", "width": 10, "height": 10},
+            ],
+        }
+        result = elk.layout(graph, logging=True)
+        names = [e['name'] for e in result['logging']['children']]
+        assert names == ['org.eclipse.elk.layered on a',
+                         'org.eclipse.elk.layered on root']
+        assert all('executionTime' in e for e in result['logging']['children'])
+
+    def test_no_phase_entries_without_logging(self, elk):
+        result = elk.layout(fresh_graph(), measure_execution_time=True)
+        assert 'children' not in result['logging']
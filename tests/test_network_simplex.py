@@ -0,0 +1,80 @@
+"""Tests for network simplex layer assignment."""
+import copy
+import random
+
+from pyelk import ELK
+from pyelk.algorithms.layered.network_simplex import NetworkSimplex
+
+from .test_change_aware_array_list import GRAPH as LES_MISERABLES
+
+
+def _random_dag(seed, node_count):
+    rnd = random.Random(seed)
+    order = list(range(node_count))
+    rnd.shuffle(order)
+    weights = {}
+    for _ in range(rnd.randint(node_count, 3 * node_count)):
+        a, b = sorted(rnd.sample(range(node_count), 2))
+        key = (order[a], order[b])
+        weights[key] = weights.get(key, 0) + rnd.randint(1, 3)
+    return weights
+
+
+def _solve(weights, node_count, iteration_limit=10 ** 6):
+    solver = NetworkSimplex(node_count, [s for s, _ in weights],
+                            [t for _, t in weights], list(weights.values()))
+    return solver, solver.solve(iteration_limit)
+
+
+def _total_length(weights, rank):
+    return sum(w * (rank[t] - rank[s]) for (s, t), w in weights.items())
+
+
+def _dummy_nodes(entry):
+    if entry.get('name') == 'Dummy node insertion':
+        return entry['dummyNodes']
+    for child in entry.get('children', []):
+        count = _dummy_nodes(child)
+        if count is not None:
+            return count
+    return None
+
+
+class TestNetworkSimplex:
+
+    def test_ranking_is_feasible_and_optimal(self):
+        for seed in range(50):
+            weights = _random_dag(seed, 30)
+            solver, rank = _solve(weights, 30)
+            assert min(rank) == 0
+            for s, t in weights:
+                assert rank[t] - rank[s] >= 1
+            # Optimal: every tree edge is tight with a non-negative cut value
+            for e in range(len(solver.tail)):
+                if solver.in_tree[e]:
+                    assert solver._slack(e) == 0
+                    assert solver.cut[e] >= 0
+
+    def test_sources_move_next_to_their_targets(self):
+        # Longest path puts the source e on top; e -> d is shortest right
+        # above d
+        weights = {(0, 1): 1, (1, 2): 1, (2, 3): 1, (0, 3): 1, (4, 3): 1}
+        _, rank = _solve(weights, 5)
+        assert list(rank) == [0, 1, 2, 3, 2]
+        assert _total_length(weights, rank) == 1 + 1 + 1 + 3 + 1
+
+    def test_iteration_limit(self):
+        weights = _random_dag(1, 200)
+        solver, rank = _solve(weights, 200, iteration_limit=3)
+        assert solver.iterations <= 3
+        for s, t in weights:
+            assert rank[t] - rank[s] >= 1
+
+    def test_fewer_dummy_nodes_than_longest_path(self):
+        counts = {}
+        for strategy in ('LONGEST_PATH', 'NETWORK_SIMPLEX'):
+            graph = copy.deepcopy(LES_MISERABLES)
+            graph['properties'] = {'layering.strategy': strategy}
+            result = ELK().layout(graph, logging=True)
+            counts[strategy] = _dummy_nodes(result['logging'])
+        assert counts['NETWORK_SIMPLEX'] < counts['LONGEST_PATH']
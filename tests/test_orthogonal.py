@@ -0,0 +1,111 @@
+"""Tests for orthogonal edge routing in the layered algorithm."""
+import random
+
+from pyelk import ELK
+from pyelk.algorithms.layered.orthogonal import _Segment, _assign_slots
+
+from .helpers import layered_graph
+
+ORTHOGONAL = {'elk.edgeRouting': 'ORTHOGONAL'}
+
+
+def _points(edge):
+    section = edge['sections'][0]
+    return ([section['startPoint']] + section.get('bendPoints', []) +
+            [section['endPoint']])
+
+
+class TestOrthogonalRouting:
+
+    def test_segments_are_axis_parallel(self):
+        rnd = random.Random(2)
+        for direction in ('DOWN', 'RIGHT'):
+            edges = [tuple(sorted(rnd.sample(range(40), 2))) for _ in range(80)]
+            graph = ELK().layout(layered_graph(edges, 40, **ORTHOGONAL,
+                                               **{'elk.direction': direction}))
+            for edge in graph['edges']:
+                for p, q in zip(_points(edge), _points(edge)[1:]):
+                    assert p['x'] == q['x'] or p['y'] == q['y']
+
+    def test_edges_start_and_end_at_the_node_borders(self):
+        graph = ELK().layout(layered_graph([(0, 2), (1, 2)], 3, **ORTHOGONAL))
+        nodes = {c['id']: c for c in graph['children']}
+        for edge in graph['edges']:
+            source, target = nodes[edge['sources'][0]], nodes['n2']
+            points = _points(edge)
+            assert points[0]['y'] == source['y'] + source['height']
+            assert points[0]['x'] == source['x'] + source['width'] / 2
+            assert points[-1] == {'x': target['x'] + target['width'] / 2, 'y': target['y']}
+
+    def test_overlapping_segments_get_separate_slots(self):
+        first, second, apart = _Segment(), _Segment(), _Segment()
+        first.tops, first.bottoms = [0.0], [50.0]
+        second.tops, second.bottoms = [20.0], [70.0]
+        apart.tops, apart.bottoms = [100.0], [120.0]
+        assert _assign_slots([first, second, apart]) == 2
+        # Both run towards higher coordinates: the later start lies above
+        assert (second.slot, first.slot, apart.slot) == (0, 1, 0)
+
+    def test_only_crowded_gaps_are_widened(self):
+        # Ten narrow nodes above ten wide ones: the edges between them fan
+        # out and need several slots, the edges below run straight
+        graph = layered_graph([(i, 10 + i) for i in range(10)] +
+                              [(10 + i, 20 + i) for i in range(10)], 30,
+                              **ORTHOGONAL, **{'elk.layered.thoroughness': 1})
+        for child in graph['children'][10:]:
+            child['width'] = 60
+        graph = ELK().layout(graph)
+        nodes = {c['id']: c for c in graph['children']}
+        first_gap = nodes['n10']['y'] - (nodes['n0']['y'] + 10)
+        last_gap = nodes['n20']['y'] - (nodes['n10']['y'] + 10)
+        assert first_gap > 20
+        assert last_gap == 20
+        for edge in graph['edges'][10:]:
+            assert 'bendPoints' not in edge['sections'][0]
+
+    def test_edges_start_at_their_ports(self):
+        graph = layered_graph([(0, 1)], 2, **ORTHOGONAL)
+        graph['edges'][0]['sources'] = ['p_out']
+        graph['children'][0]['ports'] = [
+            {'id': 'p_out', 'width': 4, 'height': 4,
+             'layoutOptions': {'elk.port.side': 'SOUTH'}}]
+        graph = ELK().layout(graph)
+        node = graph['children'][0]
+        port = node['ports'][0]
+        start = _points(graph['edges'][0])[0]
+        assert start['x'] == node['x'] + port['x'] + port['width'] / 2
+        assert start['y'] == node['y'] + port['y'] + port['height']
+
+    def test_constrained_nodes_leave_no_empty_layers(self):
+        # The LAST node leaves its Coffman-Graham layer between the others
+        graph = layered_graph([], 3, **ORTHOGONAL,
+                              **{'elk.layered.layering.strategy': 'COFFMAN_GRAHAM',
+                                 'elk.layered.layering.coffmanGraham.layerBound': 1})
+        graph['children'][1]['layoutOptions'] = {
+            'elk.layered.layering.layerConstraint': 'LAST'}
+        graph = ELK().layout(graph)
+        y = [c['y'] for c in graph['children']]
+        assert y[0] < y[1] == y[2]
+
+    def test_edges_turned_backwards_by_constraints_are_routed(self):
+        # n1 moves below n2, and n2 is its target
+        graph = layered_graph([(0, 1), (1, 2), (0, 2), (2, 3)], 4, **ORTHOGONAL)
+        graph['children'][1]['layoutOptions'] = {
+            'elk.layered.layering.layerConstraint': 'LAST'}
+        graph = ELK().layout(graph)
+        n1, n2 = graph['children'][1], graph['children'][2]
+        assert n1['y'] > n2['y']
+        points = _points(graph['edges'][1])
+        assert points[0]['y'] == n1['y'] and points[-1]['y'] == n2['y'] + 10
+        for p, q in zip(points, points[1:]):
+            assert p['x'] == q['x'] or p['y'] == q['y']
+
+    def test_edges_within_a_layer_are_straight(self):
+        # A known limitation: n2 follows the LAST node n1 into its layer
+        graph = layered_graph([(0, 1), (1, 2)], 3, **ORTHOGONAL)
+        graph['children'][1]['layoutOptions'] = {
+            'elk.layered.layering.layerConstraint': 'LAST'}
+        graph = ELK().layout(graph)
+        section = graph['edges'][1]['sections'][0]
+        assert graph['children'][1]['y'] == graph['children'][2]['y']
+        assert 'bendPoints' not in section
@@ -0,0 +1,135 @@
+"""Tests for parallel layout of independent containers and graph batches."""
+import copy
+import pytest
+from pyelk import (
+    ELK, InvalidGraphException, UnsupportedConfigurationException,
+    UnsupportedGraphException,
+)
+
+
+def _container(cid, depth):
+    children = [{"id": f"{cid}_n{i}", "width": 20 + i, "height": 10 + i}
+                for i in range(3)]
+    if depth > 0:
+        children += [_container(f"{cid}_c{i}", depth - 1) for i in range(2)]
+    return {
+        "id": cid,
+        "layoutOptions": {"elk.direction": "DOWN" if depth % 2 else "RIGHT"},
+        "children": children,
+        "edges": [
+            {"id": f"{cid}_e0", "sources": [f"{cid}_n0"], "targets": [f"{cid}_n1"]},
+            {"id": f"{cid}_e1", "sources": [f"{cid}_n0"], "targets": [f"{cid}_n2"]},
+        ],
+    }
+
+
+GRAPH = {
+    "id": "root",
+    "layoutOptions": {"elk.algorithm": "layered"},
+    "children": [_container(f"g{i}", 2) for i in range(4)],
+    "edges": [{"id": "e_root", "sources": ["g0"], "targets": ["g1"]}],
+}
+
+
+def _without_timings(entry):
+    """Drop the measured times from a logging tree, keeping its structure."""
+    entry.pop('executionTime', None)
+    for child in entry.get('children', []):
+        _without_timings(child)
+    return entry
+
+
+def _serial_result():
+    result = ELK().layout(copy.deepcopy(GRAPH), logging=True)
+    _without_timings(result['logging'])
+    return result
+
+
+class TestParallelContainers:
+    """Parallel layout must match the serial path exactly."""
+
+    @pytest.mark.parametrize("kind", ["thread", "process"])
+    def test_matches_serial_layout(self, kind):
+        with ELK(executor=kind, max_workers=2) as elk:
+            result = elk.layout(copy.deepcopy(GRAPH), logging=True)
+        _without_timings(result['logging'])
+        assert result == _serial_result()
+
+    def test_accepts_executor_instance(self):
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=3) as pool:
+            result = ELK(executor=pool).layout(copy.deepcopy(GRAPH), logging=True)
+        _without_timings(result['logging'])
+        assert result == _serial_result()
+
+    @pytest.mark.parametrize("kind", ["thread", "process"])
+    def test_records_timings_of_workers(self, kind):
+        with ELK(executor=kind, max_workers=2) as elk:
+            result = elk.layout(copy.deepcopy(GRAPH), logging=True)
+        for entry in result['logging']['children']:
+            assert entry['executionTime'] >= 0
+            assert entry['children'][0]['name'] == 'Cycle breaking'
+
+    def test_rejects_unknown_executor_kind(self):
+        with pytest.raises(ValueError):
+            ELK(executor='gpu')
+
+    def test_reports_cross_hierarchy_edges(self):
+        graph = copy.deepcopy(GRAPH)
+        graph['children'][0]['edges'].append(
+            {"id": "bad", "sources": ["g0_n0"], "targets": ["g1_n0"]})
+        with ELK(executor='thread') as elk:
+            with pytest.raises(UnsupportedGraphException):
+                elk.layout(graph)
+
+
+def _small_graph(i):
+    return {
+        "id": f"g{i}",
+        "layoutOptions": {"elk.direction": "RIGHT"},
+        "children": [{"id": f"n{j}", "width": 10 + i, "height": 10}
+                     for j in range(3)],
+        "edges": [{"id": "e1", "source": "n0", "target": "n1"},
+                  {"id": "e2", "source": "n1", "target": "n2"}],
+    }
+
+
+class TestLayoutMany:
+    """Tests for batch layout on a reusable worker pool."""
+
+    @pytest.mark.parametrize("workers", [0, 2])
+    def test_results_in_input_order(self, workers):
+        graphs = [_small_graph(i) for i in range(7)]
+        expected = [ELK().layout(_small_graph(i)) for i in range(7)]
+        with ELK() as elk:
+            results = elk.layout_many(graphs, workers=workers, chunksize=3)
+        assert [r.index for r in results] == list(range(7))
+        assert all(r.error is None for r in results)
+        assert all(r.graph is g for r, g in zip(results, graphs))
+        for r, exp in zip(results, expected):
+            assert [c['x'] for c in r.graph['children']] == [c['x'] for c in exp['children']]
+            assert r.graph['edges'][0]['sections'] == exp['edges'][0]['sections']
+
+    def test_unordered_iterator(self):
+        graphs = [_small_graph(i) for i in range(5)]
+        with ELK() as elk:
+            results = elk.layout_many(graphs, workers=2, ordered=False)
+            assert sorted(r.index for r in results) == list(range(5))
+
+    def test_errors_are_reported_per_graph(self):
+        graphs = [_small_graph(0), {"id": 1.5}, _small_graph(2),
+                  {"id": "x", "layoutOptions": {"elk.algorithm": "unknown"},
+                   "children": [{"id": "a"}]}]
+        with ELK() as elk:
+            results = elk.layout_many(graphs, workers=2, chunksize=2,
+                                      measure_execution_time=True)
+            # The pool is kept for later calls
+            pool = elk._batch_pool
+            elk.layout_many([_small_graph(3)], workers=2)
+            assert elk._batch_pool is pool
+        assert results[0].error is None and results[2].error is None
+        assert isinstance(results[1].error, InvalidGraphException)
+        assert isinstance(results[3].error, UnsupportedConfigurationException)
+        assert "org.eclipse.elk.core.UnsupportedConfigurationException: No layout" \
+            in str(results[3].error)
+        assert results[0].graph['logging']['executionTime'] is not None
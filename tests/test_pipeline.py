@@ -0,0 +1,126 @@
+"""Tests for the phase pipeline of the layered algorithm."""
+import copy
+import random
+
+import pytest
+
+from pyelk import ELK, InvalidGraphException
+from pyelk import algorithms
+from pyelk.algorithms import register_algorithm
+from pyelk.algorithms.layered import LayeredLayoutProvider
+
+from .helpers import layered_graph, random_edges
+
+PHASES = ['Cycle breaking', 'Layer assignment', 'Dummy node insertion',
+          'Crossing minimization', 'Node placement', 'Edge routing',
+          'Label placement', 'Write back']
+
+
+def _random_graph(seed=1, node_count=30, edge_count=50):
+    return layered_graph(random_edges(random.Random(seed), node_count, edge_count), node_count)
+
+
+def _coordinates(graph):
+    return {c['id']: (c['x'], c['y']) for c in graph['children']}
+
+
+class ReversedOrderProvider(LayeredLayoutProvider):
+    """Orders every layer by descending node index instead of sweeping."""
+
+    def pipeline(self):
+        pipeline = super().pipeline()
+        pipeline.replace('Crossing minimization', self._reverse_layers)
+        return pipeline
+
+    def _reverse_layers(self, state, log):
+        for layer in state.layers:
+            layer.sort(reverse=True)
+
+
+class TestPipeline:
+
+    def test_default_phases(self):
+        assert LayeredLayoutProvider().pipeline().names() == PHASES
+
+    def test_hooks_see_every_phase(self):
+        calls = []
+        pipeline = LayeredLayoutProvider().pipeline()
+        pipeline.add_hooks(before=lambda name, state: calls.append(('before', name)),
+                           after=lambda name, state: calls.append(('after', name)))
+        LayeredLayoutProvider().run(_random_graph(), pipeline=pipeline)
+        assert calls == [(when, name) for name in PHASES for when in ('before', 'after')]
+
+    def test_without_routing_only_nodes_are_written(self):
+        full = ELK().layout(_random_graph())
+        pipeline = LayeredLayoutProvider().pipeline()
+        pipeline.remove('Edge routing')
+        graph = _random_graph()
+        LayeredLayoutProvider().run(graph, pipeline=pipeline)
+        assert _coordinates(graph) == _coordinates(full)
+        assert all('sections' not in edge for edge in graph['edges'])
+
+    def test_inserted_processor_runs_between_phases(self):
+        seen = []
+        pipeline = LayeredLayoutProvider().pipeline()
+        pipeline.insert_after('Layer assignment', 'Record layers',
+                              lambda state, log: seen.append(state.node_layers()))
+        pipeline.insert_before('Cycle breaking', 'Start', lambda state, log: seen.append(None))
+        state = LayeredLayoutProvider().run(_random_graph(), pipeline=pipeline)
+        assert pipeline.names()[0] == 'Start'
+        assert seen == [None, state.node_layers()]
+        with pytest.raises(KeyError):
+            pipeline.remove('Layering')
+
+    def test_precomputed_layering_and_ordering_reproduce_the_layout(self):
+        for options in ({}, {'elk.edgeRouting': 'ORTHOGONAL'}):
+            graph = _random_graph(seed=4)
+            graph['layoutOptions'].update(options)
+            first = copy.deepcopy(graph)
+            state = LayeredLayoutProvider().run(first)
+
+            # Different strategies would give a different layout, but the
+            # precomputed phases ignore them
+            graph['layoutOptions'].update({
+                'elk.layered.layering.strategy': 'NETWORK_SIMPLEX',
+                'elk.layered.cycleBreaking.strategy': 'GREEDY',
+                'elk.layered.thoroughness': 1})
+            LayeredLayoutProvider().run(graph, layering=state.node_layers(),
+                                        ordering=state.layers)
+            assert _coordinates(graph) == _coordinates(first)
+            assert graph['edges'] == first['edges']
+
+    def test_precomputed_phases_still_run(self):
+        state = LayeredLayoutProvider().run(_random_graph())
+        pipeline = LayeredLayoutProvider().pipeline()
+        names = []
+        pipeline.add_hooks(after=lambda name, state: names.append(name))
+        reused = LayeredLayoutProvider().run(_random_graph(), pipeline=pipeline,
+                                             layering=state.node_layers(),
+                                             ordering=state.layers)
+        assert names == PHASES
+        assert reused.layers == state.layers
+
+    def test_mismatched_precomputed_state(self):
+        state = LayeredLayoutProvider().run(_random_graph())
+        layering = state.node_layers()
+        del layering['n3']
+        with pytest.raises(InvalidGraphException):
+            LayeredLayoutProvider().run(_random_graph(), layering=layering)
+        with pytest.raises(InvalidGraphException):
+            LayeredLayoutProvider().run(_random_graph(seed=2), layering=state.node_layers(),
+                                        ordering=state.layers)
+
+    def test_registered_subclass_runs_its_pipeline(self, monkeypatch):
+        monkeypatch.setattr(algorithms, 'ALGORITHM_REGISTRY',
+                            dict(algorithms.ALGORITHM_REGISTRY))
+        monkeypatch.setattr(algorithms, '_providers', {})
+        register_algorithm('com.example.reversed', ReversedOrderProvider)
+        graph = {
+            'id': 'root',
+            'layoutOptions': {'elk.algorithm': 'com.example.reversed',
+                              'elk.direction': 'DOWN'},
+            'children': [{'id': n, 'width': 10, 'height': 10} for n in 'abc'],
+        }
+        graph = ELK().layout(graph)
+        xs = [c['x'] for c in graph['children']]
+        assert xs == sorted(xs, reverse=True)
@@ -0,0 +1,82 @@
+"""Tests for port-aware crossing minimization in the layered algorithm."""
+from pyelk import ELK
+from pyelk.algorithms.layered.lgraph import LGraph
+from pyelk.algorithms.layered.ports import port_offsets
+
+
+def _fan_out(constraint, port_count=8, order=None, side='SOUTH'):
+    """A node whose ports each lead to their own target node."""
+    order = order or list(range(port_count))
+    ports = [{'id': f'p{i}', 'width': 4, 'height': 4,
+              'layoutOptions': {'elk.port.side': side, 'elk.port.index': i}}
+             for i in range(port_count)]
+    return {
+        'id': 'root',
+        'layoutOptions': {'elk.algorithm': 'layered', 'elk.direction': 'DOWN'},
+        'children': [{'id': 'a', 'width': 200, 'height': 20, 'ports': ports,
+                      'layoutOptions': {'elk.portConstraints': constraint}}] +
+                    [{'id': f't{i}', 'width': 10, 'height': 10} for i in range(port_count)],
+        'edges': [{'id': f'e{i}', 'sources': [f'p{order[i]}'], 'targets': [f't{i}']}
+                  for i in range(port_count)],
+    }
+
+
+def _target_order(graph):
+    targets = sorted((c for c in graph['children'] if c['id'] != 'a'), key=lambda c: c['x'])
+    return [c['id'] for c in targets]
+
+
+def _port_order(graph):
+    ports = sorted(graph['children'][0]['ports'], key=lambda p: p['x'])
+    return [p['id'] for p in ports]
+
+
+class TestPorts:
+
+    def test_targets_follow_fixed_port_order(self):
+        # Port order is fixed and the children list the targets the other
+        # way round: the barycenters must see the ports to untangle them
+        order = list(range(7, -1, -1))
+        graph = ELK().layout(_fan_out('FIXED_ORDER', order=order))
+        edges = {e['targets'][0]: e['sources'][0] for e in graph['edges']}
+        assert [edges[t] for t in _target_order(graph)] == _port_order(graph)
+        assert _port_order(graph) == [f'p{i}' for i in range(8)]
+
+    def test_fixed_side_ports_follow_their_targets(self):
+        order = [3, 6, 0, 7, 1, 5, 2, 4]
+        graph = ELK().layout(_fan_out('FIXED_SIDE', order=order))
+        edges = {e['sources'][0]: e['targets'][0] for e in graph['edges']}
+        assert [edges[p] for p in _port_order(graph)] == _target_order(graph)
+        assert all(p['y'] == 20 for p in graph['children'][0]['ports'])
+
+    def test_free_ports_move_to_the_side_of_their_edges(self):
+        graph = {
+            'id': 'root',
+            'layoutOptions': {'elk.algorithm': 'layered', 'elk.direction': 'RIGHT'},
+            'children': [
+                {'id': 's', 'width': 10, 'height': 10},
+                {'id': 'm', 'width': 20, 'height': 40,
+                 'layoutOptions': {'elk.portConstraints': 'FREE'},
+                 'ports': [{'id': 'out', 'width': 4, 'height': 4,
+                            'layoutOptions': {'elk.port.side': 'WEST'}},
+                           {'id': 'in', 'width': 4, 'height': 4}]},
+                {'id': 't', 'width': 10, 'height': 10},
+            ],
+            'edges': [{'id': 'e1', 'sources': ['s'], 'targets': ['in']},
+                      {'id': 'e2', 'sources': ['out'], 'targets': ['t']}],
+        }
+        graph = ELK().layout(graph)
+        ports = {p['id']: p for p in graph['children'][1]['ports']}
+        assert ports['in']['x'] == -4
+        assert ports['out']['x'] == 20
+
+    def test_offsets(self):
+        graph = _fan_out('FIXED_ORDER', port_count=3)
+        graph['children'].append({
+            'id': 'b', 'width': 40, 'height': 10,
+            'layoutOptions': {'elk.portConstraints': 'FIXED_POS'},
+            'ports': [{'id': 'q', 'x': 8, 'y': 10, 'width': 4, 'height': 4}]})
+        graph['children'][0]['ports'].append(
+            {'id': 'w', 'layoutOptions': {'elk.port.side': 'EAST'}})
+        offsets = port_offsets(LGraph.from_graph(graph), horizontal=False)
+        assert offsets == [-0.25, 0.0, 0.25, 0.5, -0.25]
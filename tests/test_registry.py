@@ -0,0 +1,100 @@
+"""Tests for the lazy algorithm registry and startup cost."""
+import subprocess
+import sys
+import pytest
+from pyelk import ELK, UnsupportedConfigurationException
+from pyelk import algorithms
+from pyelk.algorithms import get_layout_provider, register_algorithm
+
+
+class CircleLayoutProvider:
+    """Minimal third-party style provider placing nodes on a line."""
+
+    def layout(self, graph, global_options=None):
+        for i, child in enumerate(graph.get('children', [])):
+            child['x'] = i * 100.0
+            child['y'] = 0.0
+        graph['width'] = 100.0 * len(graph.get('children', []))
+        graph['height'] = 10.0
+
+
+@pytest.fixture
+def registry(monkeypatch):
+    monkeypatch.setattr(algorithms, 'ALGORITHM_REGISTRY',
+                        dict(algorithms.ALGORITHM_REGISTRY))
+    monkeypatch.setattr(algorithms, '_providers', {})
+    return algorithms.ALGORITHM_REGISTRY
+
+
+def _modules_after(code):
+    out = subprocess.run([sys.executable, '-c', code + '\nimport sys\n'
+                          'print(" ".join(sorted(sys.modules)))'],
+                         capture_output=True, text=True, check=True)
+    return set(out.stdout.split())
+
+
+class TestStartup:
+    """``import pyelk`` must not load providers or heavy stdlib modules."""
+
+    def test_import_does_not_load_providers(self):
+        modules = _modules_after('import pyelk')
+        loaded = [m for m in modules if m.startswith('pyelk.algorithms.')]
+        assert loaded == []
+        assert 'asyncio' not in modules
+        assert 'concurrent.futures' not in modules
+
+    def test_layout_loads_only_the_used_provider(self):
+        modules = _modules_after(
+            'import pyelk\n'
+            'pyelk.ELK().layout({"id": "r", "layoutOptions": {"algorithm": "mrtree"},'
+            ' "children": [{"id": "a", "width": 1, "height": 1}]})')
+        assert 'pyelk.algorithms.mrtree' in modules
+        assert 'pyelk.algorithms.layered' not in modules
+
+    def test_async_api_is_still_exported(self):
+        from pyelk import AsyncELK
+        assert AsyncELK.__name__ == 'AsyncELK'
+
+
+class TestRegistry:
+    """Tests for provider caching and plugin registration."""
+
+    def test_provider_instances_are_cached(self):
+        provider = get_layout_provider('org.eclipse.elk.layered')
+        assert get_layout_provider('org.eclipse.elk.layered') is provider
+
+    def test_unknown_algorithm(self):
+        assert get_layout_provider('com.example.unknown') is None
+        with pytest.raises(UnsupportedConfigurationException):
+            ELK().layout({"id": "root", "layoutOptions": {
+                "elk.algorithm": "com.example.unknown"}})
+
+    def test_register_class(self, registry):
+        register_algorithm('com.example.circle', CircleLayoutProvider)
+        graph = ELK().layout({
+            "id": "root",
+            "layoutOptions": {"elk.algorithm": "com.example.circle"},
+            "children": [{"id": "a"}, {"id": "b"}],
+        })
+        assert graph['children'][1]['x'] == 100.0
+        ids = [a['id'] for a in ELK().known_layout_algorithms()]
+        assert 'com.example.circle' in ids
+
+    def test_register_import_path(self, registry):
+        register_algorithm('com.example.circle',
+                           f'{__name__}:CircleLayoutProvider')
+        provider = get_layout_provider('com.example.circle')
+        assert isinstance(provider, CircleLayoutProvider)
+
+    def test_entry_points(self, registry, monkeypatch):
+        from importlib import metadata
+
+        ep = metadata.EntryPoint(name='com.example.circle',
+                                 value=f'{__name__}:CircleLayoutProvider',
+                                 group=algorithms.ENTRY_POINT_GROUP)
+        monkeypatch.setattr(metadata, 'entry_points',
+                            lambda: {algorithms.ENTRY_POINT_GROUP: [ep]})
+        monkeypatch.setattr(algorithms, '_entry_points_loaded', False)
+        provider = get_layout_provider('com.example.circle')
+        assert isinstance(provider, CircleLayoutProvider)
+        assert 'com.example.circle' in algorithms.available_algorithms()
@@ -0,0 +1,80 @@
+"""Tests for non-mutating layouts returning a LayoutResult."""
+import copy
+import pytest
+from pyelk import ELK, InvalidGraphException, LayoutResult
+
+
+GRAPH = {
+    "id": "root",
+    "layoutOptions": {"elk.direction": "RIGHT"},
+    "children": [
+        {"id": "n1", "width": 10, "height": 10,
+         "ports": [{"id": "p1", "width": 4, "height": 4,
+                    "layoutOptions": {"elk.port.side": "EAST"}}],
+         "labels": [{"text": "n1", "width": 8, "height": 4,
+                     "layoutOptions": {"elk.nodeLabels.placement": "INSIDE V_TOP H_LEFT"}}]},
+        {"id": "c", "children": [{"id": "a", "width": 5, "height": 5},
+                                 {"id": "b", "width": 5, "height": 5}],
+         "edges": [{"id": "e_ab", "source": "a", "target": "b"}]},
+    ],
+    "edges": [{"id": "e1", "sources": ["p1"], "targets": ["c"]}],
+}
+
+
+@pytest.fixture
+def elk():
+    return ELK()
+
+
+class TestLayoutResult:
+    """Tests for ELK.layout(in_place=False)."""
+
+    def test_input_is_untouched(self, elk):
+        graph = copy.deepcopy(GRAPH)
+        result = elk.layout(graph, in_place=False, logging=True)
+        assert isinstance(result, LayoutResult)
+        assert graph == GRAPH
+
+    def test_coordinates_match_in_place_layout(self, elk):
+        expected = elk.layout(copy.deepcopy(GRAPH))
+        result = elk.layout(copy.deepcopy(GRAPH), in_place=False)
+        n1 = expected['children'][0]
+        assert result['n1'] == {k: n1[k] for k in ('x', 'y', 'width', 'height')}
+        assert result['b']['y'] == expected['children'][1]['children'][1]['y']
+        assert result['p1']['x'] == n1['ports'][0]['x']
+        assert result['e1']['sections'] == expected['edges'][0]['sections']
+        assert result.labels['n1'][0]['x'] == n1['labels'][0]['x']
+        assert result.nodes['root']['width'] == expected['width']
+        assert 'missing' not in result
+        assert set(result) >= {'root', 'n1', 'c', 'a', 'b', 'p1', 'e1', 'e_ab'}
+
+    def test_to_dict_and_apply_to(self, elk):
+        expected = elk.layout(copy.deepcopy(GRAPH))
+        result = elk.layout(copy.deepcopy(GRAPH), in_place=False)
+        materialized = result.to_dict()
+        assert materialized['children'][1]['children'][0]['x'] == \
+            expected['children'][1]['children'][0]['x']
+        assert result.source == GRAPH
+
+        graph = copy.deepcopy(GRAPH)
+        assert result.apply_to(graph) is graph
+        assert graph['children'][0]['labels'][0]['y'] == \
+            expected['children'][0]['labels'][0]['y']
+        assert graph['edges'][0]['sections'] == expected['edges'][0]['sections']
+
+    @pytest.mark.parametrize('hierarchy', ['SEPARATE_CHILDREN', 'INCLUDE_CHILDREN'])
+    def test_to_dict_matches_in_place_layout(self, elk, hierarchy):
+        graph = copy.deepcopy(GRAPH)
+        graph['layoutOptions']['elk.hierarchyHandling'] = hierarchy
+        graph['edges'].append({"id": "e2", "source": "n1", "sourcePort": "p1", "target": "a"})
+        result = elk.layout(copy.deepcopy(graph), in_place=False)
+        assert result.to_dict() == elk.layout(copy.deepcopy(graph))
+
+    def test_logging_is_kept_on_the_result(self, elk):
+        result = elk.layout(copy.deepcopy(GRAPH), in_place=False,
+                            measure_execution_time=True)
+        assert result.logging['executionTime'] is not None
+
+    def test_errors_are_raised(self, elk):
+        with pytest.raises(InvalidGraphException):
+            elk.layout({"id": True}, in_place=False)
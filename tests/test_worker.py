@@ -0,0 +1,78 @@
+"""Tests for the stdio worker speaking the elkjs worker protocol."""
+import io
+import json
+import subprocess
+import sys
+
+from pyelk.worker import serve
+
+
+GRAPH = {
+    "id": "root",
+    "children": [
+        {"id": "n1", "width": 10, "height": 10},
+        {"id": "n2", "width": 10, "height": 10},
+    ],
+    "edges": [{"id": "e1", "sources": ["n1"], "targets": ["n2"]}],
+}
+
+
+def _run(messages):
+    stdin = io.StringIO(''.join(json.dumps(m) + '\n' for m in messages))
+    stdout = io.StringIO()
+    serve(stdin, stdout)
+    return [json.loads(line) for line in stdout.getvalue().splitlines()]
+
+
+class TestWorker:
+    """Tests for the worker message loop."""
+
+    def test_layout(self):
+        responses = _run([{
+            "id": 7, "cmd": "layout", "graph": GRAPH,
+            "layoutOptions": {"elk.direction": "RIGHT"},
+            "options": {"measureExecutionTime": True},
+        }])
+        assert responses[0]['id'] == 7
+        data = responses[0]['data']
+        assert data['children'][0]['y'] == data['children'][1]['y']
+        assert data['logging']['executionTime'] is not None
+
+    def test_known_algorithms_and_options(self):
+        responses = _run([
+            {"id": 1, "cmd": "knownLayoutAlgorithms"},
+            {"id": 2, "cmd": "knownLayoutOptions"},
+            {"id": 3, "cmd": "knownLayoutCategories"},
+        ])
+        assert [r['id'] for r in responses] == [1, 2, 3]
+        assert any(a['id'] == 'org.eclipse.elk.layered' for a in responses[0]['data'])
+        assert any(o['id'] == 'elk.direction' for o in responses[1]['data'])
+        assert responses[2]['data']
+
+    def test_errors_do_not_stop_the_worker(self):
+        responses = _run([
+            {"id": 1, "cmd": "layout", "graph": {"id": True}},
+            {"id": 2, "cmd": "bogus"},
+            {"id": 3, "cmd": "layout", "graph": GRAPH},
+        ])
+        assert responses[0]['error']['name'] == 'InvalidGraphException'
+        assert 'bogus' in responses[1]['error']['message']
+        assert 'data' in responses[2]
+
+    def test_invalid_json(self):
+        stdout = io.StringIO()
+        serve(io.StringIO('not json\n\n'), stdout)
+        response = json.loads(stdout.getvalue())
+        assert response['id'] is None
+        assert 'error' in response
+
+    def test_module_entry_point(self):
+        messages = ''.join(json.dumps(m) + '\n' for m in [
+            {"id": 1, "cmd": "layout", "graph": GRAPH},
+            {"id": 2, "cmd": "layout", "graph": GRAPH},
+        ])
+        proc = subprocess.run([sys.executable, '-m', 'pyelk.worker'], input=messages,
+                              capture_output=True, text=True, timeout=60)
+        responses = [json.loads(line) for line in proc.stdout.splitlines()]
+        assert [r['id'] for r in responses] == [1, 2]
+        assert all('data' in r for r in responses)